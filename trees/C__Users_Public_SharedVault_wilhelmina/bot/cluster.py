@@ -0,0 +1,130 @@
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import argparse
+import asyncio
+import logging
+import multiprocessing as mp
+import os
+import queue
+import signal
+import socket
+import time
+
+import discord
+from discord.ext import commands
+
+from services.cluster import Supervisor
+from services.member_cache import client_options, ready_report, resolve_policy, rss_mb
+
+# Cluster launcher: python -m bot.cluster --processes 4 --shards 16
+# Each node process runs an AutoShardedBot over its shard range and posts a
+# heartbeat to the launcher; the launcher restarts only the node that failed.
+# Nodes share state through the storage backend: set STORAGE_BACKEND=mongo for
+# several hosts, or leave SQLite (WAL, one file) for processes on one machine.
+
+log = logging.getLogger("wilhelmina.cluster")
+
+EXTENSIONS = ("cogs.core", "cogs.invite", "cogs.ping", "cogs.onboarding", "cogs.oracles")
+HEARTBEAT_S = 10
+HEALTH_TIMEOUT_S = 60
+STATUS_EVERY_S = 60
+
+INTENTS = discord.Intents.default()
+INTENTS.members = True
+
+
+# ---- node process
+
+async def _node_main(index, shard_ids, shard_count, beats, token):
+    started = time.monotonic()
+    policy = resolve_policy()
+    bot = commands.AutoShardedBot(command_prefix="!", intents=INTENTS, shard_ids=shard_ids,
+                                  shard_count=shard_count, **client_options(policy, INTENTS))
+
+    async def heartbeat():
+        while True:
+            cog = bot.get_cog("Onboarding")
+            beats.put(("beat", index, {
+                "pid": os.getpid(),
+                "ready": bot.is_ready(),
+                "guilds": len(bot.guilds),
+                "latency_ms": None if bot.latency != bot.latency else round(bot.latency * 1000),  # NaN before ready
+                "rituals": len(cog.rituals.states) if cog else 0,
+                "rss_mb": rss_mb(),
+            }))
+            await asyncio.sleep(HEARTBEAT_S)
+
+    @bot.event
+    async def on_ready():
+        log.info("Node %d ready: shards %s, %s", index, shard_ids, ready_report(bot, policy, started))
+        if index == 0:  # the command tree is global; one node syncs it
+            await bot.tree.sync()
+
+    async with bot:
+        for ext in EXTENSIONS:
+            await bot.load_extension(ext)
+        hb = asyncio.create_task(heartbeat())
+        try:
+            await bot.start(token)
+        finally:
+            hb.cancel()
+
+
+def run_node(index, shard_ids, shard_count, beats):
+    logging.basicConfig(level=logging.INFO, format=f"%(asctime)s node{index} %(levelname)s %(name)s: %(message)s")
+    os.environ["CLUSTER_NODE_ID"] = f"{socket.gethostname()}:{index}"
+    token = os.getenv("DISCORD_BOT_TOKEN") or os.getenv("DISCORD_TOKEN")
+    asyncio.run(_node_main(index, shard_ids, shard_count, beats, token))
+
+
+# ---- launcher
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run Wilhelmina as several shard processes")
+    ap.add_argument("--processes", type=int, default=int(os.getenv("CLUSTER_PROCESSES") or os.cpu_count() or 1))
+    ap.add_argument("--shards", type=int, default=int(os.getenv("SHARD_COUNT") or 0) or None,
+                    help="total shard count (default: one per process)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s launcher %(levelname)s: %(message)s")
+    if not (os.getenv("DISCORD_BOT_TOKEN") or os.getenv("DISCORD_TOKEN")):
+        raise SystemExit("Set DISCORD_TOKEN in environment.")
+    shard_count = args.shards or args.processes
+    os.environ.setdefault("SQLITE_SHARED", "1")  # inherited by the nodes
+
+    ctx = mp.get_context("spawn")
+    beats = ctx.Queue()
+
+    def spawn(node):
+        p = ctx.Process(target=run_node, args=(node.index, node.shard_ids, shard_count, beats),
+                        name=f"wilhelmina-node-{node.index}")
+        p.start()
+        log.info("Node %d started (pid %s, shards %s)", node.index, p.pid, node.shard_ids)
+        return p
+
+    sup = Supervisor(shard_count, args.processes, spawn, health_timeout_s=HEALTH_TIMEOUT_S)
+    stopping = []
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda *_: stopping.append(True))
+
+    last_status = time.monotonic()
+    try:
+        while not stopping:
+            try:
+                _, index, status = beats.get(timeout=1.0)
+                sup.beat(index, status)
+            except queue.Empty:
+                pass
+            sup.check()
+            if time.monotonic() - last_status >= STATUS_EVERY_S:
+                last_status = time.monotonic()
+                for row in sup.summary():
+                    log.info("%s", row)
+    finally:
+        log.info("Stopping %d nodes", len(sup.nodes))
+        sup.stop()
+
+
+if __name__ == "__main__":
+    main()
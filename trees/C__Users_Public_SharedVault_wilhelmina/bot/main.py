@@ -1,19 +1,31 @@
 ﻿from dotenv import load_dotenv
+
 load_dotenv()
 
-import os, asyncio, discord
+import asyncio
+import os
+import time
+
+import discord
 from discord.ext import commands
 
+from services.member_cache import client_options, ready_report, resolve_policy
+
 INTENTS = discord.Intents.default()
 INTENTS.message_content = False
 INTENTS.members = True
 INTENTS.voice_states = True
 
-bot = commands.Bot(command_prefix="!", intents=INTENTS)
+# members are chunked on demand unless MEMBER_CACHE=eager; see services/member_cache.py
+MEMBER_CACHE = resolve_policy()
+STARTED = time.monotonic()
+
+bot = commands.Bot(command_prefix="!", intents=INTENTS, **client_options(MEMBER_CACHE, INTENTS))
 
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user} (latency {bot.latency*1000:.0f}ms)")
+    print(f"Ready: {ready_report(bot, MEMBER_CACHE, STARTED)}")
     await bot.tree.sync()
 
 async def _load():
@@ -2,21 +2,59 @@
 from __future__ import annotations
 
 import asyncio
-import csv
 import datetime as dt
 import io
 import json
+import logging
 import os
 import random
-import re
-import sqlite3
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any, Protocol, cast
+from zoneinfo import ZoneInfo
 
+import aiohttp
 import discord
 from discord import app_commands
 from discord.ext import commands
-from zoneinfo import ZoneInfo
+
+from services.analytics import WINDOWS, format_dashboard, window_start
+from services.audit_sink import AuditGroup, AuditSink
+from services.backup import list_snapshots
+from services.cluster import node_id
+from services.contract_queue import ContractQueue
+from services.dispatcher import (
+    PRIORITY_ANNOUNCE,
+    PRIORITY_AUDIT,
+    PRIORITY_CONTRACT,
+    PRIORITY_INTERACTION,
+    PRIORITY_RITUAL,
+    Dispatcher,
+)
+from services.entity_cache import MISSING, EntityCache
+from services.event_archive import EventArchive, retention_cutoffs
+from services.export_stream import ExportPart, PartWriter
+from services.member_cache import GuildChunker, resolve_policy
+from services.member_index import EligibleSet, MemberIndex
+from services.provisioning import DONE, FAILED, SKIPPED, Plan, Provisioner, Step, StepSkipped
+from services.purge_batcher import PurgeBatcher, PurgeItem
+from services.ritual_scheduler import BeatScheduler
+from services.serials import SerialAllocator
+from services.soul_ids import mint_soul_id, normalize_soul_id, parse_soul_id_list, with_serial
+from services.storage import (
+    BackupUnsupported,
+    DuplicateKey,
+    EventWindow,
+    Storage,
+    chunk,
+    erasure_transform,
+    open_storage,
+)
+from services.webhook_sender import WebhookGone, WebhookSender
+from wilhelmina.services.interactions import Once, SideEffects, fast_reply
+
+log = logging.getLogger(__name__)
 
 # =========================
 # ====== CONFIG / UX ======
@@ -37,9 +75,49 @@ PER_RITUAL_MEMBER_MENTIONS_MAX = 36
 RITUAL_DURATION_S = 13 * 60
 RITUAL_JITTER_RANGE = (7, 15)  # seconds
 RESUME_WINDOW_S = 30 * 60
+RITUAL_WORKERS = int(os.getenv("RITUAL_WORKERS", "8"))  # beats fired concurrently across all guilds
+RITUAL_SCHEDULE_MAX_MIN = 7 * 24 * 60
+# In cluster mode a ritual runs on the node holding its lease in the shared store
+RITUAL_LEASE_TTL_S = 180
+RITUAL_LEASE_RENEW_S = 60
+
+# Outbound sends (Discord: 5 msgs / 5 s per channel, 50 req/s per bot; keep a little headroom)
+OUTBOUND_ROUTE_LIMIT = (5, 5.0)
+OUTBOUND_GLOBAL_LIMIT = (45, 1.0)
+OUTBOUND_CONCURRENCY = 8
+
+# Contract deliveries: worker pool and DM pacing, under Discord's DM-open limit
+CONTRACT_WORKERS = int(os.getenv("CONTRACT_WORKERS", "4"))
+CONTRACT_PATH_LIMITS = {"dm": (5, 5.0)}
+# Members with closed DMs sign at one persistent kiosk message in the summoning circle.
+# The custom_ids must never change: they are how buttons posted before a restart find the view.
+CONTRACT_KIOSK_SIGN_ID = "wilhelmina:contract-kiosk:sign"
+CONTRACT_KIOSK_DECLINE_ID = "wilhelmina:contract-kiosk:decline"
+# DM contracts carry their guild and member in the custom_id, so the buttons keep working after a
+# restart or however long the member takes to open the DM. Same rule: the format must never change.
+CONTRACT_DM_ID = "wilhelmina:contract:{action}:{guild_id}:{user_id}"
+CONTRACT_DM_ID_TEMPLATE = r"wilhelmina:contract:(?P<action>sign|decline):(?P<guild_id>\d+):(?P<user_id>\d+)"
+
+# Circle interruptions are gathered this long, then bulk-deleted (<=100 per call)
+CIRCLE_PURGE_WINDOW_S = 1.0
+
+# /init-server takeover: steps of a phase run this many at a time; progress edits at most this often
+PROVISION_CONCURRENCY = 4
+PROVISION_PROGRESS_S = 1.5
+# Phases: scaffold, then our channels one at a time (so they land in CHANNELS_ORDERED order),
+# then the archive moves, then empty categories
+LAYOUT_PHASE_SCAFFOLD = 0
+LAYOUT_PHASE_CREATE = 1
+LAYOUT_PHASE_ARCHIVE = 100
+LAYOUT_PHASE_PRUNE = 101
+# Archive moves go out as bulk channel-position updates (parent_id only); a rejected
+# batch is halved until the offending channels are isolated, and batches this small
+# fall back to one PATCH per channel
+BULK_MOVE_MAX = 100
+BULK_MOVE_SPLIT_MIN = 4
 
 # Channels (exact names & order)
-CHANNELS_ORDERED = [
+CHANNELS_ORDERED: list[tuple[str, dict[str, Any]]] = [
     ("⛧-000 ⛧-summoning-circle",         {"read_only": True,  "key": "circle"}),
     ("⌬-001 ⌬-node-000-witch-in-the-machine", {"read_only": True}),
     ("⟁-002 ⟁-node-001-wilhelmina",      {"read_only": False}),
@@ -48,7 +126,7 @@ CHANNELS_ORDERED = [
     ("⫷-005 ⫷-node-009-wnn",             {"read_only": True}),
     ("〄-006 〄-node-010-user-trash",     {"read_only": False}),
     ("admin-dashboard",                   {"read_only": False, "admin_only": True, "key": "admin"}),
-    ("∴ User Analytics ∴",               {"read_only": True,  "admin_only": True}),
+    ("∴ User Analytics ∴",               {"read_only": True,  "admin_only": True, "key": "analytics"}),
 ]
 
 ARCHIVE_CATEGORY_NAME = "⊡-the-archive"
@@ -56,18 +134,76 @@ ARCHIVE_DUMMY_CHANNEL = "⊡-the-archive"
 
 SIGNED_ROLE_NAME = "Signed"
 
+# Entities the hot paths look up, resolved by id through EntityCache: key -> (kind, name)
+ENTITIES = {
+    "circle": ("text", "⛧-000 ⛧-summoning-circle"),
+    "admin": ("text", "admin-dashboard"),
+    "archive": ("category", ARCHIVE_CATEGORY_NAME),
+    "signed": ("role", SIGNED_ROLE_NAME),
+}
+# guild_config columns that seed the cache
+ENTITY_CONFIG_COLUMNS = {"circle": "circle_channel_id", "admin": "admin_log_channel_id", "signed": "signed_role_id"}
+
 SQLITE_PATH = "data/wilhelmina.sqlite"
+# sqlite (default) or mongo; mongo reads MONGO_URI / MONGO_DB
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sqlite")
 LANG_PATH   = "data/i18n/en-US.json"
 
-# Entropy runes
-RUNES = ["Ψ", "Ω", "Σ", "Δ", "✶", "⟡", "☿", "♇"]
+# Event retention: days a kind stays in the live `events` table (None = forever).
+# Expired rows move to gzip JSONL month segments; DROP kinds are deleted outright.
+EVENT_ARCHIVE_DIR = "data/archive/events"
+EVENT_RETENTION_DAYS: dict[str, int | None] = {
+    "ritual_state": 1,
+    "circle_interruption_deleted": 30,
+    "contract_sent": 90,
+    "contract_declined": 90,
+    "admin_bypass": 90,
+    "member_join": 90,
+    "contract_signed": None,
+    "contract_revoked": None,
+}
+EVENT_RETENTION_DEFAULT_DAYS = 180
+EVENT_DROP_KINDS = {"ritual_state"}
+MAINTENANCE_INTERVAL_S = 6 * 60 * 60
+ANALYTICS_REFRESH_S = 5 * 60
+VACUUM_PAGES_PER_STEP = 256
+
+# Online snapshots of the live DB (backup API in page steps on a worker thread)
+BACKUP_DIR = os.getenv("BACKUP_DIR", "data/backups")
+BACKUP_INTERVAL_S = int(os.getenv("BACKUP_INTERVAL_S", str(6 * 60 * 60)))
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "14"))
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_SLEEP_S = 0.01
+
+# Serial leasing: blocks grow while signups arrive faster than this window
+SERIAL_LEASE_MAX = 256
+SERIAL_LEASE_HOT_S = 5.0
+
+# Exports stream from a cursor into gzip parts sized under the attachment limit
+EXPORT_PART_BYTES = int(os.getenv("EXPORT_PART_BYTES", str(8 * 1024 * 1024)))
+EXPORT_PROGRESS_ROWS = 5000
+MEMBER_FIELDS = ["guild_id", "user_id", "chosen_name", "birthdate", "signed_at", "soul_id", "updated_at"]
+EVENT_FIELDS = ["id", "guild_id", "actor_id", "kind", "detail_json", "ts"]
+
+AUDIT_PAGE_SIZE = 10
+# Admin-log batching: one message of up to 10 embeds per guild per window.
+# Discord caps a whole message at 6000 embed characters, so each embed's JSON is clipped.
+AUDIT_FLUSH_S = 3.0
+AUDIT_EMBED_JSON_CHARS = 480
+# Admin logs go out through a channel webhook (its own rate-limit bucket), falling back to a bot send
+AUDIT_WEBHOOK_NAME = "Wilhelmina Audit"
+AUDIT_HTTP_POOL = 10
+AUDIT_DETAIL_CHARS = 160
+
+SOUL_ID_MINT_ATTEMPTS = 8
+SOUL_ID_VERIFY_MAX_LISTED = 15
 
 # =========================
 # ===== EMBED HELPERS =====
 # =========================
 
-def themed_embed(title: Optional[str] = None,
-                 description: Optional[str] = None,
+def themed_embed(title: str | None = None,
+                 description: str | None = None,
                  color: int = PRIMARY_HEX) -> discord.Embed:
     e = discord.Embed(title=title or discord.Embed.Empty,
                       description=description or discord.Embed.Empty,
@@ -75,159 +211,22 @@ def themed_embed(title: Optional[str] = None,
     e.set_footer(text=FOOTER_TEXT)
     return e
 
+def part_file(part: ExportPart) -> discord.File:
+    # discord.File reads any binary file object; its annotation only names BufferedIOBase,
+    # which the export's spooled temp files are not
+    return discord.File(cast(io.BufferedIOBase, part.fp), filename=part.filename)
+
 def glitch_header(text: str) -> str:
     return f"```ansi\n>> {text}\n```"
 
 def code_line(text: str) -> str:
     return f"```\n{text}\n```"
 
-# =========================
-# ========= DB =============
-# =========================
-
-class DB:
-    def __init__(self, path: str = SQLITE_PATH):
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        self._conn = sqlite3.connect(path)
-        self._conn.row_factory = sqlite3.Row
-        self._init_schema()
-
-    def _init_schema(self):
-        cur = self._conn.cursor()
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS guild_config (
-            guild_id INTEGER PRIMARY KEY,
-            signed_role_id INTEGER,
-            circle_channel_id INTEGER,
-            admin_log_channel_id INTEGER,
-            tz TEXT,
-            created_at TEXT
-        )
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS members (
-            guild_id INTEGER,
-            user_id INTEGER,
-            chosen_name TEXT,
-            birthdate TEXT,
-            signed_at TEXT,
-            soul_id TEXT,
-            PRIMARY KEY (guild_id, user_id)
-        )
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            guild_id INTEGER,
-            actor_id INTEGER,
-            kind TEXT,
-            detail_json TEXT,
-            ts TEXT
-        )
-        """)
-        cur.execute("""
-        CREATE TABLE IF NOT EXISTS serial_counter (
-            guild_id INTEGER PRIMARY KEY,
-            next_serial INTEGER
-        )
-        """)
-        self._conn.commit()
-
-    # ---- guild config
-    def upsert_guild_config(self, guild_id: int, **kwargs):
-        cfg = self.get_guild_config(guild_id) or {}
-        cfg.update(kwargs)
-        tz = cfg.get("tz") or TZ_DEFAULT
-        created_at = cfg.get("created_at") or dt.datetime.utcnow().isoformat()
-        cur = self._conn.cursor()
-        cur.execute("""
-        INSERT INTO guild_config(guild_id, signed_role_id, circle_channel_id, admin_log_channel_id, tz, created_at)
-        VALUES(?,?,?,?,?,?)
-        ON CONFLICT(guild_id) DO UPDATE SET
-            signed_role_id=excluded.signed_role_id,
-            circle_channel_id=excluded.circle_channel_id,
-            admin_log_channel_id=excluded.admin_log_channel_id,
-            tz=excluded.tz
-        """, (guild_id, cfg.get("signed_role_id"), cfg.get("circle_channel_id"),
-              cfg.get("admin_log_channel_id"), tz, created_at))
-        self._conn.commit()
-
-    def get_guild_config(self, guild_id: int) -> Optional[Dict[str, Any]]:
-        cur = self._conn.cursor()
-        cur.execute("SELECT * FROM guild_config WHERE guild_id=?", (guild_id,))
-        row = cur.fetchone()
-        return dict(row) if row else None
-
-    # ---- members
-    def get_member(self, guild_id: int, user_id: int) -> Optional[Dict[str, Any]]:
-        cur = self._conn.cursor()
-        cur.execute("SELECT * FROM members WHERE guild_id=? AND user_id=?", (guild_id, user_id))
-        row = cur.fetchone()
-        return dict(row) if row else None
-
-    def upsert_member(self, guild_id: int, user_id: int, **kwargs):
-        existing = self.get_member(guild_id, user_id) or {}
-        existing.update(kwargs)
-        cur = self._conn.cursor()
-        cur.execute("""
-        INSERT INTO members(guild_id, user_id, chosen_name, birthdate, signed_at, soul_id)
-        VALUES(?,?,?,?,?,?)
-        ON CONFLICT(guild_id, user_id) DO UPDATE SET
-            chosen_name=excluded.chosen_name,
-            birthdate=excluded.birthdate,
-            signed_at=excluded.signed_at,
-            soul_id=excluded.soul_id
-        """, (guild_id, user_id, existing.get("chosen_name"), existing.get("birthdate"),
-              existing.get("signed_at"), existing.get("soul_id")))
-        self._conn.commit()
-
-    def list_members(self, guild_id: int):
-        cur = self._conn.cursor()
-        cur.execute("SELECT * FROM members WHERE guild_id=? ORDER BY signed_at ASC", (guild_id,))
-        return [dict(r) for r in cur.fetchall()]
-
-    # ---- events
-    def log_event(self, guild_id: int, actor_id: Optional[int], kind: str, detail: Dict[str, Any]):
-        cur = self._conn.cursor()
-        cur.execute("INSERT INTO events(guild_id, actor_id, kind, detail_json, ts) VALUES (?,?,?,?,?)",
-                    (guild_id, actor_id, kind, json.dumps(detail, ensure_ascii=False),
-                     dt.datetime.utcnow().isoformat()))
-        self._conn.commit()
-
-    def list_events(self, guild_id: int):
-        cur = self._conn.cursor()
-        cur.execute("SELECT * FROM events WHERE guild_id=? ORDER BY id ASC", (guild_id,))
-        return [dict(r) for r in cur.fetchall()]
-
-    def prune_ritual_state(self, guild_id: int):
-        cur = self._conn.cursor()
-        cur.execute("DELETE FROM events WHERE guild_id=? AND kind='ritual_state'", (guild_id,))
-        self._conn.commit()
-
-    # ---- serials
-    def get_and_inc_serial(self, guild_id: int) -> int:
-        cur = self._conn.cursor()
-        cur.execute("SELECT next_serial FROM serial_counter WHERE guild_id=?", (guild_id,))
-        row = cur.fetchone()
-        if row is None:
-            next_serial = 1
-            cur.execute("INSERT INTO serial_counter(guild_id, next_serial) VALUES (?,?)",
-                        (guild_id, 2))
-        else:
-            next_serial = row["next_serial"]
-            inc = next_serial + 1
-            if inc > 9999:
-                inc = 1
-            cur.execute("UPDATE serial_counter SET next_serial=? WHERE guild_id=?",
-                        (inc, guild_id))
-        self._conn.commit()
-        return next_serial
-
 # =========================
 # ===== LANG PACK =========
 # =========================
 
-DEFAULT_LANG = {
+DEFAULT_LANG: dict[str, Any] = {
     "ritual": {
         "start": ">> INITIALIZING // SUMMONING_CIRCLE",
         "beat_lines": [
@@ -242,6 +241,8 @@ DEFAULT_LANG = {
         "prompt_name": "Enter your chosen name.",
         "prompt_birthdate": "Birth date (YYYY-MM-DD).",
         "decline": {"rude": ["No signature? Then no access. Move along."]},
+        "kiosk": "No contract in your DMs? Press **Sign** to bind your soul here.",
+        "already_signed": "Your seal is already granted.",
         "signed_dm": "Seal granted. Your Soul ID: {soul_id}",
         "signed_public": "Seal granted for <@{user_id}>."
     },
@@ -251,9 +252,9 @@ DEFAULT_LANG = {
     }
 }
 
-def load_lang() -> Dict[str, Any]:
+def load_lang() -> dict[str, Any]:
     try:
-        with open(LANG_PATH, "r", encoding="utf-8") as f:
+        with open(LANG_PATH, encoding="utf-8") as f:
             return json.load(f)
     except Exception:
         return DEFAULT_LANG
@@ -265,33 +266,51 @@ def load_lang() -> Dict[str, Any]:
 def is_admin(member: discord.Member) -> bool:
     return member.guild_permissions.administrator
 
+def utc_ts() -> float:
+    # Ritual times are naive-UTC datetimes turned into timestamps; keep every comparison on the same footing
+    return dt.datetime.utcnow().timestamp()
+
+def outbound_route(target) -> tuple[str, Any]:
+    """The rate-limit bucket a send lands in: a DM per user, a followup per interaction, else the channel."""
+    if isinstance(target, (discord.Member, discord.User)):
+        return ("dm", target.id)
+    if isinstance(target, discord.Webhook):
+        return ("followup", target.token)
+    return ("channel", target.id)
+
+def send_retry_after(exc: BaseException) -> float | None:
+    if isinstance(exc, discord.HTTPException) and exc.status == 429:
+        return float(exc.response.headers.get("Retry-After", 1.0))
+    return getattr(exc, "retry_after", None)  # discord.RateLimited
+
+def side_effect_retryable(exc: BaseException) -> bool:
+    return not isinstance(exc, (discord.Forbidden, discord.NotFound))  # retrying won't change the answer
+
+def mention_eligible(member: discord.Member) -> bool:
+    return not (member.bot or is_admin(member))
+
 def to_rtz(ts: dt.datetime, tz_name: str) -> dt.datetime:
     tz = ZoneInfo(tz_name)
     if ts.tzinfo is None:
         ts = ts.replace(tzinfo=ZoneInfo("UTC"))
     return ts.astimezone(tz)
 
-def name_glyph(chosen_name: str) -> str:
-    letters = re.findall(r"[A-Za-z]", chosen_name or "")
-    glyph = "".join(letters)[:2].upper()
-    return glyph.ljust(2, "X")
-
-def mint_soul_id(chosen_name: str, when: dt.datetime) -> str:
-    glyph = name_glyph(chosen_name)
-    yy = f"{when.year % 100:02d}"
-    random.seed(int(when.timestamp()))
-    rune = random.choice(RUNES)
-    digit = random.randint(0, 9)
-    serial = "0000"
-    sigil = f"{glyph}{yy}{rune}{digit}"
-    return f"⛧WLMN-{serial}-{sigil}⛧"
-
-def with_serial(soul_id: str, serial: int) -> str:
-    return soul_id.replace("0000", f"{serial:04d}", 1)
-
-def chunk(seq: List[Any], n: int):
-    for i in range(0, len(seq), n):
-        yield seq[i:i+n]
+def parse_utc_iso(text: str) -> str:
+    """Normalise a user-supplied ISO date/time to the naive-UTC format stored in `ts`."""
+    ts = dt.datetime.fromisoformat(text.strip())
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(dt.UTC).replace(tzinfo=None)
+    return ts.isoformat()
+
+async def chain_rows(*sources):
+    """itertools.chain over a mix of plain and async iterables (archive + storage cursors)."""
+    for src in sources:
+        if hasattr(src, "__aiter__"):
+            async for row in src:
+                yield row
+        else:
+            for row in src:
+                yield row
 
 # ======================================
 # ===== CONTRACT VIEWS / MODALS ========
@@ -301,7 +320,7 @@ class ContractModal(discord.ui.Modal, title="Soul Contract"):
     chosen_name = discord.ui.TextInput(label="Chosen Name", placeholder="Enter your chosen name", required=True, max_length=64)
     birthdate = discord.ui.TextInput(label="Birthdate (YYYY-MM-DD)", placeholder="YYYY-MM-DD", required=True, max_length=10)
 
-    def __init__(self, cog: "Onboarding", member: discord.Member):
+    def __init__(self, cog: Onboarding, member: discord.Member):
         super().__init__()
         self.cog = cog
         self.member = member
@@ -316,38 +335,90 @@ class ContractModal(discord.ui.Modal, title="Soul Contract"):
                 ephemeral=True
             )
             return
-        guild = self.member.guild
-        await self.cog.complete_contract(guild=guild, user=self.member,
+        await self.cog.complete_contract(interaction, self.member,
                                          chosen_name=str(self.chosen_name),
-                                         birthdate=str(self.birthdate),
-                                         respond=interaction.response)
+                                         birthdate=str(self.birthdate))
+
+class ContractDMButton(discord.ui.DynamicItem[discord.ui.Button], template=CONTRACT_DM_ID_TEMPLATE):  # type: ignore[call-arg]
+    """Sign/Decline on a DM'd contract; registered with bot.add_dynamic_items at startup."""
+
+    def __init__(self, action: str, guild_id: int, user_id: int):
+        sign = action == "sign"
+        super().__init__(discord.ui.Button(
+            label="Sign" if sign else "Decline",
+            style=discord.ButtonStyle.success if sign else discord.ButtonStyle.danger,
+            custom_id=CONTRACT_DM_ID.format(action=action, guild_id=guild_id, user_id=user_id),
+        ))
+        self.action = action
+        self.guild_id = guild_id
+        self.user_id = user_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"], int(match["guild_id"]), int(match["user_id"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        if interaction.user.id != self.user_id:
+            await interaction.response.send_message(embed=themed_embed("Not your contract.", "This seal is bound to another.",
+                                                                       color=discord.Color.red().value), ephemeral=True)
+            return
+        cog = interaction.client.get_cog("Onboarding")
+        guild = interaction.client.get_guild(self.guild_id)
+        member = guild.get_member(self.user_id) if guild else None
+        if guild is not None and member is None:
+            # not cached under the lazy/minimal member policies, or after a restart
+            try:
+                member = await guild.fetch_member(self.user_id)
+            except discord.NotFound:
+                pass
+        if cog is None or member is None:
+            # Left the server (or it left us) since the DM went out: nothing to sign into
+            await interaction.response.send_message(embed=themed_embed("Contract void", "This contract's circle is gone.",
+                                                                       color=discord.Color.red().value), ephemeral=True)
+            return
+        if self.action == "sign":
+            await interaction.response.send_modal(ContractModal(cog, member))
+        else:
+            await cog.decline_contract(member, interaction.response)
 
 class ContractView(discord.ui.View):
-    def __init__(self, cog: "Onboarding", member: discord.Member, timeout: int = 300):
-        super().__init__(timeout=timeout)
+    """The DM'd contract; its buttons are ContractDMButtons, so it never times out."""
+
+    def __init__(self, member: discord.Member):
+        super().__init__(timeout=None)
+        for action in ("sign", "decline"):
+            self.add_item(ContractDMButton(action, member.guild.id, member.id))
+
+class ContractKioskView(discord.ui.View):
+    """The one contract message every unsigned member can use; registered with bot.add_view at startup."""
+
+    def __init__(self, cog: Onboarding):
+        super().__init__(timeout=None)
         self.cog = cog
-        self.member = member
-        self.lang = cog.lang
 
-    @discord.ui.button(label="Sign", style=discord.ButtonStyle.success)
+    async def _unsigned(self, interaction: discord.Interaction) -> discord.Member | None:
+        # No storage round trip before answering: the Signed role comes with the interaction, and
+        # complete_contract catches a stored seal whose role grant never landed.
+        member = interaction.user
+        if not isinstance(member, discord.Member):
+            return None
+        if self.cog.has_signed_role(member):
+            text = self.cog.lang["contract"].get("already_signed") or DEFAULT_LANG["contract"]["already_signed"]
+            await interaction.response.send_message(embed=themed_embed("Sealed", text, color=ACCENT2_HEX), ephemeral=True)
+            return None
+        return member
+
+    @discord.ui.button(label="Sign", style=discord.ButtonStyle.success, custom_id=CONTRACT_KIOSK_SIGN_ID)
     async def sign(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.member.id:
-            await interaction.response.send_message(embed=themed_embed("Not your contract.", "This seal is bound to another.",
-                                                                       color=discord.Color.red().value), ephemeral=True)
-            return
-        await interaction.response.send_modal(ContractModal(self.cog, self.member))
+        member = await self._unsigned(interaction)
+        if member is not None:
+            await interaction.response.send_modal(ContractModal(self.cog, member))
 
-    @discord.ui.button(label="Decline", style=discord.ButtonStyle.danger)
+    @discord.ui.button(label="Decline", style=discord.ButtonStyle.danger, custom_id=CONTRACT_KIOSK_DECLINE_ID)
     async def decline(self, interaction: discord.Interaction, button: discord.ui.Button):
-        if interaction.user.id != self.member.id:
-            await interaction.response.send_message(embed=themed_embed("Not your contract.", "This seal is bound to another.",
-                                                                       color=discord.Color.red().value), ephemeral=True)
-            return
-        rude_lines = (self.lang.get("contract", {}).get("decline", {}) or {}).get("rude", []) or DEFAULT_LANG["contract"]["decline"]["rude"]
-        text = random.choice(rude_lines)
-        await interaction.response.send_message(embed=themed_embed("Declined", text))
-        self.cog.db.log_event(self.member.guild.id, interaction.user.id, "contract_declined", {"user_id": interaction.user.id})
-        await self.cog.log_admin(self.member.guild, "contract_declined", {"user_id": interaction.user.id})
+        member = await self._unsigned(interaction)
+        if member is not None:
+            await self.cog.decline_contract(member, interaction.response, ephemeral=True)
 
 # ======================================
 # ===== RITUAL SCHEDULER ================
@@ -357,27 +428,94 @@ class ContractView(discord.ui.View):
 class RitualState:
     guild_id: int
     started_at: dt.datetime
-    beats: List[float]
+    beats: list[float]
     next_index: int = 0
     everyone_count: int = 0
     member_mentions_done: int = 0
-    last_everyone_ts: Optional[float] = None
-    task: Optional[asyncio.Task] = None
+    last_everyone_ts: float | None = None
+    mentioned: set[int] = field(default_factory=set)
+    opened: bool = False
     aborted: bool = False
 
+class RitualHost(Protocol):
+    """What RitualQueue needs from its owner: the Onboarding cog, or services.ritual_sim's SimCog."""
+
+    @property
+    def node(self) -> str: ...
+    @property
+    def db(self) -> Storage: ...
+    @property
+    def bot(self) -> Any: ...
+    @property
+    def lang(self) -> dict[str, Any]: ...
+    @property
+    def members(self) -> MemberIndex: ...
+    @property
+    def chunker(self) -> GuildChunker: ...
+
+    async def post(self, target: Any, priority: int, guild_id: int = 0, **kwargs) -> Any: ...
+    async def log_admin(self, guild: Any, kind: str, detail: dict[str, Any]) -> None: ...
+    async def _get_or_create_circle(self, guild: Any) -> Any: ...
+    async def persist_ritual_state(self, guild_id: int, st: RitualState) -> None: ...
+    async def mention_pool(self, guild: Any) -> EligibleSet: ...
+    def forget_members(self, guild_id: int) -> None: ...
+
 class RitualQueue:
-    def __init__(self, cog: "Onboarding"):
-        self.cog = cog
-        self.states: Dict[int, RitualState] = {}
+    """Ritual state per guild; every pending step lives in one shared BeatScheduler keyed by guild id."""
 
-    def active(self, guild_id: int) -> Optional[RitualState]:
+    def __init__(self, cog: RitualHost, clock: Callable[[], float] = utc_ts):
+        self.cog = cog
+        self.clock = clock  # services.ritual_sim drives rituals on a virtual clock
+        self.states: dict[int, RitualState] = {}
+        # circle channel ids of opened rituals; on_message checks this before anything else
+        self.live_circles: set[int] = set()
+        self._circle_of: dict[int, int] = {}
+        self.scheduler = BeatScheduler(self._fire, workers=RITUAL_WORKERS, clock=clock)
+
+    def active(self, guild_id: int) -> RitualState | None:
         st = self.states.get(guild_id)
-        if st and not st.aborted: return st
+        if st and not st.aborted:
+            return st
         return None
 
-    async def start(self, guild: discord.Guild, circle: discord.TextChannel):
-        if self.active(guild.id): raise RuntimeError("Ritual already active.")
-        now = dt.datetime.utcnow()
+    def _mark_live(self, guild_id: int, channel_id: int):
+        old = self._circle_of.get(guild_id)
+        if old != channel_id:
+            self.live_circles.discard(old)
+            self._circle_of[guild_id] = channel_id
+            self.live_circles.add(channel_id)
+
+    def _unmark_live(self, guild_id: int):
+        self.live_circles.discard(self._circle_of.pop(guild_id, None))
+
+    def next_due(self, guild_id: int) -> float | None:
+        return self.scheduler.due_at(guild_id)
+
+    @staticmethod
+    def lease_key(guild_id: int) -> str:
+        return f"ritual:{guild_id}"
+
+    async def claim(self, guild_id: int) -> bool:
+        return await self.cog.db.acquire_lease(self.lease_key(guild_id), self.cog.node, RITUAL_LEASE_TTL_S)
+
+    async def release(self, guild_id: int):
+        await self.cog.db.release_lease(self.lease_key(guild_id), self.cog.node)
+
+    async def renew_leases(self):
+        """Extend this node's ritual leases; a ritual whose lease was lost is dropped here."""
+        for gid in list(self.states):
+            if not await self.claim(gid):
+                log.warning("Lost ritual lease for guild %s to another node; stopping it here", gid)
+                self.states.pop(gid, None)
+                self.scheduler.cancel(gid)
+                self._unmark_live(gid)
+
+    async def start(self, guild: discord.Guild, circle: discord.TextChannel, delay_s: float = 0.0):
+        if self.active(guild.id):
+            raise RuntimeError("Ritual already active.")
+        if not await self.claim(guild.id):
+            raise RuntimeError("Ritual already active on another node.")
+        now = dt.datetime.fromtimestamp(self.clock() + delay_s)  # naive UTC, see utc_ts()
         beats_count = 12
         base_gap = RITUAL_DURATION_S / (beats_count + 1)
         beats, acc = [], 0.0
@@ -389,80 +527,114 @@ class RitualQueue:
         state = RitualState(guild_id=guild.id, started_at=now, beats=beats, next_index=0)
         self.states[guild.id] = state
         await self.cog.persist_ritual_state(guild.id, state)
-        task = asyncio.create_task(self._runner(guild, circle, state))
-        state.task = task
-        self.cog.db.log_event(guild.id, None, "ritual_start", {"started_at": now.isoformat(), "beats": beats})
+        self.scheduler.schedule(guild.id, now.timestamp())
+        await self.cog.db.log_event(guild.id, None, "ritual_start", {"started_at": now.isoformat(), "beats": beats})
         await self.cog.log_admin(guild, "ritual_start", {"beats": beats})
 
+    def resume(self, st: RitualState):
+        """Re-enter a persisted ritual; the opening line is sent again (at its start time), then the remaining beats."""
+        self.states[st.guild_id] = st
+        self.scheduler.schedule(st.guild_id, max(self.clock(), st.started_at.timestamp()))
+
     async def abort(self, guild: discord.Guild):
         st = self.states.get(guild.id)
-        if not st: return False
+        if not st:
+            return False
         st.aborted = True
-        if st.task and not st.task.done():
-            st.task.cancel()
-            try: await st.task
-            except asyncio.CancelledError: pass
-        self.cog.db.log_event(guild.id, None, "ritual_abort", {"ts": dt.datetime.utcnow().isoformat()})
+        self.states.pop(guild.id, None)
+        self.scheduler.cancel(guild.id)
+        self._unmark_live(guild.id)
+        await self.release(guild.id)
+        self.cog.forget_members(guild.id)
+        await self.cog.db.log_event(guild.id, None, "ritual_abort", {"ts": dt.datetime.utcnow().isoformat()})
         await self.cog.log_admin(guild, "ritual_abort", {})
         return True
 
-    async def _runner(self, guild: discord.Guild, circle: discord.TextChannel, st: RitualState):
-        lang = self.cog.lang
-        lines  = (lang.get("ritual") or {}).get("beat_lines", DEFAULT_LANG["ritual"]["beat_lines"])
-        finale = (lang.get("ritual") or {}).get("finale", DEFAULT_LANG["ritual"]["finale"])
-        start_line = (lang.get("ritual") or {}).get("start", DEFAULT_LANG["ritual"]["start"])
+    async def _fire(self, guild_id: int):
+        st = self.states.get(guild_id)
+        guild = self.cog.bot.get_guild(guild_id)
+        if st is None or st.aborted:
+            return
+        if guild is None:
+            self.states.pop(guild_id, None)
+            self._unmark_live(guild_id)
+            await self.release(guild_id)  # don't make other nodes wait out the TTL
+            return
+        circle = await self.cog._get_or_create_circle(guild)
+        # scheduled rituals don't lock the circle before they open
+        if not st.opened:
+            await self._open(guild, circle, st)
+        else:
+            await self._beat(guild, circle, st)
+        self._mark_live(guild_id, circle.id)
+        if st.aborted or self.states.get(guild_id) is not st:
+            return
+        if st.next_index < len(st.beats):
+            self.scheduler.schedule(guild_id, st.started_at.timestamp() + st.beats[st.next_index])
+        else:
+            await self._finish(guild, circle, st)
 
-        await circle.send(embed=themed_embed("Summoning", f"{DIVIDER}\n{start_line}\n{DIVIDER}"))
-        t0 = st.started_at.timestamp()
-        while st.next_index < len(st.beats) and not st.aborted:
-            target = t0 + st.beats[st.next_index]
-            now = dt.datetime.utcnow().timestamp()
-            delay = max(0.0, target - now)
-            try:    await asyncio.sleep(delay)
-            except asyncio.CancelledError: return
-
-            line = random.choice(lines).format(signal=random.randint(100, 999), code=random.randint(100, 599))
-            content = None
-            embed = themed_embed("Ritual Beat", f"{DIVIDER}\n{line}\n{DIVIDER}")
-
-            # @everyone pacing
-            if "@everyone" in line:
-                can_everyone = st.everyone_count < EVERYONE_MAX_TOTAL
-                now_ts = dt.datetime.utcnow().timestamp()
-                gap_ok = (st.last_everyone_ts is None) or ((now_ts - st.last_everyone_ts) >= EVERYONE_MIN_GAP_S)
-                if can_everyone and gap_ok:
-                    content = "@everyone"
-                    st.everyone_count += 1
-                    st.last_everyone_ts = now_ts
-
-            # per-member mentions
-            mentions: List[str] = []
-            if st.member_mentions_done < PER_RITUAL_MEMBER_MENTIONS_MAX:
-                to_pick = min(PER_BEAT_MEMBER_MENTIONS, PER_RITUAL_MEMBER_MENTIONS_MAX - st.member_mentions_done)
-                pool = [m for m in guild.members if not (m.bot or is_admin(m))]
-                random.shuffle(pool)
-                sample = pool[:to_pick]
-                mentions = [m.mention for m in sample]
-                st.member_mentions_done += len(mentions)
-            if mentions:
-                embed.description = f"{embed.description}\n" + "\n".join(mentions)
+    async def _open(self, guild: discord.Guild, circle: discord.TextChannel, st: RitualState):
+        start_line = (self.cog.lang.get("ritual") or {}).get("start", DEFAULT_LANG["ritual"]["start"])
+        await self.cog.post(circle, PRIORITY_RITUAL, st.guild_id,
+                            embed=themed_embed("Summoning", f"{DIVIDER}\n{start_line}\n{DIVIDER}"))
+        st.opened = True
+        await self._pool(guild)  # fetch the member list now rather than on the first beat
 
-            try:
-                await circle.send(content=content, embed=embed,
-                                  allowed_mentions=discord.AllowedMentions(everyone=True, users=True))
-            except discord.HTTPException:
-                pass
+    async def _pool(self, guild: discord.Guild) -> EligibleSet | None:
+        try:
+            return await self.cog.mention_pool(guild)
+        except Exception as e:
+            log.warning("Member list for guild %s unavailable; beat goes out without mentions: %s", guild.id, e)
+            return None
+
+    async def _beat(self, guild: discord.Guild, circle: discord.TextChannel, st: RitualState):
+        lines = (self.cog.lang.get("ritual") or {}).get("beat_lines", DEFAULT_LANG["ritual"]["beat_lines"])
+        line = random.choice(lines).format(signal=random.randint(100, 999), code=random.randint(100, 599))
+        content = None
+        embed = themed_embed("Ritual Beat", f"{DIVIDER}\n{line}\n{DIVIDER}")
+
+        # @everyone pacing
+        if "@everyone" in line:
+            can_everyone = st.everyone_count < EVERYONE_MAX_TOTAL
+            now_ts = self.clock()
+            gap_ok = (st.last_everyone_ts is None) or ((now_ts - st.last_everyone_ts) >= EVERYONE_MIN_GAP_S)
+            if can_everyone and gap_ok:
+                content = "@everyone"
+                st.everyone_count += 1
+                st.last_everyone_ts = now_ts
+
+        # per-member mentions
+        mentions: list[str] = []
+        if st.member_mentions_done < PER_RITUAL_MEMBER_MENTIONS_MAX:
+            to_pick = min(PER_BEAT_MEMBER_MENTIONS, PER_RITUAL_MEMBER_MENTIONS_MAX - st.member_mentions_done)
+            pool = await self._pool(guild)
+            picked = pool.sample(to_pick, exclude=st.mentioned) if pool is not None else []
+            st.mentioned.update(picked)
+            mentions = [f"<@{uid}>" for uid in picked]
+            st.member_mentions_done += len(mentions)
+        if mentions:
+            embed.description = f"{embed.description}\n" + "\n".join(mentions)
 
-            st.next_index += 1
-            await self.cog.persist_ritual_state(guild.id, st)
+        try:
+            await self.cog.post(circle, PRIORITY_RITUAL, guild.id, content=content, embed=embed,
+                                allowed_mentions=discord.AllowedMentions(everyone=True, users=True))
+        except discord.HTTPException as e:
+            log.warning("Ritual beat %d lost in guild %s: %s", st.next_index + 1, guild.id, e)
 
-        if not st.aborted:
-            await circle.send(embed=themed_embed("Finale", f"{DIVIDER}\n{finale}\n{DIVIDER}"))
-            self.cog.db.log_event(guild.id, None, "ritual_end", {"ts": dt.datetime.utcnow().isoformat()})
-            await self.cog.log_admin(guild, "ritual_end", {})
-            self.cog.db.prune_ritual_state(guild.id)
+        st.next_index += 1
+        await self.cog.persist_ritual_state(guild.id, st)
 
+    async def _finish(self, guild: discord.Guild, circle: discord.TextChannel, st: RitualState):
+        finale = (self.cog.lang.get("ritual") or {}).get("finale", DEFAULT_LANG["ritual"]["finale"])
         self.states.pop(guild.id, None)
+        self._unmark_live(guild.id)
+        await self.cog.post(circle, PRIORITY_RITUAL, guild.id, embed=themed_embed("Finale", f"{DIVIDER}\n{finale}\n{DIVIDER}"))
+        await self.cog.db.log_event(guild.id, None, "ritual_end", {"ts": dt.datetime.utcnow().isoformat()})
+        await self.cog.log_admin(guild, "ritual_end", {})
+        await self.cog.db.prune_ritual_state(guild.id)
+        await self.release(guild.id)
+        self.cog.forget_members(guild.id)
 
 # ======================================
 # ===== MAIN COG =======================
@@ -473,34 +645,289 @@ class Onboarding(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.db = DB(SQLITE_PATH)
+        self.node = node_id()
+        self.db: Storage = open_storage(STORAGE_BACKEND, default_tz=TZ_DEFAULT, path=SQLITE_PATH)
         self.lang = load_lang()
         self.rituals = RitualQueue(self)
+        self.archive = EventArchive(EVENT_ARCHIVE_DIR)
+        self.serials = SerialAllocator(self.db.lease_serials, self.db.release_serials,
+                                       max_block=SERIAL_LEASE_MAX, hot_window_s=SERIAL_LEASE_HOT_S)
+        self._backup_lock = asyncio.Lock()
+        # Maintenance moves events from the live table to the archive a batch at a time; an export
+        # holds this while it reads both, so no event is in neither place (or both) meanwhile
+        self._archive_lock = asyncio.Lock()
+        self._layout_locks: dict[int, asyncio.Lock] = {}
+        self.contracts = ContractQueue(self._deliver_contract, self.db.dequeue_contract, CONTRACT_PATH_LIMITS,
+                                       workers=CONTRACT_WORKERS)
+        self._kiosks: dict[int, int] = {}  # guild id -> kiosk message id, checked once per process
+        self.layout_requests = 0  # bulk channel-position requests sent
+        self.audit_sink = AuditSink(self._deliver_audit, flush_s=AUDIT_FLUSH_S)
+        # what interaction handlers leave behind after answering (role grants, announcements, logging);
+        # announcements and logging are Once: the dispatcher already retries 429s, a second try would repeat them
+        self.effects = SideEffects(retry_after=send_retry_after, retryable=side_effect_retryable)
+        self.entities = EntityCache(ENTITIES)
+        self.members = MemberIndex()
+        self.chunker = GuildChunker(cache=resolve_policy() != "minimal")
+        self.purges = PurgeBatcher(self._purge_circle, window_s=CIRCLE_PURGE_WINDOW_S)
+        self._http: aiohttp.ClientSession | None = None
+        self.webhooks: WebhookSender | None = None
+        self._audit_webhooks: dict[int, str] = {}  # admin channel id -> webhook url
+        self.outbound = Dispatcher(route_limit=OUTBOUND_ROUTE_LIMIT, global_limit=OUTBOUND_GLOBAL_LIMIT,
+                                   concurrency=OUTBOUND_CONCURRENCY, retry_after=send_retry_after)
+
+    async def cog_load(self):
+        await self.db.open()
+        await self._convert_vacuum_mode()
+        self._http = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=AUDIT_HTTP_POOL),
+                                           timeout=aiohttp.ClientTimeout(total=30))
+        self.webhooks = WebhookSender(self._http)
+        self.outbound.start()
+        self.rituals.scheduler.start()
+        self.contracts.start()
+        self.bot.add_view(ContractKioskView(self))
+        self.bot.add_dynamic_items(ContractDMButton)
         self._resume_task = asyncio.create_task(self._maybe_resume_rituals())
+        self._contract_restore_task = asyncio.create_task(self._restore_contracts())
+        self._maintenance_task = asyncio.create_task(self._maintenance_loop())
+        self._analytics_task = asyncio.create_task(self._analytics_loop())
+        self._backup_task = asyncio.create_task(self._backup_loop())
+        self._lease_task = asyncio.create_task(self._ritual_lease_loop())
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(ContractDMButton)
+        self._maintenance_task.cancel()
+        self._analytics_task.cancel()
+        self._backup_task.cancel()
+        self._lease_task.cancel()
+        await self.rituals.scheduler.close()
+        for gid in list(self.rituals.states):
+            await self.rituals.release(gid)  # let another node resume without waiting out the TTL
+        self._contract_restore_task.cancel()
+        await self.contracts.close()  # queued rows stay in storage for the next start
+        await self.purges.close()
+        await self.effects.close()  # before the audit sink and dispatcher they feed
+        log.info("Side effects: %s", self.effects.metrics.snapshot())
+        await self.audit_sink.close()
+        await self.outbound.close()
+        log.info("Outbound dispatcher: %s", self.outbound.metrics.snapshot())
+        if self._http is not None:
+            await self._http.close()
+        returned = await self.serials.release_all()
+        if returned:
+            log.info("Returned unused serial leases: %s", returned)
+        await self.db.close()
+
+    # -------- event retention / vacuum
+
+    async def run_event_maintenance(self) -> dict[str, int]:
+        """Archive expired events, then vacuum and ANALYZE in small steps."""
+        cutoffs = retention_cutoffs(dt.datetime.utcnow(), EVENT_RETENTION_DAYS, EVENT_RETENTION_DEFAULT_DAYS)
+        moved = 0
+        while True:
+            async with self._archive_lock:
+                n = await self.db.archive_event_batch(self.archive, cutoffs, EVENT_DROP_KINDS)
+            if not n:
+                break
+            moved += n
+            await asyncio.sleep(0)
+        freed = 0
+        while n := await self.db.incremental_vacuum(VACUUM_PAGES_PER_STEP):
+            freed += n
+            await asyncio.sleep(0)
+        await self.db.analyze()
+        return {"events_moved": moved, "pages_freed": freed}
+
+    async def _convert_vacuum_mode(self):
+        """One-off switch to incremental auto_vacuum, before anything here uses the DB.
+
+        The full VACUUM holds the write lock throughout, so it runs while this node is
+        still loading rather than under live traffic; a failed switch is retried on the
+        next start. With several nodes, only the maintenance lease holder does it.
+        """
+        try:
+            if not await self.db.acquire_lease("job:maintenance", self.node, MAINTENANCE_INTERVAL_S * 1.5):
+                return
+            if await self.db.ensure_incremental_vacuum():
+                log.info("Switched DB to incremental auto_vacuum")
+        except Exception:
+            log.exception("Could not switch DB to incremental auto_vacuum")
+
+    async def _maintenance_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                # once per fleet: whichever node holds the job lease does it
+                if not await self.db.acquire_lease("job:maintenance", self.node, MAINTENANCE_INTERVAL_S * 1.5):
+                    await asyncio.sleep(MAINTENANCE_INTERVAL_S)
+                    continue
+                stats = await self.run_event_maintenance()
+                log.info("Event maintenance: %s", stats)
+                log.info("Outbound dispatcher: %s", self.outbound.metrics.snapshot())
+                log.info("Contract queue: %s", self.contracts.metrics.snapshot(self.contracts.depth()))
+                log.info("Side effects: %s", self.effects.metrics.snapshot(self.effects.running()))
+            except Exception:
+                log.exception("Event maintenance failed")
+            await asyncio.sleep(MAINTENANCE_INTERVAL_S)
+
+    # -------- backups
+
+    async def run_backup(self):
+        """Snapshot the live DB without pausing the bot; the run is recorded either way."""
+        async with self._backup_lock:
+            started = dt.datetime.utcnow().isoformat()
+            try:
+                res = await self.db.snapshot(BACKUP_DIR, BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP_S, BACKUP_KEEP)
+            except BackupUnsupported:
+                raise
+            except Exception as e:
+                await self.db.record_backup(started_at=started, error=repr(e))
+                raise
+            await self.db.record_backup(path=res.path, started_at=res.started_at, duration_ms=res.duration_ms,
+                                        lock_ms=res.lock_ms, max_step_ms=res.max_step_ms, steps=res.steps,
+                                        pages=res.pages, bytes=res.bytes)
+            log.info("Backup %s: %.0f ms total, %.1f ms locked (max step %.1f ms)",
+                     res.path, res.duration_ms, res.lock_ms, res.max_step_ms)
+            return res
+
+    async def _backup_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            await asyncio.sleep(BACKUP_INTERVAL_S)
+            try:
+                if not await self.db.acquire_lease("job:backup", self.node, BACKUP_INTERVAL_S * 1.5):
+                    continue
+                await self.run_backup()
+            except BackupUnsupported:
+                return
+            except Exception:
+                log.exception("Scheduled backup failed")
+
+    # -------- analytics dashboard
+
+    async def render_dashboard(self, guild_id: int) -> discord.Embed:
+        now = dt.datetime.utcnow()
+        windows = {label: await self.db.rollup_totals(guild_id, grain, window_start(now, grain, n))
+                   for label, grain, n in WINDOWS}
+        e = themed_embed("∴ User Analytics ∴", format_dashboard(windows), color=ACCENT_HEX)
+        e.add_field(name="Updated", value=f"<t:{int(now.replace(tzinfo=dt.UTC).timestamp())}:R>", inline=False)
+        return e
+
+    async def refresh_dashboard(self, guild: discord.Guild, cfg: dict[str, Any]):
+        """Edit the pinned dashboard message in place; post a new one if it is gone."""
+        channel = guild.get_channel(cfg["analytics_channel_id"])
+        if channel is None:
+            return
+        embed = await self.render_dashboard(guild.id)
+        if cfg.get("analytics_message_id"):
+            try:
+                await channel.get_partial_message(cfg["analytics_message_id"]).edit(embed=embed)
+                return
+            except discord.NotFound:
+                pass
+        msg = await self.post(channel, PRIORITY_AUDIT, guild.id, embed=embed)
+        await self.db.upsert_guild_config(guild.id, analytics_message_id=msg.id)
+
+    async def _analytics_loop(self):
+        await self.bot.wait_until_ready()
+        while True:
+            try:
+                configs = await self.db.list_dashboard_guilds()
+            except Exception:
+                log.exception("Listing dashboard guilds failed")
+                configs = []
+            for cfg in configs:
+                guild = self.bot.get_guild(cfg["guild_id"])
+                if guild is None:
+                    continue
+                try:
+                    await self.refresh_dashboard(guild, cfg)
+                except discord.HTTPException:
+                    log.warning("Dashboard refresh failed for guild %s", guild.id)
+                except Exception:
+                    log.exception("Dashboard refresh failed for guild %s", guild.id)
+            await asyncio.sleep(ANALYTICS_REFRESH_S)
+
+    # -------- outbound
+
+    async def post(self, target: discord.abc.Messageable, priority: int, guild_id: int = 0, **kwargs):
+        """`target.send(**kwargs)` through the outbound dispatcher (buckets, priority, guild fairness, 429 retry)."""
+        return await self.outbound.send(guild_id, outbound_route(target), priority, lambda: target.send(**kwargs))
+
+    async def followup(self, interaction: discord.Interaction, content: str | None = None, **kwargs):
+        return await self.post(interaction.followup, PRIORITY_INTERACTION, interaction.guild_id or 0,
+                               content=content, **kwargs)
 
     # -------- internal logging
 
-    async def log_admin(self, guild: discord.Guild, kind: str, detail: Dict[str, Any]):
-        admin_channel = discord.utils.get(guild.text_channels, name="admin-dashboard")
-        if not admin_channel:
+    async def log_admin(self, guild: discord.Guild, kind: str, detail: dict[str, Any]):
+        """Queue an admin-dashboard entry; AuditSink batches delivery."""
+        self.audit_sink.add(guild.id, kind, detail)
+
+    def _audit_embed(self, group: AuditGroup) -> discord.Embed:
+        lines = [json.dumps(d, ensure_ascii=False) for d in group.samples]
+        body = "\n".join(lines)
+        if len(body) > AUDIT_EMBED_JSON_CHARS:
+            body = body[:AUDIT_EMBED_JSON_CHARS - 1] + "…"
+        if group.count == 1:
+            e = themed_embed("Audit", f"{DIVIDER}\n[{group.kind}]\n{DIVIDER}", color=ACCENT_HEX)
+            e.add_field(name="detail_json", value=f"```json\n{body}\n```", inline=False)
+            return e
+        e = themed_embed(f"Audit ×{group.count}", f"{DIVIDER}\n[{group.kind}] ×{group.count}\n{DIVIDER}",
+                         color=ACCENT_HEX)
+        more = group.count - len(group.samples)
+        e.add_field(name="samples" + (f" (+{more} more)" if more else ""), value=f"```json\n{body}\n```", inline=False)
+        return e
+
+    async def _deliver_audit(self, guild_id: int, groups: list[AuditGroup]):
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return
+        async def create():
             overwrites = {
                 guild.default_role: discord.PermissionOverwrite(view_channel=False),
                 guild.me.top_role: discord.PermissionOverwrite(view_channel=True)
             }
-            admin_channel = await guild.create_text_channel("admin-dashboard", overwrites=overwrites, reason="Wilhelmina: admin log")
-
-        human = f"[{kind}] {detail}"
-        e = themed_embed("Audit", f"{DIVIDER}\n{human}\n{DIVIDER}", color=ACCENT_HEX)
-        compact = json.dumps(detail, ensure_ascii=False)
-        e.add_field(name="detail_json", value=f"```json\n{compact}\n```", inline=False)
+            return await guild.create_text_channel("admin-dashboard", overwrites=overwrites, reason="Wilhelmina: admin log")
+        admin_channel = await self._get_or_create_entity(guild, "admin", create)
+        embeds = [self._audit_embed(g) for g in groups]
+        if self.webhooks is not None:
+            payload = {"embeds": [e.to_dict() for e in embeds]}
+            for _ in range(2):
+                url = await self._audit_webhook_url(admin_channel)
+                if url is None:
+                    break
+                try:
+                    await self.webhooks.execute(url, payload)
+                    return
+                except WebhookGone:
+                    self._audit_webhooks.pop(admin_channel.id, None)
+                except Exception:
+                    log.warning("Audit webhook failed for guild %s; sending as the bot", guild.id, exc_info=True)
+                    break
         try:
-            await admin_channel.send(embed=e)
+            await self.post(admin_channel, PRIORITY_AUDIT, guild.id, embeds=embeds)
         except discord.HTTPException:
             pass
 
+    async def _audit_webhook_url(self, channel: discord.TextChannel) -> str | None:
+        """Our webhook on the admin channel, found or created once per guild."""
+        url = self._audit_webhooks.get(channel.id)
+        if url:
+            return url
+        try:
+            hook = next((w for w in await channel.webhooks()
+                         if w.name == AUDIT_WEBHOOK_NAME and w.user and w.user.id == self.bot.user.id and w.token), None)
+            hook = hook or await channel.create_webhook(name=AUDIT_WEBHOOK_NAME, reason="Wilhelmina: audit log delivery")
+        except discord.HTTPException:
+            return None
+        self._audit_webhooks[channel.id] = hook.url
+        return hook.url
+
     # -------- ritual persistence (via events)
 
-    async def persist_ritual_state(self, guild_id: int, st: RitualState):
+    # persist_ritual_state, mention_pool and forget_members are shared with services.ritual_sim's SimCog,
+    # so they only touch what RitualHost promises
+    async def persist_ritual_state(self: RitualHost, guild_id: int, st: RitualState):
         detail = {
             "started_at": st.started_at.isoformat(),
             "beats": st.beats,
@@ -508,15 +935,16 @@ class Onboarding(commands.Cog):
             "everyone_count": st.everyone_count,
             "member_mentions_done": st.member_mentions_done,
             "last_everyone_ts": st.last_everyone_ts,
+            "mentioned": sorted(st.mentioned),
             "aborted": st.aborted
         }
-        self.db.log_event(guild_id, None, "ritual_state", detail)
+        await self.db.log_event(guild_id, None, "ritual_state", detail)
 
     async def _maybe_resume_rituals(self):
         await self.bot.wait_until_ready()
         for guild in self.bot.guilds:
             try:
-                events = list(reversed(self.db.list_events(guild.id)))
+                events = list(reversed(await self.db.list_events(guild.id)))
                 last_state = next((e for e in events if e["kind"] == "ritual_state"), None)
                 last_start = next((e for e in events if e["kind"] == "ritual_start"), None)
                 ended_or_aborted = next((e for e in events if e["kind"] in ("ritual_end", "ritual_abort")), None)
@@ -534,21 +962,73 @@ class Onboarding(commands.Cog):
                                 everyone_count=state_json["everyone_count"],
                                 member_mentions_done=state_json["member_mentions_done"],
                                 last_everyone_ts=state_json["last_everyone_ts"],
+                                mentioned=set(state_json.get("mentioned", [])),
                                 aborted=False
                             )
-                            circle = await self._get_or_create_circle(guild)
-                            task = asyncio.create_task(self.rituals._runner(guild, circle, st))
-                            st.task = task
-                            self.rituals.states[guild.id] = st
+                            if not await self.rituals.claim(guild.id):
+                                continue  # another node still holds it
+                            self.rituals.resume(st)
                             await self.log_admin(guild, "ritual_resume", {"next_index": st.next_index})
             except Exception:
                 continue
 
+    async def _ritual_lease_loop(self):
+        while True:
+            await asyncio.sleep(RITUAL_LEASE_RENEW_S)
+            try:
+                await self.rituals.renew_leases()
+            except Exception:
+                log.exception("Ritual lease renewal failed")
+
+    async def mention_pool(self: RitualHost, guild: discord.Guild) -> EligibleSet:
+        """Ritual-mention candidates; the guild is chunked on first need, then listeners keep the set."""
+        idx = self.members.peek(guild.id)
+        if idx is None:
+            members = await self.chunker.members(guild)
+            idx = self.members.get(guild.id, lambda: [m.id for m in members if mention_eligible(m)])
+        return idx
+
+    def forget_members(self: RitualHost, guild_id: int):
+        # Without a member cache, role changes of uncached members raise no events,
+        # so the set is only trusted for one ritual and refetched for the next.
+        if not self.chunker.cache:
+            self.members.invalidate(guild_id)
+
     # -------- permissions & channels scaffold
 
+    async def _entity(self, guild: discord.Guild, key: str):
+        """Resolve a logical entity by cached id; one name scan on a cold miss."""
+        if not self.entities.seeded(guild.id):
+            cfg = await self.db.get_guild_config(guild.id) or {}
+            self.entities.seed(guild.id, {k: cfg.get(col) for k, col in ENTITY_CONFIG_COLUMNS.items()})
+        kind, name = ENTITIES[key]
+        eid = self.entities.get(guild.id, key)
+        if eid == MISSING:
+            return None
+        obj = None
+        if eid:
+            obj = guild.get_role(eid) if kind == "role" else guild.get_channel(eid)
+        if obj is None:
+            pool = guild.roles if kind == "role" else guild.categories if kind == "category" else guild.text_channels
+            obj = discord.utils.get(pool, name=name)
+            self.entities.set(guild.id, key, obj.id if obj else None)
+        return obj
+
+    async def _get_or_create_entity(self, guild: discord.Guild, key: str, create):
+        obj = await self._entity(guild, key)
+        if obj is not None:
+            return obj
+        async with self.entities.lock(guild.id, key):
+            obj = await self._entity(guild, key)
+            if obj is None:
+                obj = await create()
+                self.entities.set(guild.id, key, obj.id)
+        return obj
+
     async def _get_or_create_signed_role(self, guild: discord.Guild) -> discord.Role:
-        role = discord.utils.get(guild.roles, name=SIGNED_ROLE_NAME)
-        if role: return role
+        return await self._get_or_create_entity(guild, "signed", lambda: self._create_signed_role(guild))
+
+    async def _create_signed_role(self, guild: discord.Guild) -> discord.Role:
         role = await guild.create_role(name=SIGNED_ROLE_NAME, colour=discord.Colour(PRIMARY_HEX), reason="Wilhelmina: Signed role")
         try:
             await role.edit(position=min(guild.me.top_role.position - 1, len(guild.roles)-1))
@@ -560,202 +1040,455 @@ class Onboarding(commands.Cog):
         return role
 
     async def _get_or_create_circle(self, guild: discord.Guild) -> discord.TextChannel:
-        ch = discord.utils.get(guild.text_channels, name="⛧-000 ⛧-summoning-circle")
-        if ch: return ch
+        return await self._get_or_create_entity(guild, "circle", lambda: self._create_circle(guild))
+
+    async def _create_circle(self, guild: discord.Guild) -> discord.TextChannel:
         overwrites = {
             guild.default_role: discord.PermissionOverwrite(view_channel=True, send_messages=False),
             guild.me.top_role:  discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_messages=True, create_public_threads=True, create_private_threads=True),
             guild.me:           discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_messages=True, create_public_threads=True, create_private_threads=True),
         }
-        ch = await guild.create_text_channel("⛧-000 ⛧-summoning-circle", overwrites=overwrites, reason="Wilhelmina: summoning circle")
-        return ch
+        return await guild.create_text_channel("⛧-000 ⛧-summoning-circle", overwrites=overwrites, reason="Wilhelmina: summoning circle")
 
-    async def _ensure_layout(self, guild: discord.Guild) -> Tuple[discord.TextChannel, discord.TextChannel, discord.Role]:
-        archive_cat = discord.utils.get(guild.categories, name=ARCHIVE_CATEGORY_NAME)
-        if not archive_cat:
-            archive_cat = await guild.create_category(ARCHIVE_CATEGORY_NAME, reason="Wilhelmina: archive")
-            overwrites = {
-                guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                guild.me.top_role:  discord.PermissionOverwrite(view_channel=True)
-            }
-            await guild.create_text_channel(ARCHIVE_DUMMY_CHANNEL, category=archive_cat, overwrites=overwrites)
+    async def _create_archive(self, guild: discord.Guild) -> discord.CategoryChannel:
+        cat = await guild.create_category(ARCHIVE_CATEGORY_NAME, reason="Wilhelmina: archive")
+        overwrites = {
+            guild.default_role: discord.PermissionOverwrite(view_channel=False),
+            guild.me.top_role:  discord.PermissionOverwrite(view_channel=True)
+        }
+        await guild.create_text_channel(ARCHIVE_DUMMY_CHANNEL, category=cat, overwrites=overwrites)
+        return cat
 
-        signed = await self._get_or_create_signed_role(guild)
-        circle, admin_ch = None, None
+    async def _get_or_create_archive(self, guild: discord.Guild) -> discord.CategoryChannel:
+        return await self._get_or_create_entity(guild, "archive", lambda: self._create_archive(guild))
 
-        for name, meta in CHANNELS_ORDERED:
-            ch = discord.utils.get(guild.text_channels, name=name)
-            if ch:
-                if meta.get("key") == "circle": circle = ch
-                if meta.get("key") == "admin":  admin_ch = ch
-                continue
-            overwrites = {}
-            if name == "⛧-000 ⛧-summoning-circle":
-                overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=True, send_messages=False)
-            else:
-                overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=False, send_messages=False)
-            if meta.get("read_only"):
-                overwrites[signed] = discord.PermissionOverwrite(view_channel=True, send_messages=False)
-            else:
-                overwrites[signed] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
-            if meta.get("admin_only"):
-                overwrites[signed] = discord.PermissionOverwrite(view_channel=False)
-                overwrites[guild.me.top_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_webhooks=True)
-            ch = await guild.create_text_channel(name, overwrites=overwrites, reason="Wilhelmina: layout")
-            if meta.get("key") == "circle": circle = ch
-            if meta.get("key") == "admin":  admin_ch = ch
+    async def _create_layout_channel(self, guild: discord.Guild, name: str, meta: dict[str, Any]):
+        if discord.utils.get(guild.text_channels, name=name):
+            raise StepSkipped
+        signed = await self._get_or_create_signed_role(guild)
+        overwrites = {}
+        if name == "⛧-000 ⛧-summoning-circle":
+            overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=True, send_messages=False)
+        else:
+            overwrites[guild.default_role] = discord.PermissionOverwrite(view_channel=False, send_messages=False)
+        if meta.get("read_only"):
+            overwrites[signed] = discord.PermissionOverwrite(view_channel=True, send_messages=False)
+        else:
+            overwrites[signed] = discord.PermissionOverwrite(view_channel=True, send_messages=True)
+        if meta.get("admin_only"):
+            overwrites[signed] = discord.PermissionOverwrite(view_channel=False)
+            overwrites[guild.me.top_role] = discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_webhooks=True)
+        ch = await guild.create_text_channel(name, overwrites=overwrites, reason="Wilhelmina: layout")
+        if meta.get("key") in ENTITIES:
+            self.entities.set(guild.id, meta["key"], ch.id)
+
+    async def plan_layout(self, guild: discord.Guild) -> Plan:
+        """Everything a takeover would do to `guild` right now, as provisioning steps."""
+        steps: list[Step] = []
+        archive_cat = await self._entity(guild, "archive")
+        if archive_cat is None:
+            steps.append(Step("archive_category", "archive_category", LAYOUT_PHASE_SCAFFOLD, ARCHIVE_CATEGORY_NAME))
+        if await self._entity(guild, "signed") is None:
+            steps.append(Step("signed_role", "signed_role", LAYOUT_PHASE_SCAFFOLD, SIGNED_ROLE_NAME))
+
+        current = {c.name for c in guild.text_channels}
+        for i, (name, _) in enumerate(CHANNELS_ORDERED):
+            if name not in current:
+                steps.append(Step(f"create:{name}", "create_channel", LAYOUT_PHASE_CREATE + i, name, {"name": name}))
 
         # Move everything old (text/voice/forum/media) to Archive
         our_names = {n for n, _ in CHANNELS_ORDERED}
-        for ch in guild.text_channels:
-            if ch.category and ch.category.id == archive_cat.id: continue
-            if ch.name in our_names: continue
-            try: await ch.edit(category=archive_cat, reason="Wilhelmina: archive (text)")
-            except discord.HTTPException: pass
-        for ch in guild.voice_channels:
-            if ch.category and ch.category.id == archive_cat.id: continue
-            try: await ch.edit(category=archive_cat, reason="Wilhelmina: archive (voice)")
-            except discord.HTTPException: pass
-        for ch in getattr(guild, "forums", []):
-            if ch.category and ch.category.id == archive_cat.id: continue
-            try: await ch.edit(category=archive_cat, reason="Wilhelmina: archive (forum)")
-            except Exception: pass
-        for ch in getattr(guild, "media_channels", []):
-            if ch.category and ch.category.id == archive_cat.id: continue
-            try: await ch.edit(category=archive_cat, reason="Wilhelmina: archive (media)")
-            except Exception: pass
+        archive_id = archive_cat.id if archive_cat else None
+        moving: set[int] = set()
+        for kind, channels in (("text", guild.text_channels), ("voice", guild.voice_channels),
+                               ("forum", getattr(guild, "forums", [])),
+                               ("media", getattr(guild, "media_channels", []))):
+            for ch in channels:
+                if ch.category_id is not None and ch.category_id == archive_id:
+                    continue
+                if kind == "text" and ch.name in our_names:
+                    continue
+                moving.add(ch.id)
+                steps.append(Step(f"archive:{ch.id}", "archive", LAYOUT_PHASE_ARCHIVE, ch.name,
+                                  {"channel_id": ch.id, "kind": kind}))
         for cat in guild.categories:
-            if cat.id == archive_cat.id: continue
-            if not cat.channels:
-                try: await cat.delete(reason="Wilhelmina: removed empty category after archive")
-                except discord.HTTPException: pass
-
-        circle = circle or await self._get_or_create_circle(guild)
-        admin_ch = admin_ch or discord.utils.get(guild.text_channels, name="admin-dashboard")
-        self.db.upsert_guild_config(guild.id, signed_role_id=signed.id, circle_channel_id=circle.id,
-                                    admin_log_channel_id=admin_ch.id if admin_ch else None, tz=TZ_DEFAULT)
+            if cat.id == archive_id:
+                continue
+            if all(c.id in moving for c in cat.channels):
+                steps.append(Step(f"prune:{cat.id}", "prune_category", LAYOUT_PHASE_PRUNE, cat.name,
+                                  {"category_id": cat.id}))
+        return Plan(guild.id, steps)
+
+    async def _run_layout_step(self, guild: discord.Guild, plan: Plan, step: Step):
+        if step.op == "archive_category":
+            await self._get_or_create_archive(guild)
+        elif step.op == "signed_role":
+            await self._get_or_create_signed_role(guild)
+        elif step.op == "create_channel":
+            await self._create_layout_channel(guild, step.args["name"], dict(CHANNELS_ORDERED)[step.args["name"]])
+        elif step.op == "archive":
+            archive_cat = await self._get_or_create_archive(guild)
+            ch = guild.get_channel(step.args["channel_id"])
+            if ch is None or ch.category_id == archive_cat.id:
+                raise StepSkipped
+            await ch.edit(category=archive_cat, reason=f"Wilhelmina: archive ({step.args['kind']})")
+        elif step.op == "prune_category":
+            cat = guild.get_channel(step.args["category_id"])
+            # the cache may not have seen our own moves yet, so judge emptiness by the plan
+            moved = {s.args["channel_id"] for s in plan.by_op("archive") if s.status in (DONE, SKIPPED)}
+            if cat is None or any(c.id not in moved for c in cat.channels):
+                raise StepSkipped
+            await cat.delete(reason="Wilhelmina: removed empty category after archive")
+        else:
+            raise ValueError(f"unknown provisioning op {step.op!r}")
+
+    async def _bulk_archive(self, guild: discord.Guild, steps: list[Step]):
+        """Move the channels of many archive steps in as few bulk requests as possible."""
+        archive_cat = await self._get_or_create_archive(guild)
+        moves = []
+        for step in steps:
+            ch = guild.get_channel(step.args["channel_id"])
+            if ch is None or ch.category_id == archive_cat.id:
+                step.status = SKIPPED
+            else:
+                moves.append(step)
+        for part in chunk(moves, BULK_MOVE_MAX):
+            await self._bulk_move(guild, archive_cat.id, part)
+
+    async def _bulk_move(self, guild: discord.Guild, parent_id: int, steps: list[Step]):
+        payload = [{"id": s.args["channel_id"], "parent_id": parent_id, "lock_permissions": False} for s in steps]
+        try:
+            # PATCH /guilds/{id}/channels; discord.py has no public wrapper that takes parent_id
+            await guild._state.http.bulk_channel_update(guild.id, payload, reason="Wilhelmina: archive")
+        except discord.HTTPException as e:
+            if send_retry_after(e) is not None:
+                raise  # the engine waits and hands us the still-pending steps again
+            if len(steps) <= BULK_MOVE_SPLIT_MIN:
+                return  # left pending: moved one by one
+            mid = len(steps) // 2
+            await self._bulk_move(guild, parent_id, steps[:mid])
+            await self._bulk_move(guild, parent_id, steps[mid:])
+            return
+        finally:
+            self.layout_requests += 1
+        for s in steps:
+            s.status = DONE
+
+    async def _ensure_layout(self, guild: discord.Guild, plan: Plan | None = None,
+                             progress: Callable[[Plan], Any] | None = None
+                             ) -> tuple[discord.TextChannel, discord.TextChannel, discord.Role]:
+        """Run a takeover plan (a fresh one unless given), checkpointing to storage, then record the layout."""
+        async with self._layout_locks.setdefault(guild.id, asyncio.Lock()):
+            plan = plan or await self.plan_layout(guild)
+            if plan.steps:
+                async def save(p: Plan):
+                    await self.db.save_provision_plan(guild.id, p.to_dict())
+                await save(plan)
+                engine = Provisioner(lambda step: self._run_layout_step(guild, plan, step), save,
+                                     batches={"archive": lambda steps: self._bulk_archive(guild, steps)},
+                                     concurrency=PROVISION_CONCURRENCY, retry_after=send_retry_after,
+                                     progress=progress, progress_every_s=PROVISION_PROGRESS_S)
+                bulk_before = self.layout_requests
+                await engine.run(plan)
+                log.info("Takeover of guild %s: %d steps, %d bulk moves, %d single-step calls, %d rate limits",
+                         guild.id, len(plan.steps), self.layout_requests - bulk_before, engine.step_calls,
+                         engine.rate_limited)
+                if plan.complete:
+                    await self.db.clear_provision_plan(guild.id)
+
+            signed = await self._get_or_create_signed_role(guild)
+            circle = await self._get_or_create_circle(guild)
+            admin_ch = await self._entity(guild, "admin")
+            analytics_ch = discord.utils.get(guild.text_channels, name="∴ User Analytics ∴")
+            before = await self.db.get_guild_config(guild.id) or {}
+            await self.db.upsert_guild_config(guild.id, signed_role_id=signed.id, circle_channel_id=circle.id,
+                                        admin_log_channel_id=admin_ch.id if admin_ch else None, tz=TZ_DEFAULT,
+                                        analytics_channel_id=analytics_ch.id if analytics_ch else None)
+        # the kiosk only needs (re)posting for a new circle or when there never was one
+        if before.get("circle_channel_id") != circle.id or not before.get("kiosk_message_id"):
+            try:
+                await self.ensure_kiosk(guild, refresh=True)
+            except discord.HTTPException as e:
+                log.warning("Could not post the contract kiosk in guild %s: %s", guild.id, e)
         return circle, admin_ch, signed
 
+    def layout_busy(self, guild_id: int) -> bool:
+        lock = self._layout_locks.get(guild_id)
+        return lock is not None and lock.locked()
+
     # -------- contract workflow
 
-    async def send_contract(self, member: discord.Member):
+    async def queue_contract(self, member: discord.Member) -> bool:
+        """Queue a contract delivery; False if one is already pending for this member."""
+        if self.contracts.queued(member.guild.id, member.id):
+            return self.contracts.add(member.guild.id, member.id, member)
+        await self.db.enqueue_contract(member.guild.id, member.id)
+        return self.contracts.add(member.guild.id, member.id, member)
+
+    async def _restore_contracts(self):
+        await self.bot.wait_until_ready()
+        restored = await self._queue_stored_contracts()
+        if restored:
+            log.info("Restored %d queued contract deliveries", restored)
+
+    async def _queue_stored_contracts(self) -> int:
+        queued = 0
+        for row in await self.db.pending_contracts():
+            if self.bot.get_guild(row["guild_id"]) is not None:  # other guilds belong to other nodes
+                queued += self.contracts.add(row["guild_id"], row["user_id"])
+        return queued
+
+    async def _deliver_contract(self, guild_id: int, user_id: int, member: discord.Member | None) -> str | None:
+        guild = self.bot.get_guild(guild_id)
+        if guild is None:
+            return None
+        member = member or guild.get_member(user_id)
+        if member is None:
+            try:
+                member = await guild.fetch_member(user_id)
+            except discord.NotFound:
+                return None
+        return await self.send_contract(member)
+
+    async def send_contract(self, member: discord.Member) -> str:
+        """Deliver the contract by DM, else point at the circle's kiosk; returns the path used."""
         lang = self.lang
         e = themed_embed("Soul Contract", f"{DIVIDER}\n{lang['contract']['prompt_name']}\n{lang['contract']['prompt_birthdate']}\n{DIVIDER}")
-        view = ContractView(self, member)
+        view = ContractView(member)
 
         try:
+            await self.contracts.pace("dm")
             dm = await member.create_dm()
-            await dm.send(embed=e, view=view)
-            self.db.log_event(member.guild.id, member.id, "contract_sent", {"via": "dm"})
-            await self.log_admin(member.guild, "contract_sent", {"user_id": member.id, "via": "dm"})
-            return
+            await self.post(dm, PRIORITY_CONTRACT, member.guild.id, embed=e, view=view)
+            via, detail = "dm", {}
         except discord.Forbidden:
-            pass
-
-        circle = await self._get_or_create_circle(member.guild)
-        try:
-            th = await circle.create_thread(name=f"seal-{member.name}-{member.id}",
-                                            type=discord.ChannelType.private_thread, invitable=False)
-            await th.add_user(member)
-            await th.send(embed=e, view=view)
-            self.db.log_event(member.guild.id, member.id, "contract_sent", {"via": "private_thread", "thread_id": th.id})
-            await self.log_admin(member.guild, "contract_sent", {"user_id": member.id, "via": "private_thread", "thread_id": th.id})
-        except discord.HTTPException:
+            # DMs closed: no per-member thread or channel, the kiosk already serves everyone
+            via, detail = "kiosk", {"message_id": await self.ensure_kiosk(member.guild)}
+        await self.db.log_event(member.guild.id, member.id, "contract_sent", {"via": via, **detail})
+        await self.log_admin(member.guild, "contract_sent", {"user_id": member.id, "via": via, **detail})
+        return via
+
+    def kiosk_embed(self) -> discord.Embed:
+        c = self.lang["contract"]
+        kiosk = c.get("kiosk") or DEFAULT_LANG["contract"]["kiosk"]
+        return themed_embed("Soul Contract", f"{DIVIDER}\n{kiosk}\n\n{c['prompt_name']}\n{c['prompt_birthdate']}\n{DIVIDER}")
+
+    async def ensure_kiosk(self, guild: discord.Guild, refresh: bool = False) -> int:
+        """Id of the guild's kiosk message; edits it in place (or posts a new one) on first use or `refresh`."""
+        mid = self._kiosks.get(guild.id)
+        if mid and not refresh:
+            return mid
+        async with self.entities.lock(guild.id, "kiosk"):
+            mid = self._kiosks.get(guild.id)
+            if mid and not refresh:
+                return mid
+            circle = await self._get_or_create_circle(guild)
+            cfg = await self.db.get_guild_config(guild.id) or {}
+            view = ContractKioskView(self)
+            if cfg.get("kiosk_message_id"):
+                try:
+                    await circle.get_partial_message(cfg["kiosk_message_id"]).edit(embed=self.kiosk_embed(), view=view)
+                    self._kiosks[guild.id] = cfg["kiosk_message_id"]
+                    return cfg["kiosk_message_id"]
+                except discord.NotFound:
+                    pass
+            msg = await self.post(circle, PRIORITY_CONTRACT, guild.id, embed=self.kiosk_embed(), view=view)
             try:
-                temp_cat = discord.utils.get(member.guild.categories, name="⛧-temp-seal")
-                if not temp_cat:
-                    temp_cat = await member.guild.create_category(
-                        "⛧-temp-seal", reason="Wilhelmina: contract fallback",
-                        overwrites={
-                            member.guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                            member.guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
-                        })
-                overwrites = {
-                    member.guild.default_role: discord.PermissionOverwrite(view_channel=False),
-                    member: discord.PermissionOverwrite(view_channel=True, send_messages=True),
-                    member.guild.me: discord.PermissionOverwrite(view_channel=True, send_messages=True, manage_channels=True)
-                }
-                chan = await member.guild.create_text_channel(f"seal-{member.id}", category=temp_cat, overwrites=overwrites)
-                await chan.send(content=member.mention, embed=e, view=view)
-                self.db.log_event(member.guild.id, member.id, "contract_sent", {"via": "temp_channel", "channel_id": chan.id})
-                await self.log_admin(member.guild, "contract_sent", {"user_id": member.id, "via": "temp_channel", "channel_id": chan.id})
-            except Exception:
-                await circle.send(content=member.mention, embed=e)
-                self.db.log_event(member.guild.id, member.id, "contract_sent", {"via": "circle"})
-                await self.log_admin(member.guild, "contract_sent", {"user_id": member.id, "via": "circle"})
-
-    async def complete_contract(self, guild: discord.Guild, user: discord.Member, chosen_name: str, birthdate: str,
-                                respond: discord.InteractionResponse):
-        role = await self._get_or_create_signed_role(guild)
-        try:
-            await user.add_roles(role, reason="Wilhelmina: contract signed")
-        except discord.HTTPException:
-            pass
-
+                await msg.pin(reason="Wilhelmina: contract kiosk")
+            except discord.HTTPException:
+                pass
+            await self.db.upsert_guild_config(guild.id, kiosk_message_id=msg.id)
+            self._kiosks[guild.id] = msg.id
+            return msg.id
+
+    def has_signed_role(self, member: discord.Member) -> bool:
+        """From the member's roles alone: no storage, no REST."""
+        rid = self.entities.get(member.guild.id, "signed")
+        if rid:
+            return member.get_role(rid) is not None
+        return discord.utils.get(member.roles, name=SIGNED_ROLE_NAME) is not None
+
+    async def decline_contract(self, member: discord.Member, respond: discord.InteractionResponse, ephemeral: bool = False):
+        rude_lines = (self.lang.get("contract", {}).get("decline", {}) or {}).get("rude", []) or DEFAULT_LANG["contract"]["decline"]["rude"]
+        await respond.send_message(embed=themed_embed("Declined", random.choice(rude_lines)), ephemeral=ephemeral)
+        self.effects.spawn("contract_declined", log=Once(lambda: self._log_both(member.guild, member.id, "contract_declined",
+                                                                               {"user_id": member.id})))
+
+    async def _log_both(self, guild: discord.Guild, actor_id: int | None, kind: str, detail: dict[str, Any]):
+        await self.db.log_event(guild.id, actor_id, kind, detail)
+        await self.log_admin(guild, kind, detail)
+
+    async def complete_contract(self, interaction: discord.Interaction, user: discord.Member, chosen_name: str,
+                                birthdate: str):
+        """Bind a soul ID and answer; the role grant, announcement and logging follow as side effects."""
+        guild = user.guild
         now = dt.datetime.utcnow()
-        sid = mint_soul_id(chosen_name, now)
-        serial = self.db.get_and_inc_serial(guild.id)
-        sid = with_serial(sid, serial)
+        sid = ""
 
-        self.db.upsert_member(guild.id, user.id, chosen_name=chosen_name, birthdate=birthdate,
-                              signed_at=now.isoformat(), soul_id=sid)
+        resealed = False
 
-        lang = self.lang
-        dm_text = (lang["contract"].get("signed_dm") or DEFAULT_LANG["contract"]["signed_dm"]).format(soul_id=sid)
-        await respond.send_message(embed=themed_embed("Seal Granted", dm_text, color=ACCENT2_HEX), ephemeral=True)
+        async def seal() -> dict[str, Any]:
+            nonlocal sid, resealed
+            row = await self.db.get_member(guild.id, user.id)
+            if row and row.get("signed_at") and row.get("soul_id"):
+                # signed before (e.g. by DM and again at the kiosk): keep the ID, just restore the role
+                sid, resealed = row["soul_id"], True
+            else:
+                sid = await self._bind_soul_id(guild, user, chosen_name, birthdate, now)
+            text = (self.lang["contract"].get("signed_dm") or DEFAULT_LANG["contract"]["signed_dm"]).format(soul_id=sid)
+            return {"embed": themed_embed("Seal Granted", text, color=ACCENT2_HEX)}
+
+        if not await fast_reply(interaction, seal(), ephemeral=True):
+            return  # nothing was bound, so there is nothing to follow up on
+        if resealed:
+            self.effects.spawn("contract_resealed", role=lambda: self._grant_signed_role(guild, user))
+            return
+        self.effects.spawn("contract_signed",
+                           role=lambda: self._grant_signed_role(guild, user),
+                           announce=Once(lambda: self._announce_signed(guild, user)),
+                           log=Once(lambda: self._log_signed(guild, user, sid, now)))
+
+    async def _bind_soul_id(self, guild: discord.Guild, user: discord.Member, chosen_name: str, birthdate: str,
+                            now: dt.datetime) -> str:
+        for attempt in range(SOUL_ID_MINT_ATTEMPTS):
+            sid = with_serial(mint_soul_id(chosen_name, now), await self.serials.next(guild.id))
+            try:
+                await self.db.upsert_member(guild.id, user.id, chosen_name=chosen_name, birthdate=birthdate,
+                                      signed_at=now.isoformat(), soul_id=sid)
+                return sid
+            except DuplicateKey:
+                if attempt == SOUL_ID_MINT_ATTEMPTS - 1:
+                    raise
+        raise RuntimeError("unreachable: the last attempt re-raises")
+
+    async def _grant_signed_role(self, guild: discord.Guild, user: discord.Member):
+        role = await self._get_or_create_signed_role(guild)
+        await user.add_roles(role, reason="Wilhelmina: contract signed")
 
-        pub_text = (lang["contract"].get("signed_public") or DEFAULT_LANG["contract"]["signed_public"]).format(user_id=user.id)
+    async def _announce_signed(self, guild: discord.Guild, user: discord.Member):
+        pub_text = (self.lang["contract"].get("signed_public") or DEFAULT_LANG["contract"]["signed_public"]).format(user_id=user.id)
         circle = await self._get_or_create_circle(guild)
-        await circle.send(embed=themed_embed("Seal Granted", f"{DIVIDER}\n{pub_text}\n{DIVIDER}", color=ACCENT2_HEX))
-
-        self.db.log_event(guild.id, user.id, "contract_signed", {"user_id": user.id, "soul_id": sid})
+        await self.post(circle, PRIORITY_ANNOUNCE, guild.id,
+                        embed=themed_embed("Seal Granted", f"{DIVIDER}\n{pub_text}\n{DIVIDER}", color=ACCENT2_HEX))
+
+    async def _log_signed(self, guild: discord.Guild, user: discord.Member, sid: str, now: dt.datetime):
+        signed_detail: dict[str, Any] = {"user_id": user.id, "soul_id": sid}
+        sent = await self.db.last_contract_sent(guild.id, user.id)
+        if sent:
+            signed_detail["via"] = json.loads(sent["detail_json"] or "{}").get("via")
+            signed_detail["sign_latency_s"] = round((now - dt.datetime.fromisoformat(sent["ts"])).total_seconds(), 1)
+        await self.db.log_event(guild.id, user.id, "contract_signed", signed_detail)
         await self.log_admin(guild, "contract_signed", {"user_id": user.id, "soul_id": sid})
 
-        # Cleanup temp private channel if used
-        try:
-            temp_cat = discord.utils.get(guild.categories, name="⛧-temp-seal")
-            if temp_cat:
-                for ch in list(temp_cat.channels):
-                    if ch.name == f"seal-{user.id}":
-                        await ch.delete(reason="Wilhelmina: contract complete cleanup")
-                if not temp_cat.channels:
-                    await temp_cat.delete(reason="Wilhelmina: cleanup empty temp-seal category")
-        except Exception:
-            pass
-
     # -------- listeners
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
+        self.members.update(member.guild.id, member.id, mention_eligible(member))
+        await self.db.log_event(member.guild.id, member.id, "member_join", {})
         if is_admin(member):
             try:
-                await member.send(embed=themed_embed("Bypass", "You are exempt by Discord law; the gate is ceremonial for you."))
+                await self.post(member, PRIORITY_CONTRACT, member.guild.id,
+                                embed=themed_embed("Bypass", "You are exempt by Discord law; the gate is ceremonial for you."))
             except discord.Forbidden:
                 pass
-            self.db.log_event(member.guild.id, member.id, "admin_bypass", {})
+            await self.db.log_event(member.guild.id, member.id, "admin_bypass", {})
             await self.log_admin(member.guild, "admin_bypass", {"user_id": member.id})
             return
-        await self.send_contract(member)
+        await self.queue_contract(member)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload: discord.RawMemberRemoveEvent):
+        # raw: fires for members the client never cached (MEMBER_CACHE=minimal)
+        self.members.update(payload.guild_id, payload.user.id, False)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.roles != after.roles:
+            self.members.update(after.guild.id, after.id, mention_eligible(after))
+
+    @staticmethod
+    def _entity_kind(obj) -> str | None:
+        if isinstance(obj, discord.Role):
+            return "role"
+        if isinstance(obj, discord.CategoryChannel):
+            return "category"
+        if isinstance(obj, discord.TextChannel):
+            return "text"
+        return None
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        kind = self._entity_kind(channel)
+        if kind:
+            self.entities.on_create(channel.guild.id, kind, channel.id, channel.name)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        kind = self._entity_kind(after)
+        if kind and before.name != after.name:
+            self.entities.on_update(after.guild.id, kind, after.id, after.name)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        self.entities.on_delete(channel.guild.id, channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self.entities.on_create(role.guild.id, "role", role.id, role.name)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            self.entities.on_update(after.guild.id, "role", after.id, after.name)
+        if before.permissions.administrator != after.permissions.administrator:
+            # who counts as admin changed for everyone holding the role; rebuild lazily
+            self.members.invalidate(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self.entities.on_delete(role.guild.id, role.id)
+        if role.permissions.administrator:
+            self.members.invalidate(role.guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.entities.forget_guild(guild.id)
+        self._kiosks.pop(guild.id, None)
+        self.members.invalidate(guild.id)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        if payload.guild_id and self._kiosks.get(payload.guild_id) == payload.message_id:
+            del self._kiosks[payload.guild_id]  # the next closed-DM delivery posts a fresh kiosk
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        # Delete any interruptions in the circle during ritual (bots included), but not Wilhelmina
+        # Delete any interruptions in the circle during ritual (bots included), but not Wilhelmina.
+        # Runs for every message the bot sees: one set lookup, nothing else, outside live circles.
+        if message.channel.id not in self.rituals.live_circles:
+            return
         if message.author.id == self.bot.user.id:
             return
-        if not isinstance(message.channel, discord.TextChannel):
+        self.purges.add(message.guild.id, message.channel.id, message.id, message.author.id)
+
+    async def _purge_circle(self, guild_id: int, channel_id: int, items: list[PurgeItem]):
+        """Bulk-delete one batch of circle interruptions and record it as a single event."""
+        guild = self.bot.get_guild(guild_id)
+        channel = guild.get_channel(channel_id) if guild else None
+        if channel is None:
             return
-        st = self.rituals.active(message.guild.id)
-        if not st:
+        targets = [discord.Object(id=mid) for mid, _ in items]
+        try:
+            await self.outbound.send(guild_id, ("bulk-delete", channel_id), PRIORITY_RITUAL,
+                                     lambda: channel.delete_messages(targets, reason="Wilhelmina: ritual in progress"))
+        except discord.HTTPException as e:
+            log.warning("Circle purge of %d messages failed in guild %s: %s", len(items), guild_id, e)
             return
-        cfg = self.db.get_guild_config(message.guild.id)
-        circle_id = cfg and cfg.get("circle_channel_id")
-        if circle_id and message.channel.id == circle_id:
-            try:
-                await message.delete()
-            except discord.HTTPException:
-                pass
-            self.db.log_event(message.guild.id, message.author.id, "circle_interruption_deleted", {"message_id": message.id})
-            await self.log_admin(message.guild, "circle_interruption_deleted", {"user_id": message.author.id, "message_id": message.id})
+        authors = sorted({a for _, a in items})
+        await self.db.log_event(guild_id, None, "circle_interruption_deleted",
+                                {"channel_id": channel_id, "batch": len(items), "authors": len(authors)})
+        await self.log_admin(guild, "circle_interruption_deleted", {"batch": len(items), "user_ids": authors[:10]})
 
     # -------- commands
 
@@ -767,37 +1500,64 @@ class Onboarding(commands.Cog):
             await interaction.response.send_message("Run this in a server.", ephemeral=True)
             return
 
-        current_names = {c.name for c in guild.text_channels}
-        to_create = [n for n, _ in CHANNELS_ORDERED if n not in current_names]
-        our_names = {n for n, _ in CHANNELS_ORDERED}
-        to_archive = [c.name for c in guild.text_channels if c.name not in our_names]
+        if self.layout_busy(guild.id):
+            await interaction.response.send_message("A takeover is already running here.", ephemeral=True)
+            return
+        saved = await self.db.get_provision_plan(guild.id)
+        plan = Plan.from_dict(saved) if saved else await self.plan_layout(guild)
 
         lang = self.lang
-        e = themed_embed(lang["admin"].get("init_preview_title", "Server Takeover Preview"),
-                         f"{DIVIDER}\n**Create:**\n- " + "\n- ".join(to_create or ["(none)"]) +
-                         f"\n\n**Archive:**\n- " + "\n- ".join(to_archive or ["(none)"]) + f"\n{DIVIDER}")
-        view = ConfirmInitView(self)
+        todo = [s for s in plan.steps if s.status not in (DONE, SKIPPED)]
+        create = [s.label for s in todo if s.phase < LAYOUT_PHASE_ARCHIVE]
+        archive = [s.label for s in todo if s.op == "archive"]
+        prune = [s.label for s in todo if s.op == "prune_category"]
+        desc = f"{DIVIDER}\n"
+        if saved:
+            desc += f"Resuming an interrupted takeover: {plan.finished}/{len(plan.steps)} steps done.\n\n"
+        desc += "**Create:**\n" + _name_list(create) + "\n\n**Archive:**\n" + _name_list(archive)
+        if prune:
+            desc += "\n\n**Remove empty categories:**\n" + _name_list(prune)
+        e = themed_embed(lang["admin"].get("init_preview_title", "Server Takeover Preview"), f"{desc}\n{DIVIDER}")
+        view = ConfirmInitView(self, plan)
         await interaction.response.send_message(embed=e, view=view, ephemeral=True)
 
     @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(in_minutes="Schedule the ritual to begin this many minutes from now")
     @app_commands.command(name="ritual-start", description="Begin the 13-minute summoning ritual.")
-    async def ritual_start(self, interaction: discord.Interaction):
+    async def ritual_start(self, interaction: discord.Interaction,
+                           in_minutes: app_commands.Range[int, 0, RITUAL_SCHEDULE_MAX_MIN] = 0):
         guild = interaction.guild
         if guild is None:
             await interaction.response.send_message("Run this in a server.", ephemeral=True)
             return
-        circle, _, _ = await self._ensure_layout(guild)
+        if self.layout_busy(guild.id):
+            await interaction.response.send_message("A takeover is running here; start the ritual once it finishes.",
+                                                    ephemeral=True)
+            return
+        # the layout check can turn into a full provisioning run; ack before it
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            circle, _, _ = await self._ensure_layout(guild)
+        except Exception:
+            log.exception("Layout check before ritual failed in guild %s", guild.id)
+            await self.followup(interaction, embed=themed_embed("Ritual", "Could not prepare the summoning circle.",
+                                                                color=discord.Color.red().value), ephemeral=True)
+            return
 
         # Preflight: ensure we can moderate & ping @everyone
         me: discord.Member = guild.me
         perms = circle.permissions_for(me)
         missing = []
-        if not perms.manage_messages: missing.append("Manage Messages in summoning-circle")
-        if not perms.send_messages:   missing.append("Send Messages in summoning-circle")
-        if not guild.me.guild_permissions.mention_everyone: missing.append("Mention @everyone (server-level)")
+        if not perms.manage_messages:
+            missing.append("Manage Messages in summoning-circle")
+        if not perms.send_messages:
+            missing.append("Send Messages in summoning-circle")
+        if not guild.me.guild_permissions.mention_everyone:
+            missing.append("Mention @everyone (server-level)")
         if missing:
             checklist = "\n- ".join(missing)
-            await interaction.response.send_message(
+            await self.followup(
+                interaction,
                 embed=themed_embed(
                     "Ritual Preflight Failed",
                     f"{DIVIDER}\nGrant the following and retry:\n- {checklist}\n{DIVIDER}",
@@ -809,11 +1569,12 @@ class Onboarding(commands.Cog):
             return
 
         try:
-            await self.rituals.start(guild, circle)
+            await self.rituals.start(guild, circle, delay_s=in_minutes * 60)
         except RuntimeError as e:
-            await interaction.response.send_message(str(e), ephemeral=True)
+            await self.followup(interaction, str(e), ephemeral=True)
             return
-        await interaction.response.send_message(embed=themed_embed("Ritual", "Summoning initialized."), ephemeral=True)
+        msg = "Summoning initialized." if not in_minutes else f"Summoning scheduled in {in_minutes} min."
+        await self.followup(interaction, embed=themed_embed("Ritual", msg), ephemeral=True)
 
     @app_commands.default_permissions(administrator=True)
     @app_commands.command(name="ritual-status", description="Show ritual status and next 3 beats.")
@@ -823,16 +1584,24 @@ class Onboarding(commands.Cog):
             await interaction.response.send_message(embed=themed_embed("Ritual", "No active ritual."), ephemeral=True)
             return
         next_idxs = list(range(st.next_index, min(st.next_index + 3, len(st.beats))))
-        now = dt.datetime.utcnow().timestamp()
+        now = utc_ts()
         t0 = st.started_at.timestamp()
+        due = self.rituals.next_due(st.guild_id)
         lines = []
-        for i in next_idxs:
-            eta = max(0, int(t0 + st.beats[i] - now))
-            lines.append(f"Beat {i+1} in ~{eta}s")
+        if not st.opened and due is not None:
+            lines.append(f"Opening in ~{max(0, int(due - now))}s")
+        for n, i in enumerate(next_idxs):
+            # the scheduler's entry is authoritative for the step actually queued
+            at = due if (n == 0 and st.opened and due is not None) else t0 + st.beats[i]
+            lines.append(f"Beat {i+1} in ~{max(0, int(at - now))}s")
         desc = f"{DIVIDER}\nStarted: {st.started_at.isoformat()}\n" \
                f"Everyone used: {st.everyone_count}/{EVERYONE_MAX_TOTAL}\n" \
                f"Member mentions: {st.member_mentions_done}/{PER_RITUAL_MEMBER_MENTIONS_MAX}\n" \
                f"Next:\n- " + "\n- ".join(lines or ["(none)"]) + f"\n{DIVIDER}"
+        m = self.outbound.metrics.snapshot()
+        ritual_wait = m["wait_ms"].get(PRIORITY_RITUAL, {}).get("avg", 0)
+        desc += f"\nOutbound: {m['sent']} sent, {m['throttled']} held by buckets, {m['rate_limited']} × 429, " \
+                f"ritual queue wait ~{ritual_wait} ms"
         await interaction.response.send_message(embed=themed_embed("Ritual Status", desc), ephemeral=True)
 
     @app_commands.default_permissions(administrator=True)
@@ -842,90 +1611,428 @@ class Onboarding(commands.Cog):
         if guild is None:
             await interaction.response.send_message("Run this in a server.", ephemeral=True)
             return
-        ok = await self.rituals.abort(guild)
+        aborted = False
+
+        async def sever() -> dict[str, Any]:
+            nonlocal aborted
+            aborted = await self.rituals.abort(guild)
+            return {"embed": themed_embed("Ritual", "Aborted." if aborted else "No active ritual.")}
+
+        if not await fast_reply(interaction, sever(), ephemeral=True) or not aborted:
+            return
+        # Prune ritual_state snapshots to avoid growth
+        self.effects.spawn("ritual_aborted",
+                           announce=Once(lambda: self._announce_abort(guild)),
+                           prune=lambda: self.db.prune_ritual_state(guild.id))
+
+    async def _announce_abort(self, guild: discord.Guild):
         msg = self.lang["admin"].get("abort", DEFAULT_LANG["admin"]["abort"])
         circle = await self._get_or_create_circle(guild)
-        if ok:
-            await circle.send(embed=themed_embed("Ritual Severed", f"{DIVIDER}\n{msg}\n{DIVIDER}", color=discord.Color.red().value))
-            await interaction.response.send_message(embed=themed_embed("Ritual", "Aborted."), ephemeral=True)
-            # Prune ritual_state snapshots to avoid growth
-            self.db.prune_ritual_state(guild.id)
-        else:
-            await interaction.response.send_message(embed=themed_embed("Ritual", "No active ritual."), ephemeral=True)
+        await self.post(circle, PRIORITY_RITUAL, guild.id,
+                        embed=themed_embed("Ritual Severed", f"{DIVIDER}\n{msg}\n{DIVIDER}", color=discord.Color.red().value))
 
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(user="User to resend contract to")
     @app_commands.command(name="resend-contract", description="Resend the soul contract to a user.")
     async def resend_contract(self, interaction: discord.Interaction, user: discord.Member):
-        await self.send_contract(user)
-        await interaction.response.send_message(embed=themed_embed("Contract", "Resent."), ephemeral=True)
+        queued = await self.queue_contract(user)
+        await interaction.response.send_message(
+            embed=themed_embed("Contract", "Queued for delivery." if queued else "Already queued."), ephemeral=True)
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.command(name="contract-queue", description="Show contract delivery backlog and latency by path.")
+    async def contract_queue(self, interaction: discord.Interaction):
+        m = self.contracts.metrics.snapshot(self.contracts.depth())
+        kiosk = self._kiosks.get(interaction.guild_id or 0)
+        lines = [f"{path}: {w['n']} sent, avg {w['avg'] / 1000:.1f}s, max {w['max'] / 1000:.1f}s"
+                 for path, w in m["latency_ms"].items()]
+        desc = f"{DIVIDER}\nBacklog: {m['depth']} (all guilds)\n" \
+               f"Delivered: {m['delivered']} · duplicates dropped: {m['deduped']} · retries: {m['retries']} · " \
+               f"failed: {m['failed']} · members gone: {m['dropped']}\n" \
+               f"Paced for rate limits: {m['paced_s']}s\n" \
+               f"This server's kiosk: {f'message {kiosk}' if kiosk else '(not posted since start)'}\n" \
+               f"Latency, join to delivered:\n- " + "\n- ".join(lines or ["(none yet)"]) + f"\n{DIVIDER}"
+        await interaction.response.send_message(embed=themed_embed("Contract Queue", desc), ephemeral=True)
 
     @app_commands.default_permissions(administrator=True)
     @app_commands.describe(user="User to revoke", reason="Optional reason")
     @app_commands.command(name="revoke-contract", description="Revoke a user's signed status and invalidate their ID.")
-    async def revoke_contract(self, interaction: discord.Interaction, user: discord.Member, reason: Optional[str] = None):
+    async def revoke_contract(self, interaction: discord.Interaction, user: discord.Member, reason: str | None = None):
         guild = interaction.guild
-        role = await self._get_or_create_signed_role(guild)
-        try:
+
+        async def unbind() -> dict[str, Any]:
+            await self.db.upsert_member(guild.id, user.id, soul_id=None)
+            return {"embed": themed_embed("Contract", "Revoked.")}
+
+        if not await fast_reply(interaction, unbind(), ephemeral=True):
+            return
+        self.effects.spawn("contract_revoked",
+                           role=lambda: self._revoke_signed_role(guild, user, reason),
+                           log=Once(lambda: self._log_both(guild, interaction.user.id, "contract_revoked",
+                                                           {"user_id": user.id, "reason": reason})))
+
+    async def _revoke_signed_role(self, guild: discord.Guild, user: discord.Member, reason: str | None):
+        role = await self._entity(guild, "signed")
+        if role is not None:
             await user.remove_roles(role, reason=reason or "Wilhelmina: revoke")
-        except discord.HTTPException:
-            pass
-        self.db.upsert_member(guild.id, user.id, soul_id=None)
-        self.db.log_event(guild.id, interaction.user.id, "contract_revoked", {"user_id": user.id, "reason": reason})
-        await self.log_admin(guild, "contract_revoked", {"user_id": user.id, "reason": reason})
-        await interaction.response.send_message(embed=themed_embed("Contract", "Revoked."), ephemeral=True)
 
     @app_commands.default_permissions(administrator=True)
-    @app_commands.describe(format="csv or json", include_audit="Include audit events")
+    @app_commands.describe(kind="Event kind, e.g. contract_signed", actor="Who triggered the event",
+                           user="Member the event is about", since="From (UTC ISO date/time, inclusive)",
+                           until="To (UTC ISO date/time, exclusive)", text="Free-text search in event details")
+    @app_commands.command(name="audit", description="Search the onboarding audit log.")
+    async def audit(self, interaction: discord.Interaction, kind: str | None = None,
+                    actor: discord.User | None = None, user: discord.User | None = None,
+                    since: str | None = None, until: str | None = None, text: str | None = None):
+        guild = interaction.guild
+        if guild is None:
+            await interaction.response.send_message("Run this in a server.", ephemeral=True)
+            return
+        try:
+            since = parse_utc_iso(since) if since else None
+            until = parse_utc_iso(until) if until else None
+        except ValueError:
+            await interaction.response.send_message(
+                embed=themed_embed("Invalid time range", "Use ISO dates, e.g. `2025-10-31` or `2025-10-31T13:00:00`.",
+                                   color=discord.Color.red().value), ephemeral=True)
+            return
+        filters = {"kind": kind, "actor_id": actor.id if actor else None, "user_id": user.id if user else None,
+                   "since": since, "until": until, "text": text}
+
+        async def first_page() -> dict[str, Any]:
+            pager = AuditPager(self, guild.id, interaction.user.id, filters)
+            await pager.load()
+            return {"embed": pager.render(), "view": pager}
+
+        await fast_reply(interaction, first_page(), ephemeral=True)
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(soul_id="Soul ID, e.g. ⛧WLMN-0042-MO25Ψ7⛧")
+    @app_commands.command(name="whois", description="Find the member bound to a Soul ID.")
+    async def whois(self, interaction: discord.Interaction, soul_id: str):
+        sid = normalize_soul_id(soul_id)
+        if sid is None:
+            await interaction.response.send_message(
+                embed=themed_embed("Whois", "That is not a Soul ID.", color=discord.Color.red().value), ephemeral=True)
+            return
+        rec = await self.db.find_by_soul_id(interaction.guild.id, sid)
+        if not rec:
+            await interaction.response.send_message(embed=themed_embed("Whois", f"`{sid}` is bound to no one here."),
+                                                    ephemeral=True)
+            return
+        desc = f"{DIVIDER}\n`{sid}`\nMember: <@{rec['user_id']}>\nChosen name: {rec['chosen_name']}\n" \
+               f"Signed: {rec['signed_at']}\n{DIVIDER}"
+        await interaction.response.send_message(embed=themed_embed("Whois", desc), ephemeral=True)
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(ids="Soul IDs separated by spaces, commas or newlines",
+                           file="Text/CSV file of Soul IDs")
+    @app_commands.command(name="verify-soul-ids", description="Bulk-check Soul IDs against this server's registry.")
+    async def verify_soul_ids(self, interaction: discord.Interaction, ids: str | None = None,
+                              file: discord.Attachment | None = None):
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        blob = ids or ""
+        if file is not None:
+            blob += "\n" + (await file.read()).decode("utf-8", errors="replace")
+        sids, malformed = parse_soul_id_list(blob)
+        found = await self.db.find_soul_ids(interaction.guild.id, sids)
+        unknown = [s for s in sids if s not in found]
+
+        desc = f"{DIVIDER}\nChecked: {len(sids)}\nValid: {len(found)}\nUnknown: {len(unknown)}\n" \
+               f"Malformed: {len(malformed)}\n{DIVIDER}"
+        listed = unknown[:SOUL_ID_VERIFY_MAX_LISTED]
+        if listed:
+            desc += "\n**Unknown:**\n- " + "\n- ".join(f"`{s}`" for s in listed)
+            if len(unknown) > len(listed):
+                desc += f"\n…and {len(unknown) - len(listed)} more (see file)."
+        files = []
+        if len(sids) + len(malformed) > SOUL_ID_VERIFY_MAX_LISTED:
+            writer = PartWriter("soul_id_verification", "csv", ["input", "status", "user_id"])
+            for s in sids:
+                rec = found.get(s)
+                writer.write({"input": s, "status": "valid" if rec else "unknown", "user_id": rec and rec["user_id"]})
+            for t in malformed:
+                writer.write({"input": t, "status": "malformed", "user_id": None})
+            files = [part_file(p) for p in writer.close()]
+        await self.followup(interaction, embed=themed_embed("Soul ID Verification", desc), files=files, ephemeral=True)
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(user="Member whose records to erase", mode="Delete their rows or anonymize them",
+                           include_archive="Also rewrite cold archive segments (slower)")
+    @app_commands.choices(mode=[app_commands.Choice(name="delete", value="delete"),
+                                app_commands.Choice(name="anonymize", value="anonymize")])
+    @app_commands.command(name="erase-member", description="Erase or anonymize a member's stored records.")
+    async def erase_member(self, interaction: discord.Interaction, user: discord.User,
+                           mode: app_commands.Choice[str], include_archive: bool | None = True):
+        guild = interaction.guild
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        anonymize = mode.value == "anonymize"
+        t0 = time.perf_counter()
+        counts = await self.db.erase_member(guild.id, user.id, anonymize=anonymize)
+        live_ms = (time.perf_counter() - t0) * 1000
+        if include_archive:
+            counts["archived"] = await asyncio.to_thread(self.archive.rewrite, guild.id,
+                                                         erasure_transform(user.id, anonymize))
+        detail = {"mode": mode.value, **counts, "live_ms": round(live_ms, 2)}
+        await self.db.log_event(guild.id, interaction.user.id, "member_erased", detail)
+        await self.log_admin(guild, "member_erased", detail)
+        desc = f"{DIVIDER}\nMode: {mode.value}\nMember rows: {counts['members']}\nEvents: {counts['events']}\n" + \
+               (f"Archived rows: {counts['archived']}\n" if include_archive else "") + \
+               f"Live DB: {live_ms:.1f} ms\n{DIVIDER}"
+        await self.followup(interaction, embed=themed_embed("Erasure Complete", desc, color=ACCENT2_HEX), ephemeral=True)
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.command(name="backup-now", description="(Bot owner) Snapshot the database now.")
+    async def backup_now(self, interaction: discord.Interaction):
+        if not await self.bot.is_owner(interaction.user):
+            return await interaction.response.send_message("Only the bot owner can manage backups.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            res = await self.run_backup()
+        except Exception as e:
+            return await self.followup(interaction, f"Backup failed: `{e!r}`", ephemeral=True)
+        desc = f"{DIVIDER}\nFile: `{os.path.basename(res.path)}` ({res.bytes / 1024:.0f} KiB)\n" \
+               f"Took {res.duration_ms / 1000:.1f}s over {res.steps} steps\n" \
+               f"DB locked {res.lock_ms:.0f} ms total, longest step {res.max_step_ms:.1f} ms\n" + \
+               (f"Rotated out: {len(res.removed)}\n" if res.removed else "") + DIVIDER
+        await self.followup(interaction, embed=themed_embed("Backup Complete", desc, color=ACCENT_HEX), ephemeral=True)
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(snapshot="Snapshot file name (see autocomplete)")
+    @app_commands.command(name="restore-backup", description="(Bot owner) Restore the database from a snapshot.")
+    async def restore_backup(self, interaction: discord.Interaction, snapshot: str):
+        if not await self.bot.is_owner(interaction.user):
+            return await interaction.response.send_message("Only the bot owner can manage backups.", ephemeral=True)
+        if snapshot not in list_snapshots(BACKUP_DIR):
+            return await interaction.response.send_message("Unknown snapshot.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        # The backup loop shares _backup_lock; every other loop (rituals, leases, maintenance,
+        # analytics) blocks at its next storage write until the copy is done. Contract workers
+        # are paused outright so no DM goes out for a row the snapshot may not have.
+        self.contracts.pause()
+        try:
+            async with self._backup_lock:
+                # Unused leases would point past the restored counter; drop them rather than hand them back
+                self.serials = SerialAllocator(self.db.lease_serials, self.db.release_serials,
+                                               max_block=SERIAL_LEASE_MAX, hot_window_s=SERIAL_LEASE_HOT_S)
+                try:
+                    await self.db.restore(os.path.join(BACKUP_DIR, snapshot))
+                except Exception as e:
+                    return await self.followup(interaction, f"Restore failed, live DB untouched: `{e!r}`",
+                                               ephemeral=True)
+                await self._after_restore()
+        finally:
+            self.contracts.resume()
+        log.warning("Database restored from %s by %s", snapshot, interaction.user.id)
+        await self.followup(interaction, embed=themed_embed("Restore Complete", f"Restored `{snapshot}`.",
+                                                            color=ACCENT2_HEX), ephemeral=True)
+
+    async def _after_restore(self):
+        """Bring the in-memory state in line with a freshly restored database."""
+        # ids cached from the old DB: re-seeded / re-checked from the restored config on next use
+        self.entities.forget_all()
+        self._kiosks.clear()
+        self._audit_webhooks.clear()
+        # rituals running here are live in Discord; write their state and leases back over the snapshot's
+        for gid, st in list(self.rituals.states.items()):
+            await self.persist_ritual_state(gid, st)
+        await self.rituals.renew_leases()
+        # contracts queued here must survive the next restart; restored rows this node owns are queued too
+        for gid, uid in self.contracts.keys():
+            await self.db.enqueue_contract(gid, uid)
+        await self._queue_stored_contracts()
+
+    @restore_backup.autocomplete("snapshot")
+    async def _snapshot_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=n, value=n) for n in list_snapshots(BACKUP_DIR) if current in n][:25]
+
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.describe(format="csv or json", include_audit="Include audit events",
+                           since_event_id="Only events after this id (delta export)",
+                           since="Only rows added/changed after this UTC ISO timestamp",
+                           resume="Continue from your last export's watermark")
     @app_commands.choices(format=[app_commands.Choice(name="csv", value="csv"),
                                   app_commands.Choice(name="json", value="json")])
     @app_commands.command(name="export-records", description="Export member records (and optionally audit events).")
     async def export_records(self, interaction: discord.Interaction,
                              format: app_commands.Choice[str],
-                             include_audit: Optional[bool] = False):
+                             include_audit: bool | None = False,
+                             since_event_id: int | None = None,
+                             since: str | None = None,
+                             resume: bool | None = False):
         guild = interaction.guild
-        await interaction.response.defer(ephemeral=True)
+        if since:
+            try:
+                since = parse_utc_iso(since)
+            except ValueError:
+                await interaction.response.send_message(
+                    embed=themed_embed("Invalid watermark", "Use an ISO timestamp, e.g. `2025-10-31T00:00:00`.",
+                                       color=discord.Color.red().value), ephemeral=True)
+                return
+        await interaction.response.defer(ephemeral=True, thinking=True)
         fmt = format.value
-        members = self.db.list_members(guild.id)
-
-        if fmt == "json":
-            payload = {"members": members}
-            if include_audit:
-                payload["events"] = self.db.list_events(guild.id)
-            data = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
-            fp = io.BytesIO(data); fp.seek(0)
-            await interaction.followup.send(content="Export ready.", file=discord.File(fp, filename="wilhelmina_export.json"), ephemeral=True)
+
+        # Delta window: (after_id, hi_id] for events, (since, now] for member changes
+        if resume and since_event_id is None and since is None:
+            wm = await self.db.get_export_watermark(guild.id, interaction.user.id)
+            if wm:
+                since_event_id, since = wm["last_event_id"], wm["last_ts"]
+        if since_event_id is not None and since is None:
+            since = await self.db.event_ts(guild.id, since_event_id)
+        delta = since_event_id is not None or since is not None
+        hi_id = await self.db.max_event_id(guild.id)
+        now_ts = dt.datetime.utcnow().isoformat()
+
+        if delta:
+            members = self.db.iter_members(guild.id, changed_after=since or "", changed_upto=now_ts)
         else:
-            out = io.StringIO()
-            writer = csv.DictWriter(out, fieldnames=["guild_id","user_id","chosen_name","birthdate","signed_at","soul_id"])
-            writer.writeheader()
-            for m in members: writer.writerow(m)
-            files = [discord.File(io.BytesIO(out.getvalue().encode("utf-8")), filename="members.csv")]
-            if include_audit:
-                events = self.db.list_events(guild.id)
-                out2 = io.StringIO()
-                ew = csv.DictWriter(out2, fieldnames=["id","guild_id","actor_id","kind","detail_json","ts"])
-                ew.writeheader()
-                for e in events: ew.writerow(e)
-                files.append(discord.File(io.BytesIO(out2.getvalue().encode("utf-8")), filename="events.csv"))
-            await interaction.followup.send(content="Export ready.", files=files, ephemeral=True)
+            members = self.db.iter_members(guild.id)
+        tables = [("members", MEMBER_FIELDS, members)]
+        if include_audit:
+            window: EventWindow = {"after_id": since_event_id or 0, "upto_id": hi_id,
+                                   "since_ts": since if since_event_id is None else None}
+            events = chain_rows(self.archive.aiter_events(guild.id, **window),
+                                self.db.iter_events(guild.id, **window))
+            tables.append(("events", EVENT_FIELDS, events))
+
+        parts: list[ExportPart] = []
+        total = 0
+        try:
+            # both event sources are cut at hi_id, and maintenance waits until they have been read
+            async with self._archive_lock:
+                for stem, fields, rows in tables:
+                    writer = PartWriter(stem, fmt, fields, max_bytes=EXPORT_PART_BYTES)
+                    async for row in rows:
+                        writer.write(row)
+                        total += 1
+                        if total % EXPORT_PROGRESS_ROWS == 0:
+                            await interaction.edit_original_response(content=f"Exporting… {total} rows written.")
+                    parts.extend(writer.close())
+
+            # Discord allows 10 attachments per message
+            batches = list(chunk(parts, 10))
+            for i, batch in enumerate(batches, start=1):
+                label = f"Export ready ({total} rows)." if len(batches) == 1 else f"Export part {i}/{len(batches)} ({total} rows)."
+                if i == len(batches):
+                    label += f"\nWatermark: `since_event_id={hi_id}` `since={now_ts}`"
+                await self.followup(interaction, content=label, ephemeral=True,
+                                    files=[part_file(p) for p in batch])
+        finally:
+            for p in parts:
+                p.fp.close()
+        await self.db.set_export_watermark(guild.id, interaction.user.id, hi_id, now_ts)
+
+# ============= AUDIT PAGER VIEW ===============
+
+class AuditPager(discord.ui.View):
+    """Keyset pagination over Storage.search_events: pages are anchored on event ids, never OFFSET."""
+
+    def __init__(self, cog: Onboarding, guild_id: int, owner_id: int, filters: dict[str, Any], timeout: int = 300):
+        super().__init__(timeout=timeout)
+        self.cog = cog
+        self.guild_id = guild_id
+        self.owner_id = owner_id
+        self.filters = filters
+        self.rows: list[dict[str, Any]] = []
+        self.has_older = self.has_newer = False
+
+    async def load(self, before_id: int | None = None, after_id: int | None = None):
+        rows = await self.cog.db.search_events(self.guild_id, **self.filters, before_id=before_id, after_id=after_id,
+                                         limit=AUDIT_PAGE_SIZE + 1)
+        if after_id is None:
+            self.has_older = len(rows) > AUDIT_PAGE_SIZE
+            self.has_newer = before_id is not None
+            rows = rows[:AUDIT_PAGE_SIZE]
+        else:
+            self.has_newer = len(rows) > AUDIT_PAGE_SIZE
+            self.has_older = True
+            rows = rows[-AUDIT_PAGE_SIZE:]
+        self.rows = rows
+        self.newer.disabled = not self.has_newer
+        self.older.disabled = not self.has_older
+
+    def render(self) -> discord.Embed:
+        lines = []
+        for r in self.rows:
+            actor = f" · <@{r['actor_id']}>" if r["actor_id"] else ""
+            detail = (r["detail_json"] or "")[:AUDIT_DETAIL_CHARS]
+            lines.append(f"`#{r['id']}` {(r['ts'] or '')[:19]} · **{r['kind']}**{actor}\n`{detail}`")
+        e = themed_embed("Audit", "\n".join(lines) or "No matching events.", color=ACCENT_HEX)
+        active = ", ".join(f"{k}={v}" for k, v in self.filters.items() if v is not None)
+        if active:
+            e.add_field(name="Filters", value=active[:1024], inline=False)
+        return e
+
+    async def _flip(self, interaction: discord.Interaction, **cursor):
+        if interaction.user.id != self.owner_id:
+            await interaction.response.send_message("Run /audit yourself to page.", ephemeral=True)
+            return
+        await self.load(**cursor)
+        await interaction.response.edit_message(embed=self.render(), view=self)
+
+    @discord.ui.button(label="◀ Newer", style=discord.ButtonStyle.secondary)
+    async def newer(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._flip(interaction, after_id=self.rows[0]["id"] if self.rows else None)
+
+    @discord.ui.button(label="Older ▶", style=discord.ButtonStyle.secondary)
+    async def older(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._flip(interaction, before_id=self.rows[-1]["id"] if self.rows else None)
 
 # ============= INIT CONFIRM VIEW ==============
 
+def _name_list(names: list[str], limit: int = 20) -> str:
+    if not names:
+        return "- (none)"
+    more = len(names) - limit
+    return "- " + "\n- ".join(names[:limit]) + (f"\n…and {more} more" if more > 0 else "")
+
+def provision_embed(plan: Plan, title: str = "Takeover in progress", color: int = PRIMARY_HEX,
+                    headline: str = "") -> discord.Embed:
+    def tally(op: str) -> str:
+        steps = plan.by_op(op)
+        return f"{sum(1 for s in steps if s.status in (DONE, SKIPPED))}/{len(steps)}"
+    counts = plan.counts()
+    desc = (f"{DIVIDER}\n{headline}Steps: {plan.finished}/{len(plan.steps)}\n"
+            f"Channels created: {tally('create_channel')}\nArchived: {tally('archive')}\n"
+            f"Empty categories removed: {tally('prune_category')}")
+    if counts[FAILED]:
+        desc += f"\nFailed: {counts[FAILED]}"
+    return themed_embed(title, f"{desc}\n{DIVIDER}", color=color)
+
 class ConfirmInitView(discord.ui.View):
-    def __init__(self, cog: Onboarding, timeout: int = 180):
+    def __init__(self, cog: Onboarding, plan: Plan, timeout: int = 180):
         super().__init__(timeout=timeout)
         self.cog = cog
+        self.plan = plan
 
     @discord.ui.button(label="Confirm", style=discord.ButtonStyle.danger)
     async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
-        await interaction.response.defer(ephemeral=True, thinking=True)
         guild = interaction.guild
-        circle, admin_ch, signed = await self.cog._ensure_layout(guild)
-        e = themed_embed("Takeover Complete", f"{DIVIDER}\nChannels created, archive ready, gate enforced.\n{DIVIDER}", color=ACCENT2_HEX)
-        await interaction.followup.send(embed=e, ephemeral=True)
-        self.cog.db.log_event(guild.id, interaction.user.id, "init_complete", {"circle_id": circle.id, "signed_role_id": signed.id})
-        await self.cog.log_admin(guild, "init_complete", {"circle_id": circle.id, "signed_role_id": signed.id})
+        if self.cog.layout_busy(guild.id):
+            await interaction.response.send_message("A takeover is already running here.", ephemeral=True)
+            return
+        self.stop()
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        t0 = time.monotonic()
+        plan = self.plan
+
+        async def progress(p: Plan):
+            await interaction.edit_original_response(embed=provision_embed(p))
+
+        circle, admin_ch, signed = await self.cog._ensure_layout(guild, plan=plan, progress=progress)
+        if plan.complete:
+            e = provision_embed(plan, "Takeover Complete", ACCENT2_HEX,
+                                headline="Channels created, archive ready, gate enforced.\n")
+        else:
+            e = provision_embed(plan, "Takeover Incomplete", discord.Color.red().value)
+            e.add_field(name="Failed steps", value="\n".join(f"{s.label}: {s.error}" for s in plan.failures()[:10])[:1024],
+                        inline=False)
+            e.add_field(name="Next", value="Run /init-server again to retry the failed steps.", inline=False)
+        await interaction.edit_original_response(embed=e)
+        detail = {"circle_id": circle.id, "signed_role_id": signed.id, "steps": len(plan.steps),
+                  "failed": len(plan.failures()), "elapsed_s": round(time.monotonic() - t0, 1)}
+        await self.cog.db.log_event(guild.id, interaction.user.id, "init_complete", detail)
+        await self.cog.log_admin(guild, "init_complete", detail)
 
     @discord.ui.button(label="Cancel", style=discord.ButtonStyle.secondary)
     async def cancel(self, interaction: discord.Interaction, button: discord.ui.Button):
@@ -4,6 +4,7 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from typing import Literal
+from wilhelmina.services.interactions import fast_reply
 from wilhelmina.services.language_engine import get_engine
 
 DICE_CHOICES = [4, 6, 8, 10, 12, 20]
@@ -24,14 +25,19 @@ class Oracles(commands.Cog):
     async def roll(self, interaction: discord.Interaction, dice: app_commands.Choice[int]):
         sides = dice.value
         result = random.randint(1, sides)
-        line = await self.engine.compose(
-            place="embed",
-            intent="roll-line",
-            variables={"sides": sides, "result": result},
-            fallback="The bones clatter; fate approves."
-        )
-        body = f"**You rolled:** d{sides} → **{result}**\n{line}"
-        await interaction.response.send_message(embed=_haunted_embed("Dice Divination", body))
+
+        async def build():
+            line = await self.engine.compose(
+                place="embed",
+                intent="roll-line",
+                variables={"sides": sides, "result": result},
+                fallback="The bones clatter; fate approves."
+            )
+            body = f"**You rolled:** d{sides} → **{result}**\n{line}"
+            return {"embed": _haunted_embed("Dice Divination", body)}
+
+        # the LLM line can outlast Discord's 3 s deadline; fast_reply defers when it does
+        await fast_reply(interaction, build())
 
     @app_commands.command(name="8ball", description="Ask Wilhelmina the eldritch 8-ball.")
     @app_commands.describe(question="What do you seek?")
@@ -42,30 +48,36 @@ class Oracles(commands.Cog):
         elif r < 0.75: verdict = "Vague"
         else: verdict = "Negative"
 
-        line = await self.engine.compose(
-            place="embed",
-            intent="8ball-line",
-            variables={"verdict": verdict, "question": question},
-            fallback={"Affirmative":"Yes—the current runs with you.",
-                      "Vague":"Clouded—the mirror will not settle.",
-                      "Negative":"No—the gate is shut."}[verdict]
-        )
-        body = f"**Question:** {question}\n**Answer:** {line}"
-        await interaction.response.send_message(embed=_haunted_embed("Witch’s 8-Ball", body))
+        async def build():
+            line = await self.engine.compose(
+                place="embed",
+                intent="8ball-line",
+                variables={"verdict": verdict, "question": question},
+                fallback={"Affirmative":"Yes—the current runs with you.",
+                          "Vague":"Clouded—the mirror will not settle.",
+                          "Negative":"No—the gate is shut."}[verdict]
+            )
+            body = f"**Question:** {question}\n**Answer:** {line}"
+            return {"embed": _haunted_embed("Witch’s 8-Ball", body)}
+
+        await fast_reply(interaction, build())
 
     @app_commands.command(name="misfortune-cookie", description="Crack a cursed cookie.")
     async def misfortune_cookie(self, interaction: discord.Interaction):
-        line = await self.engine.compose(
-            place="embed",
-            intent="misfortune-cookie",
-            variables={},
-            fallback=random.choice([
-                "Beware the door that opens by itself.",
-                "Your shadow will learn a new name.",
-                "A promise you forgot did not forget you.",
-            ])
-        )
-        await interaction.response.send_message(embed=_haunted_embed("Misfortune Cookie", line))
+        async def build():
+            line = await self.engine.compose(
+                place="embed",
+                intent="misfortune-cookie",
+                variables={},
+                fallback=random.choice([
+                    "Beware the door that opens by itself.",
+                    "Your shadow will learn a new name.",
+                    "A promise you forgot did not forget you.",
+                ])
+            )
+            return {"embed": _haunted_embed("Misfortune Cookie", line)}
+
+        await fast_reply(interaction, build())
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Oracles(bot))
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import datetime as dt
+from typing import Any
+
+# Rollup buckets are prefixes of the ISO `ts` stored on events:
+#   hour -> '2025-10-31T13'   day -> '2025-10-31'
+# so a window is just "bucket >= start" over at most 24 or 30 rows per metric.
+
+GRAIN_PREFIX = {"hour": 13, "day": 10}
+
+# (window label, grain, how many buckets back)
+WINDOWS: list[tuple[str, str, int]] = [("24h", "hour", 24), ("7d", "day", 7), ("30d", "day", 30)]
+
+# (row label, metric key); "kind:via" metrics come from the `via` detail key
+DASHBOARD_ROWS: list[tuple[str, str]] = [
+    ("Joins", "member_join"),
+    ("Contracts sent", "contract_sent"),
+    ("  via DM", "contract_sent:dm"),
+    ("  via kiosk", "contract_sent:kiosk"),
+    ("Signed", "contract_signed"),
+    ("Declined", "contract_declined"),
+    ("Revoked", "contract_revoked"),
+    ("Rituals started", "ritual_start"),
+    ("Rituals completed", "ritual_end"),
+    ("Circle interruptions", "circle_interruption_deleted"),
+]
+
+Totals = dict[str, tuple[int, float]]
+
+# Kinds that are bookkeeping, not activity
+UNCOUNTED_KINDS = {"ritual_state"}
+
+
+def rollup_keys(kind: str, detail: dict[str, Any], ts: str) -> list[tuple[str, str, str, float]]:
+    """(grain, bucket, metric, value) increments for one event.
+
+    Every event counts under its kind; `via` adds a per-path metric and
+    `sign_latency_s` feeds the ':timed' metric whose total/count is the
+    average time to sign.
+    """
+    if kind in UNCOUNTED_KINDS:
+        return []
+    metrics: list[tuple[str, float]] = [(kind, 0.0)]
+    via: str | None = detail.get("via") if isinstance(detail, dict) else None
+    if via:
+        metrics.append((f"{kind}:{via}", 0.0))
+    latency = detail.get("sign_latency_s") if isinstance(detail, dict) else None
+    if latency is not None:
+        metrics.append((f"{kind}:timed", float(latency)))
+    out = []
+    for grain, n in GRAIN_PREFIX.items():
+        for metric, value in metrics:
+            out.append((grain, ts[:n], metric, value))
+    return out
+
+
+def rollup_weight(detail: dict[str, Any]) -> int:
+    """How many occurrences one event stands for; aggregated batches carry `batch`."""
+    n = detail.get("batch") if isinstance(detail, dict) else None
+    return n if isinstance(n, int) and n > 0 else 1
+
+
+def bucket_of(ts: dt.datetime, grain: str) -> str:
+    return ts.isoformat()[:GRAIN_PREFIX[grain]]
+
+
+def window_start(now: dt.datetime, grain: str, n: int) -> str:
+    """First bucket of a window of `n` buckets ending with the current one."""
+    step = dt.timedelta(hours=1) if grain == "hour" else dt.timedelta(days=1)
+    return bucket_of(now - step * (n - 1), grain)
+
+
+def _fmt_secs(s: float) -> str:
+    if s < 90:
+        return f"{s:.0f}s"
+    if s < 90 * 60:
+        return f"{s / 60:.1f}m"
+    return f"{s / 3600:.1f}h"
+
+
+def format_dashboard(windows: dict[str, Totals]) -> str:
+    """Monospace table: one row per metric, one column per window."""
+    labels = [w for w, _, _ in WINDOWS]
+    width = max(len(r) for r, _ in DASHBOARD_ROWS) + 2
+    lines = ["".ljust(width) + "".join(w.rjust(8) for w in labels)]
+    for label, metric in DASHBOARD_ROWS:
+        cells = [str(windows.get(w, {}).get(metric, (0, 0.0))[0]).rjust(8) for w in labels]
+        lines.append(label.ljust(width) + "".join(cells))
+    cells = []
+    for w in labels:
+        timed, total = windows.get(w, {}).get("contract_signed:timed", (0, 0.0))
+        cells.append((_fmt_secs(total / timed) if timed else "–").rjust(8))
+    lines.append("Avg time to sign".ljust(width) + "".join(cells))
+    return "```\n" + "\n".join(lines) + "\n```"
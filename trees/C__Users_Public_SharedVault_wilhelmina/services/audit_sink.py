@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import logging
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from services.batcher import KeyedBatcher
+
+log = logging.getLogger(__name__)
+
+# Admin-log events are buffered per guild and delivered as one message of up
+# to 10 embeds (Discord's per-message cap). Each embed is one kind; repeats of
+# a kind inside a flush window fold into that embed as a count plus a few
+# sample details, so a join wave costs one REST call instead of hundreds.
+
+MAX_EMBEDS = 10
+
+
+@dataclass
+class AuditGroup:
+    kind: str
+    count: int = 0
+    samples: list[dict[str, Any]] = field(default_factory=list)
+
+    def add(self, detail: dict[str, Any], max_samples: int):
+        self.count += 1
+        if len(self.samples) < max_samples:
+            self.samples.append(detail)
+
+
+Deliver = Callable[[int, list[AuditGroup]], Awaitable[None]]
+
+
+class AuditSink(KeyedBatcher[int, OrderedDict[str, AuditGroup]]):
+    """Per-guild buffer flushed every `flush_s` seconds or as soon as `max_groups` kinds are waiting.
+
+    `deliver(guild_id, groups)` does the actual send; its failures are logged
+    and the batch is dropped (the events themselves are already in storage).
+    """
+
+    def __init__(self, deliver: Deliver, flush_s: float = 3.0, max_groups: int = MAX_EMBEDS, max_samples: int = 3):
+        super().__init__(flush_s, max_groups)
+        self._deliver = deliver
+        self.max_samples = max_samples
+        self.flushes = 0
+        self.events = 0
+
+    def add(self, guild_id: int, kind: str, detail: dict[str, Any]):
+        if self._closed:
+            return
+        self.events += 1
+        buf = self._buffer(guild_id, OrderedDict)
+        group = buf.get(kind)
+        if group is None:
+            group = buf[kind] = AuditGroup(kind)
+        group.add(detail, self.max_samples)
+        self._added(guild_id, len(buf))
+
+    async def _send(self, guild_id: int, buf: OrderedDict[str, AuditGroup]):
+        groups = list(buf.values())
+        for i in range(0, len(groups), self.max_size):
+            self.flushes += 1
+            try:
+                await self._deliver(guild_id, groups[i:i + self.max_size])
+            except Exception:
+                log.exception("Audit delivery failed for guild %s (%d kinds dropped)", guild_id, len(groups))
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import datetime as dt
+import gzip
+import os
+import shutil
+import sqlite3
+import time
+from dataclasses import dataclass, field
+
+# Online snapshots of the live SQLite file via the backup API. The copy runs
+# in page steps on a worker thread; the source lock is only held for one step
+# at a time, so the bot keeps writing in between. Each snapshot is integrity
+# checked before it is gzip'd into place, and only the newest `keep` are kept.
+
+SNAPSHOT_PREFIX = "wilhelmina-"
+SNAPSHOT_SUFFIX = ".sqlite.gz"
+
+
+@dataclass
+class SnapshotResult:
+    path: str
+    started_at: str
+    duration_ms: float
+    lock_ms: float          # summed time spent inside backup steps
+    max_step_ms: float      # longest single step, i.e. worst writer stall
+    steps: int
+    pages: int
+    bytes: int
+    removed: list[str] = field(default_factory=list)
+
+
+def list_snapshots(dest_dir: str) -> list[str]:
+    """Snapshot file names, newest first."""
+    if not os.path.isdir(dest_dir):
+        return []
+    names = [f for f in os.listdir(dest_dir) if f.startswith(SNAPSHOT_PREFIX) and f.endswith(SNAPSHOT_SUFFIX)]
+    return sorted(names, reverse=True)
+
+
+def _verify(path: str):
+    conn = sqlite3.connect(path)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchone()[0]
+    finally:
+        conn.close()
+    if result != "ok":
+        raise sqlite3.DatabaseError(f"snapshot failed integrity_check: {result}")
+
+
+def backup_snapshot(src: sqlite3.Connection, dest_dir: str, pages: int = 256,
+                    sleep_s: float = 0.01, keep: int = 7) -> SnapshotResult:
+    """Copy `src` to a verified, compressed snapshot. Blocking; run it in a thread.
+
+    `src` must be opened with check_same_thread=False. Using the live
+    connection (rather than a second one) means writes made through it
+    during the copy are applied to the snapshot instead of restarting it.
+    """
+    os.makedirs(dest_dir, exist_ok=True)
+    started = dt.datetime.utcnow()
+    stamp = started.strftime("%Y%m%dT%H%M%S")
+    raw_path = os.path.join(dest_dir, f".{SNAPSHOT_PREFIX}{stamp}.sqlite.tmp")
+    final_path = os.path.join(dest_dir, f"{SNAPSHOT_PREFIX}{stamp}{SNAPSHOT_SUFFIX}")
+
+    t0 = time.perf_counter()
+    stats = {"steps": 0, "lock": 0.0, "max": 0.0, "total": 0}
+    mark = [time.perf_counter()]
+
+    def progress(status, remaining, total):
+        now = time.perf_counter()
+        step = now - mark[0]
+        stats["steps"] += 1
+        stats["lock"] += step
+        stats["max"] = max(stats["max"], step)
+        stats["total"] = total
+        # the backup API sleeps after this callback; start timing the next step after it
+        mark[0] = now + sleep_s
+
+    dst = sqlite3.connect(raw_path)
+    try:
+        src.backup(dst, pages=pages, progress=progress, sleep=sleep_s)
+    finally:
+        dst.close()
+    try:
+        _verify(raw_path)
+        with open(raw_path, "rb") as fin, gzip.open(final_path + ".tmp", "wb") as fout:
+            shutil.copyfileobj(fin, fout, 1024 * 1024)
+        os.replace(final_path + ".tmp", final_path)
+    finally:
+        if os.path.exists(raw_path):
+            os.remove(raw_path)
+
+    removed = []
+    for name in list_snapshots(dest_dir)[keep:]:
+        os.remove(os.path.join(dest_dir, name))
+        removed.append(name)
+
+    return SnapshotResult(
+        path=final_path,
+        started_at=started.isoformat(),
+        duration_ms=(time.perf_counter() - t0) * 1000,
+        lock_ms=stats["lock"] * 1000,
+        max_step_ms=stats["max"] * 1000,
+        steps=int(stats["steps"]),
+        pages=int(stats["total"]),
+        bytes=os.path.getsize(final_path),
+        removed=removed,
+    )
+
+
+def unpack_snapshot(snapshot_path: str) -> str:
+    """Decompress and verify a snapshot next to itself; returns the raw file, which the caller removes. Blocking."""
+    raw_path = snapshot_path + ".restore.tmp"
+    with gzip.open(snapshot_path, "rb") as fin, open(raw_path, "wb") as fout:
+        shutil.copyfileobj(fin, fout, 1024 * 1024)
+    try:
+        _verify(raw_path)
+    except BaseException:
+        os.remove(raw_path)
+        raise
+    return raw_path
+
+
+def copy_into(raw_path: str, dst: sqlite3.Connection):
+    """Copy a verified raw DB over `dst` in one backup step.
+
+    A single step keeps the copy atomic for everyone using `dst`: SQLite leaves
+    reads through the destination undefined while a multi-step backup is in
+    progress, so callers must not yield in the middle of one.
+    """
+    src = sqlite3.connect(raw_path)
+    try:
+        src.backup(dst, pages=-1)
+    finally:
+        src.close()
+
+
+def restore_snapshot(snapshot_path: str, dst: sqlite3.Connection):
+    """Verify a snapshot and copy it over `dst` in place. Blocking."""
+    raw_path = unpack_snapshot(snapshot_path)
+    try:
+        copy_into(raw_path, dst)
+    finally:
+        os.remove(raw_path)
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+# One buffer per key (a guild, a channel), sent `delay_s` after the key's
+# first item or as soon as it holds `max_size`, whichever comes first. The
+# audit sink and the circle purge batcher are the two users; they differ only
+# in what a buffer holds and how it is sent.
+
+K = TypeVar("K", bound=Hashable)
+B = TypeVar("B")
+
+
+class KeyedBatcher(Generic[K, B]):
+    """Time/size batching per key. Subclasses fill buffers in their add() via
+    `_buffer()` + `_added()` and send one in `_send()`; after close() nothing is buffered."""
+
+    def __init__(self, delay_s: float, max_size: int):
+        self.delay_s = delay_s
+        self.max_size = max_size
+        self._buffers: dict[K, B] = {}
+        self._timers: dict[K, asyncio.Task] = {}
+        self._closed = False
+
+    def _buffer(self, key: K, new: Callable[[], B]) -> B:
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = new()
+        return buf
+
+    def _added(self, key: K, size: int):
+        """Call after adding to `key`'s buffer, now `size` long."""
+        if size >= self.max_size:
+            self._schedule(key, 0)
+        elif key not in self._timers:
+            self._schedule(key, self.delay_s)
+
+    def _schedule(self, key: K, delay: float):
+        timer = self._timers.get(key)
+        if timer is not None:
+            if delay > 0:
+                return
+            timer.cancel()
+        self._timers[key] = asyncio.create_task(self._flush_after(key, delay))
+
+    async def _flush_after(self, key: K, delay: float):
+        if delay:
+            await asyncio.sleep(delay)
+        self._timers.pop(key, None)
+        await self.flush(key)
+
+    async def _send(self, key: K, buf: B):
+        raise NotImplementedError
+
+    async def flush(self, key: K | None = None):
+        """Send what is buffered now, for one key or all of them."""
+        keys = [key] if key is not None else list(self._buffers)
+        for k in keys:
+            buf = self._buffers.pop(k, None)
+            if buf is not None:
+                await self._send(k, buf)
+
+    async def close(self):
+        """Stop timers and send everything still buffered; later adds are dropped."""
+        self._closed = True
+        timers, self._timers = list(self._timers.values()), {}
+        for t in timers:
+            t.cancel()
+        await self.flush()
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# Cluster mode runs the bot as N processes, each owning a contiguous range of
+# shard ids. Processes share nothing in memory; they coordinate through the
+# storage backend (Mongo, or one SQLite file in WAL mode as the local stand-in):
+# leases decide which process runs a ritual or a once-per-fleet job, and serial
+# blocks are already leased atomically. Guild-scoped work (audit batching,
+# entity caches) needs no coordination because a guild lives on one shard.
+#
+# The Supervisor is the launcher's bookkeeping: it starts nodes staggered so
+# IDENTIFYs don't collide, takes heartbeats, and restarts a node that exited
+# or went quiet, with exponential backoff, leaving the rest running.
+
+IDENTIFY_GAP_S = 5.5  # Discord allows one IDENTIFY per 5 s at max_concurrency=1
+
+
+def shard_of(guild_id: int, shard_count: int) -> int:
+    return (guild_id >> 22) % shard_count
+
+
+def shard_ranges(shard_count: int, processes: int) -> list[list[int]]:
+    """Split shard ids 0..shard_count-1 into `processes` contiguous, near-equal ranges."""
+    processes = max(1, min(processes, shard_count))
+    base, extra = divmod(shard_count, processes)
+    out, start = [], 0
+    for i in range(processes):
+        n = base + (1 if i < extra else 0)
+        out.append(list(range(start, start + n)))
+        start += n
+    return out
+
+
+def node_id() -> str:
+    """This process's owner name for leases; the launcher sets CLUSTER_NODE_ID per node."""
+    return os.getenv("CLUSTER_NODE_ID") or f"{socket.gethostname()}:{os.getpid()}"
+
+
+@dataclass
+class Node:
+    index: int
+    shard_ids: list[int]
+    proc: Any = None
+    started_at: float = 0.0
+    last_beat: float | None = None
+    status: dict[str, Any] = field(default_factory=dict)
+    restarts: int = 0
+    next_start: float = 0.0
+
+
+class Supervisor:
+    """`spawn(node)` starts a process for the node and returns a handle with is_alive/kill/join/exitcode."""
+
+    def __init__(self, shard_count: int, processes: int, spawn: Callable[[Node], Any],
+                 health_timeout_s: float = 90.0, startup_grace_s: float | None = None,
+                 stagger_s: float = IDENTIFY_GAP_S, max_backoff_s: float = 300.0, stable_s: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.shard_count = shard_count
+        self._spawn = spawn
+        self.health_timeout_s = health_timeout_s
+        self.stagger_s = stagger_s
+        self.max_backoff_s = max_backoff_s
+        self.stable_s = stable_s
+        self._clock = clock
+        self.nodes = [Node(i, ids) for i, ids in enumerate(shard_ranges(shard_count, processes))]
+        # a node must IDENTIFY all its shards before its first heartbeat counts as late
+        self.startup_grace_s = startup_grace_s if startup_grace_s is not None else \
+            health_timeout_s + stagger_s * max(len(n.shard_ids) for n in self.nodes)
+        now = clock()
+        offset = 0.0
+        for n in self.nodes:
+            n.next_start = now + offset
+            offset += stagger_s * len(n.shard_ids)
+
+    def beat(self, index: int, status: dict[str, Any]):
+        node = self.nodes[index]
+        now = self._clock()
+        node.last_beat = now
+        node.status = status
+        if node.restarts and now - node.started_at > self.stable_s:
+            node.restarts = 0
+
+    def check(self) -> list[int]:
+        """Start due nodes and replace dead or silent ones; returns the indexes (re)started."""
+        now = self._clock()
+        started = []
+        for n in self.nodes:
+            if n.proc is None:
+                if now >= n.next_start:
+                    self._start(n, now)
+                    started.append(n.index)
+                continue
+            if not n.proc.is_alive():
+                log.warning("Node %d (shards %s) exited with %s", n.index, n.shard_ids, n.proc.exitcode)
+                self._retire(n, now)
+            elif n.last_beat is None and now - n.started_at > self.startup_grace_s:
+                log.warning("Node %d (shards %s) never reported healthy; restarting", n.index, n.shard_ids)
+                self._retire(n, now)
+            elif n.last_beat is not None and now - n.last_beat > self.health_timeout_s:
+                log.warning("Node %d (shards %s) silent for %.0fs; restarting", n.index, n.shard_ids, now - n.last_beat)
+                self._retire(n, now)
+        return started
+
+    def _start(self, n: Node, now: float):
+        n.proc = self._spawn(n)
+        n.started_at = now
+        n.last_beat = None
+        n.status = {}
+
+    def _retire(self, n: Node, now: float):
+        if n.proc.is_alive():
+            n.proc.kill()
+        n.proc.join(timeout=10)
+        n.proc = None
+        n.restarts += 1
+        n.next_start = now + min(self.max_backoff_s, 2.0 ** n.restarts)
+
+    def stop(self, timeout_s: float = 30.0):
+        for n in self.nodes:
+            if n.proc is not None and n.proc.is_alive():
+                n.proc.terminate()
+        for n in self.nodes:
+            if n.proc is not None:
+                n.proc.join(timeout=timeout_s)
+                if n.proc.is_alive():
+                    n.proc.kill()
+
+    def summary(self) -> list[dict[str, Any]]:
+        now = self._clock()
+        return [{"node": n.index, "shards": f"{n.shard_ids[0]}-{n.shard_ids[-1]}", "up": n.proc is not None,
+                 "beat_age_s": None if n.last_beat is None else round(now - n.last_beat, 1),
+                 "restarts": n.restarts, **n.status} for n in self.nodes]
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from services.dispatcher import TokenBucket
+
+log = logging.getLogger(__name__)
+
+# Contract deliveries leave on_member_join and go through this queue: one entry
+# per (guild, user), so a join/leave/join loop or a resend while queued costs a
+# single delivery, drained by a small worker pool. A delivery is a DM or, when
+# the member's DMs are closed, a pointer to the guild's contract kiosk (one
+# shared message, nothing created per member). Paths with a token bucket (the
+# DM opening limit) wait for a token before they are tried, so a join wave runs
+# at what Discord sustains instead of bursting into 429s. The owner persists
+# entries (see Storage.enqueue_contract) and re-adds them at startup.
+#
+# `deliver(guild_id, user_id, hint)` returns the path that worked, or None when
+# there was nothing to deliver to (the member left). It raises to retry.
+
+Key = tuple[int, int]
+Deliver = Callable[[int, int, Any], Awaitable[str | None]]
+
+
+@dataclass
+class _Latency:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    def add(self, s: float):
+        self.count += 1
+        self.total_s += s
+        self.max_s = max(self.max_s, s)
+
+
+@dataclass
+class ContractMetrics:
+    enqueued: int = 0
+    deduped: int = 0
+    delivered: int = 0
+    dropped: int = 0     # member gone before delivery
+    failed: int = 0      # gave up after max_attempts
+    retries: int = 0
+    paced_s: float = 0.0
+    latency: dict[str, _Latency] = field(default_factory=dict)  # path -> enqueue-to-delivered
+
+    def snapshot(self, depth: int = 0) -> dict[str, Any]:
+        return {
+            "depth": depth, "enqueued": self.enqueued, "deduped": self.deduped, "delivered": self.delivered,
+            "dropped": self.dropped, "failed": self.failed, "retries": self.retries,
+            "paced_s": round(self.paced_s, 1),
+            "latency_ms": {p: {"n": w.count, "avg": round(1000 * w.total_s / w.count, 1),
+                               "max": round(1000 * w.max_s, 1)}
+                           for p, w in sorted(self.latency.items()) if w.count},
+        }
+
+
+class ContractQueue:
+    def __init__(self, deliver: Deliver, forget: Callable[[int, int], Awaitable[None]],
+                 limits: dict[str, tuple[int, float]], workers: int = 4, max_attempts: int = 3,
+                 retry_s: float = 30.0, clock: Callable[[], float] = time.monotonic):
+        self._deliver = deliver
+        self._forget = forget
+        self._buckets = {path: TokenBucket(*lim) for path, lim in limits.items()}
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_s = retry_s
+        self._clock = clock
+        self._queue: asyncio.Queue[Key] = asyncio.Queue()
+        self._keys: set[Key] = set()           # queued or in flight
+        self._hints: dict[Key, Any] = {}
+        self._since: dict[Key, float] = {}
+        self._attempts: dict[Key, int] = {}
+        self._tasks: list = []
+        self._running = asyncio.Event()  # cleared by pause(): workers finish their delivery, then wait
+        self._running.set()
+        self.metrics = ContractMetrics()
+
+    def queued(self, guild_id: int, user_id: int) -> bool:
+        return (guild_id, user_id) in self._keys
+
+    def depth(self) -> int:
+        return len(self._keys)
+
+    def keys(self) -> list[Key]:
+        """Queued or in-flight (guild, user) pairs."""
+        return sorted(self._keys)
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    def add(self, guild_id: int, user_id: int, hint: Any = None) -> bool:
+        """Queue a delivery; False if one for this member is already queued or in flight."""
+        key = (guild_id, user_id)
+        if key in self._keys:
+            self.metrics.deduped += 1
+            if hint is not None:
+                self._hints[key] = hint
+            return False
+        self._keys.add(key)
+        self._hints[key] = hint
+        self._since[key] = self._clock()
+        self.metrics.enqueued += 1
+        self._queue.put_nowait(key)
+        return True
+
+    async def pace(self, path: str):
+        """Wait until `path` has a token, then take it. Paths without a bucket pass straight through."""
+        bucket = self._buckets.get(path)
+        if bucket is None:
+            return
+        while (wait := bucket.delay(self._clock())) > 0:
+            self.metrics.paced_s += wait
+            await asyncio.sleep(wait)
+        bucket.take(self._clock())
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            await self._running.wait()
+            key = await self._queue.get()
+            await self._running.wait()  # paused while this worker sat waiting for an entry
+            try:
+                await self._run(key)
+            except Exception:
+                log.exception("Contract worker failed on %s", key)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, key: Key):
+        guild_id, user_id = key
+        try:
+            path = await self._deliver(guild_id, user_id, self._hints.get(key))
+        except Exception as e:
+            n = self._attempts[key] = self._attempts.get(key, 0) + 1
+            if n < self.max_attempts:
+                self.metrics.retries += 1
+                log.warning("Contract delivery to %s in guild %s failed (attempt %d), retrying: %r",
+                            user_id, guild_id, n, e)
+                asyncio.get_running_loop().call_later(self.retry_s * n, self._queue.put_nowait, key)
+                return
+            log.warning("Contract delivery to %s in guild %s given up: %r", user_id, guild_id, e)
+            self.metrics.failed += 1
+        else:
+            if path is None:
+                self.metrics.dropped += 1
+            else:
+                self.metrics.delivered += 1
+                self.metrics.latency.setdefault(path, _Latency()).add(self._clock() - self._since[key])
+        self._keys.discard(key)
+        self._hints.pop(key, None)
+        self._since.pop(key, None)
+        self._attempts.pop(key, None)
+        await self._forget(guild_id, user_id)
@@ -0,0 +1,296 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable
+from dataclasses import dataclass, field
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# Every outbound message goes through one dispatcher. Jobs queue by priority
+# (lower first) and, within a priority, round-robin across guilds, so one busy
+# guild can't starve the rest. Before a send, local token buckets for the route
+# (channel / DM / followup) and for the bot as a whole must have room; a job
+# whose route is cooling or busy is parked behind it instead of blocking the
+# line. A 429 that still gets through cools the route for retry_after and the
+# job is retried, so ritual beats are delayed rather than lost.
+
+PRIORITY_INTERACTION = 0
+PRIORITY_RITUAL = 1
+PRIORITY_CONTRACT = 2
+PRIORITY_ANNOUNCE = 3
+PRIORITY_AUDIT = 4
+
+Route = Hashable
+
+MAX_IDLE_BUCKETS = 4096
+
+
+class TokenBucket:
+    def __init__(self, capacity: int, period_s: float):
+        self.capacity = capacity
+        self.rate = capacity / period_s
+        self.tokens = float(capacity)
+        self.updated: float | None = None
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is now)."""
+        self._refill(now)
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+
+@dataclass
+class _Job:
+    guild_id: int
+    route: Route
+    priority: int
+    send: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+    queued_at: float
+    attempts: int = 0
+    released: bool = False
+
+
+@dataclass
+class _Wait:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    def add(self, s: float):
+        self.count += 1
+        self.total_s += s
+        self.max_s = max(self.max_s, s)
+
+
+@dataclass
+class DispatchMetrics:
+    submitted: int = 0
+    sent: int = 0
+    failed: int = 0
+    throttled: int = 0      # sends held back by a local bucket (a 429 avoided)
+    rate_limited: int = 0   # 429s that reached us anyway
+    wait: dict[int, _Wait] = field(default_factory=dict)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "submitted": self.submitted, "sent": self.sent, "failed": self.failed,
+            "throttled": self.throttled, "rate_limited": self.rate_limited,
+            "wait_ms": {p: {"n": w.count, "avg": round(1000 * w.total_s / w.count, 1), "max": round(1000 * w.max_s, 1)}
+                        for p, w in sorted(self.wait.items()) if w.count},
+        }
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    return getattr(exc, "retry_after", None)
+
+
+class Dispatcher:
+    def __init__(self, route_limit: tuple[int, float] = (5, 5.0), global_limit: tuple[int, float] = (45, 1.0),
+                 concurrency: int = 8, max_attempts: int = 4,
+                 retry_after: Callable[[BaseException], float | None] = _retry_after,
+                 clock: Callable[[], float] = time.monotonic):
+        self.route_limit = route_limit
+        self.max_attempts = max_attempts
+        self._retry_after = retry_after
+        self._clock = clock
+        self._global = TokenBucket(*global_limit)
+        self._buckets: dict[Route, TokenBucket] = {}
+        self._ready: dict[int, OrderedDict[int, deque[_Job]]] = {}
+        self._parked: dict[Route, deque[_Job]] = {}
+        self._busy: set[Route] = set()
+        self._cooling: list[tuple[float, int, Route]] = []
+        self._cool_until: dict[Route, float] = {}
+        self._seq = itertools.count()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._inflight: set[asyncio.Task] = set()
+        self.metrics = DispatchMetrics()
+
+    # ---- public
+    def submit(self, guild_id: int, route: Route, priority: int, send: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        fut = asyncio.get_running_loop().create_future()
+        self.metrics.submitted += 1
+        if len(self._buckets) > MAX_IDLE_BUCKETS:
+            self._prune_buckets()
+        self._enqueue(_Job(guild_id, route, priority, send, fut, self._clock()))
+        return fut
+
+    async def send(self, guild_id: int, route: Route, priority: int, send: Callable[[], Awaitable[Any]]):
+        return await self.submit(guild_id, route, priority, send)
+
+    def pending(self) -> int:
+        return sum(len(q) for lanes in self._ready.values() for q in lanes.values()) + \
+            sum(len(q) for q in self._parked.values())
+
+    def start(self):
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def close(self, drain_s: float = 5.0):
+        """Give queued sends `drain_s` to go out, then stop and fail what is left."""
+        deadline = self._clock() + drain_s
+        while (self.pending() or self._inflight) and self._clock() < deadline:
+            await asyncio.sleep(0.05)
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for lanes in self._ready.values():
+            for q in lanes.values():
+                for job in q:
+                    job.future.cancel()
+        for q in self._parked.values():
+            for job in q:
+                job.future.cancel()
+        self._ready.clear()
+        self._parked.clear()
+
+    # ---- queueing
+    def _enqueue(self, job: _Job, front: bool = False):
+        lanes = self._ready.setdefault(job.priority, OrderedDict())
+        q = lanes.get(job.guild_id)
+        if q is None:
+            q = lanes[job.guild_id] = deque()
+        if front:
+            q.appendleft(job)
+        else:
+            q.append(job)
+        if self._wake is not None:
+            self._wake.set()
+
+    def _next_ready(self) -> _Job | None:
+        for prio in sorted(self._ready):
+            lanes = self._ready[prio]
+            if not lanes:
+                continue
+            gid, q = lanes.popitem(last=False)
+            job = q.popleft()
+            if q:
+                lanes[gid] = q  # back of the rotation
+            return job
+        return None
+
+    def _prune_buckets(self):
+        # a full bucket holds no state worth keeping; DM routes would otherwise grow forever
+        now = self._clock()
+        for route in [r for r, b in self._buckets.items() if b.delay(now) == 0 and b.tokens >= b.capacity
+                      and r not in self._busy and r not in self._parked]:
+            del self._buckets[route]
+
+    def _park(self, job: _Job, front: bool = False):
+        q = self._parked.setdefault(job.route, deque())
+        if front:
+            q.appendleft(job)
+        else:
+            q.append(job)
+
+    def _release(self, route: Route):
+        """Let the next parked job for `route` back into the ready queue."""
+        if route in self._busy or self._cool_until.get(route, 0) > self._clock():
+            return
+        q = self._parked.get(route)
+        if not q:
+            self._parked.pop(route, None)
+            return
+        job = q.popleft()
+        if not q:
+            del self._parked[route]
+        job.released = True
+        self._enqueue(job, front=True)
+
+    def _cool(self, route: Route, until: float):
+        self._cool_until[route] = max(until, self._cool_until.get(route, 0))
+        heapq.heappush(self._cooling, (until, next(self._seq), route))
+
+    # ---- loop
+    async def _loop(self):
+        while True:
+            now = self._clock()
+            while self._cooling and self._cooling[0][0] <= now:
+                _, _, route = heapq.heappop(self._cooling)
+                if self._cool_until.get(route, 0) <= now:
+                    self._cool_until.pop(route, None)
+                    self._release(route)
+
+            job = self._next_ready()
+            if job is None:
+                self._wake.clear()
+                timeout = max(0.0, self._cooling[0][0] - now) if self._cooling else None
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout)
+                except TimeoutError:
+                    pass
+                continue
+
+            route = job.route
+            if route in self._busy or route in self._cool_until or (self._parked.get(route) and not job.released):
+                self._park(job)
+                continue
+            bucket = self._buckets.get(route)
+            if bucket is None:
+                bucket = self._buckets[route] = TokenBucket(*self.route_limit)
+            wait = bucket.delay(now)
+            if wait > 0:
+                self.metrics.throttled += 1
+                self._park(job, front=True)
+                self._cool(route, now + wait)
+                continue
+            gwait = self._global.delay(now)
+            if gwait > 0:
+                self.metrics.throttled += 1
+                self._enqueue(job, front=True)
+                await asyncio.sleep(gwait)
+                continue
+
+            bucket.take(now)
+            self._global.take(now)
+            self._busy.add(route)
+            if job.attempts == 0:
+                self.metrics.wait.setdefault(job.priority, _Wait()).add(now - job.queued_at)
+            await self._slots.acquire()
+            task = asyncio.create_task(self._run(job))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, job: _Job):
+        try:
+            job.attempts += 1
+            try:
+                result = await job.send()
+            except Exception as e:
+                after = self._retry_after(e)
+                if after is not None and job.attempts < self.max_attempts and not job.future.cancelled():
+                    self.metrics.rate_limited += 1
+                    self._cool(job.route, self._clock() + after)
+                    job.released = False
+                    self._park(job, front=True)
+                    return
+                self.metrics.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+                return
+            self.metrics.sent += 1
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self._slots.release()
+            self._busy.discard(job.route)
+            self._release(job.route)
+            if self._wake is not None:
+                self._wake.set()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+
+# Logical key -> Discord id, per guild. Ids come from guild_config or from one
+# name scan; after that the gateway events keep them right, so hot paths never
+# walk guild.text_channels / roles again. Ids survive renames; a delete drops
+# the entry. MISSING records "scanned, not there" so absent entities are not
+# rescanned until a create event names them.
+
+MISSING = 0
+
+# kind is "text" | "category" | "role"
+EntitySpec = tuple[str, str]
+
+
+class EntityCache:
+    def __init__(self, specs: dict[str, EntitySpec]):
+        self.specs = specs
+        self._ids: dict[int, dict[str, int]] = {}
+        self._seeded: set = set()
+        self._locks: dict[tuple[int, str], asyncio.Lock] = {}
+
+    def seeded(self, guild_id: int) -> bool:
+        return guild_id in self._seeded
+
+    def seed(self, guild_id: int, ids: dict[str, int | None]):
+        """Prime from stored config; unknown (None) keys are left for a name scan."""
+        self._seeded.add(guild_id)
+        g = self._ids.setdefault(guild_id, {})
+        for key, eid in ids.items():
+            if eid and key not in g:
+                g[key] = eid
+
+    def get(self, guild_id: int, key: str) -> int | None:
+        """The cached id, MISSING if known absent, or None if never resolved."""
+        return self._ids.get(guild_id, {}).get(key)
+
+    def set(self, guild_id: int, key: str, eid: int | None):
+        self._ids.setdefault(guild_id, {})[key] = eid or MISSING
+
+    def lock(self, guild_id: int, key: str) -> asyncio.Lock:
+        """Serialises get-or-create for one key so racing callers don't create duplicates."""
+        return self._locks.setdefault((guild_id, key), asyncio.Lock())
+
+    def forget_guild(self, guild_id: int):
+        self._ids.pop(guild_id, None)
+        self._seeded.discard(guild_id)
+        for k in [k for k in self._locks if k[0] == guild_id]:
+            del self._locks[k]
+
+    def forget_all(self):
+        """Re-seed every guild from storage on next use; locks stay, so holders keep serialising."""
+        self._ids.clear()
+        self._seeded.clear()
+
+    # ---- gateway events
+    def on_create(self, guild_id: int, kind: str, eid: int, name: str):
+        g = self._ids.setdefault(guild_id, {})
+        for key, (k, n) in self.specs.items():
+            if k == kind and n == name and not g.get(key):
+                g[key] = eid
+
+    def on_update(self, guild_id: int, kind: str, eid: int, name: str):
+        # A rename onto a key's name fills an empty slot; renames away keep the id
+        self.on_create(guild_id, kind, eid, name)
+
+    def on_delete(self, guild_id: int, eid: int):
+        g = self._ids.get(guild_id, {})
+        for key in [k for k, v in g.items() if v == eid]:
+            del g[key]
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import gzip
+import io
+import itertools
+import json
+import os
+import threading
+from collections.abc import AsyncIterator, Callable, Generator, Iterable, Iterator
+from typing import Any
+
+# Cold storage for the `events` table: one append-only gzip JSONL segment per
+# guild per month, e.g. data/archive/events/<guild_id>/2025-10.jsonl.gz.
+# Each append writes a new gzip member; gzip readers stream concatenated
+# members transparently, so segments never have to be rewritten.
+#
+# All of it is blocking file I/O (gzip, fsync): callers on the event loop go
+# through asyncio.to_thread, or aiter_events for reads.
+
+SEGMENT_SUFFIX = ".jsonl.gz"
+READ_BATCH_ROWS = 500
+
+
+def segment_month(ts: str) -> str:
+    """'2025-10-31T13:20:12.123' -> '2025-10'."""
+    return ts[:7] if ts and len(ts) >= 7 else "unknown"
+
+
+class EventArchive:
+    def __init__(self, root: str):
+        self.root = root
+        # append() and rewrite() run on worker threads, possibly at the same time
+        self._lock = threading.Lock()
+
+    def _guild_dir(self, guild_id: int) -> str:
+        return os.path.join(self.root, str(guild_id))
+
+    def segment_path(self, guild_id: int, month: str) -> str:
+        return os.path.join(self._guild_dir(guild_id), f"{month}{SEGMENT_SUFFIX}")
+
+    def append(self, rows: Iterable[dict[str, Any]]) -> int:
+        """Append event rows to their monthly segments. Returns rows written.
+
+        Rows are flushed and fsync'd before returning so callers can delete
+        them from the live table afterwards.
+        """
+        grouped: dict[tuple, list[dict[str, Any]]] = {}
+        for r in rows:
+            grouped.setdefault((r["guild_id"], segment_month(r.get("ts") or "")), []).append(r)
+        with self._lock:
+            return self._append_grouped(grouped)
+
+    def _append_grouped(self, grouped: dict[tuple, list[dict[str, Any]]]) -> int:
+        written = 0
+        for (guild_id, month), batch in grouped.items():
+            os.makedirs(self._guild_dir(guild_id), exist_ok=True)
+            with open(self.segment_path(guild_id, month), "ab") as raw:
+                with gzip.GzipFile(fileobj=raw, mode="ab") as gz:
+                    for r in batch:
+                        gz.write((json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8"))
+                raw.flush()
+                os.fsync(raw.fileno())
+            written += len(batch)
+        return written
+
+    def months(self, guild_id: int) -> list[str]:
+        d = self._guild_dir(guild_id)
+        if not os.path.isdir(d):
+            return []
+        return sorted(f[:-len(SEGMENT_SUFFIX)] for f in os.listdir(d) if f.endswith(SEGMENT_SUFFIX))
+
+    def iter_events(self, guild_id: int, since_month: str | None = None, after_id: int = 0,
+                    upto_id: int | None = None,
+                    since_ts: str | None = None) -> Generator[dict[str, Any], None, None]:
+        """Stream archived events for a guild, oldest segment first.
+
+        Delivery is at-least-once: a crash between archiving and deleting a
+        batch can leave a row in both a segment and the live table. Each
+        segment is read up to its length when reading starts, so an append
+        running meanwhile is never seen half-written.
+        """
+        if since_ts and not since_month:
+            since_month = segment_month(since_ts)
+        for month in self.months(guild_id):
+            if since_month and month < since_month:
+                continue
+            with self._lock:  # appends add whole gzip members under the lock; rewrites swap the file
+                raw = open(self.segment_path(guild_id, month), "rb")
+                size = os.fstat(raw.fileno()).st_size
+            with raw, gzip.open(io.BufferedReader(_Prefix(raw, size)), "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    row = json.loads(line)
+                    if row["id"] <= after_id or (upto_id is not None and row["id"] > upto_id):
+                        continue
+                    if since_ts and (row.get("ts") or "") <= since_ts:
+                        continue
+                    yield row
+
+    async def aiter_events(self, guild_id: int, batch: int = READ_BATCH_ROWS,
+                           **window: Any) -> AsyncIterator[dict[str, Any]]:
+        """iter_events for the event loop: segments are read and decoded `batch` rows at a time on a worker thread."""
+        it = self.iter_events(guild_id, **window)
+        try:
+            while rows := await asyncio.to_thread(_take, it, batch):
+                for row in rows:
+                    yield row
+        finally:
+            it.close()
+
+    def rewrite(self, guild_id: int, fn: Callable[[dict[str, Any]], dict[str, Any] | None]) -> int:
+        """Pass every archived row of a guild through `fn` (None drops it).
+
+        Used for erasure requests. Segments whose rows all come back unchanged
+        are left alone; changed ones are rewritten to a temp file and swapped in
+        atomically. Returns the number of rows changed or dropped.
+        """
+        with self._lock:
+            return self._rewrite(guild_id, fn)
+
+    def _rewrite(self, guild_id: int, fn: Callable[[dict[str, Any]], dict[str, Any] | None]) -> int:
+        touched = 0
+        for month in self.months(guild_id):
+            path = self.segment_path(guild_id, month)
+            changed, out = 0, []
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    row = json.loads(line)
+                    new = fn(dict(row))
+                    if new != row:
+                        changed += 1
+                    if new is not None:
+                        out.append(new)
+            if not changed:
+                continue
+            tmp = path + ".tmp"
+            with gzip.open(tmp, "wt", encoding="utf-8") as f:
+                for r in out:
+                    f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            os.replace(tmp, path)
+            touched += changed
+        return touched
+
+
+class _Prefix(io.RawIOBase):
+    """The first `size` bytes of a file."""
+
+    def __init__(self, f: io.BufferedReader, size: int):
+        self._f = f
+        self._left = size
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = min(len(b), self._left)
+        if n <= 0:
+            return 0
+        got = self._f.readinto(memoryview(b)[:n])
+        self._left -= got
+        return got
+
+
+def _take(it: Iterator[dict[str, Any]], n: int) -> list[dict[str, Any]]:
+    return list(itertools.islice(it, n))
+
+
+def retention_cutoffs(now: dt.datetime, policy: dict[str, int | None],
+                      default_days: int | None) -> dict[str, str | None]:
+    """Map kind -> ISO cutoff timestamp (None = keep forever)."""
+    out: dict[str, str | None] = {}
+    for kind, days in policy.items():
+        out[kind] = (now - dt.timedelta(days=days)).isoformat() if days is not None else None
+    out["*"] = (now - dt.timedelta(days=default_days)).isoformat() if default_days is not None else None
+    return out
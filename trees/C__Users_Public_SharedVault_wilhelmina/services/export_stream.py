@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import tempfile
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import IO, Any
+
+# Streaming export writer: rows go straight through gzip into spooled temp
+# files (RAM until SPOOL_BYTES, then disk), and a new part is started before
+# the compressed output reaches the attachment limit. Peak memory is bounded
+# by the spool size, not by the number of rows.
+
+DEFAULT_PART_BYTES = 8 * 1024 * 1024
+SPOOL_BYTES = 1024 * 1024
+
+
+@dataclass
+class ExportPart:
+    filename: str
+    fp: IO[bytes]
+    rows: int
+    size: int
+
+
+class PartWriter:
+    def __init__(self, stem: str, fmt: str, fieldnames: Sequence[str],
+                 max_bytes: int = DEFAULT_PART_BYTES, spool_bytes: int = SPOOL_BYTES):
+        if fmt not in ("csv", "json"):
+            raise ValueError(f"unsupported export format: {fmt}")
+        self.stem = stem
+        self.fmt = fmt
+        self.fieldnames = list(fieldnames)
+        # zlib holds back some output, so roll over with headroom to spare
+        self.roll_at = max_bytes - max(64 * 1024, max_bytes // 10)
+        self.spool_bytes = spool_bytes
+        self.rows = 0
+        self._done: list[tuple] = []
+        self._raw: IO[bytes] | None = None
+        self._text: io.TextIOWrapper | None = None
+        self._csv: csv.DictWriter | None = None
+        self._part_rows = 0
+
+    def _open(self):
+        self._raw = tempfile.SpooledTemporaryFile(max_size=self.spool_bytes)
+        gz = gzip.GzipFile(fileobj=self._raw, mode="wb")
+        self._text = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+        self._part_rows = 0
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(self._text, fieldnames=self.fieldnames, extrasaction="ignore")
+            self._csv.writeheader()
+        else:
+            self._text.write("[\n")
+
+    def _seal(self):
+        if self.fmt == "json":
+            self._text.write("\n]\n")
+        self._text.close()  # closes the gzip stream; the spool stays open
+        size = self._raw.tell()
+        self._raw.seek(0)
+        self._done.append((self._raw, self._part_rows, size))
+        self._raw = self._text = self._csv = None
+
+    def write(self, row: dict[str, Any]):
+        if self._raw is None:
+            self._open()
+        elif self._part_rows and self._raw.tell() >= self.roll_at:
+            self._seal()
+            self._open()
+        if self.fmt == "csv":
+            self._csv.writerow(row)
+        else:
+            if self._part_rows:
+                self._text.write(",\n")
+            self._text.write(json.dumps(row, ensure_ascii=False))
+        self._part_rows += 1
+        self.rows += 1
+
+    def close(self) -> list[ExportPart]:
+        if self._raw is None and not self._done:
+            self._open()  # empty export still yields a header / empty array
+        if self._raw is not None:
+            self._seal()
+        many = len(self._done) > 1
+        parts = []
+        for i, (fp, rows, size) in enumerate(self._done, start=1):
+            name = f"{self.stem}.part{i:02d}.{self.fmt}.gz" if many else f"{self.stem}.{self.fmt}.gz"
+            parts.append(ExportPart(filename=name, fp=fp, rows=rows, size=size))
+        self._done = []
+        return parts
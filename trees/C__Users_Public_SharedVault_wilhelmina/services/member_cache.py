@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from collections.abc import Sequence
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# How much of each guild's member list the client keeps. With the members
+# intent on, discord.py by default chunks every guild at startup and caches
+# every member, which dominates RSS and time-to-ready on big servers. Only the
+# ritual needs member lists, so the default here is to skip startup chunking
+# and fetch a guild's members when a ritual first needs them.
+#
+#   eager    chunk every guild at startup, cache all members (discord.py default)
+#   lazy     no startup chunking; a guild is chunked (and cached) on first need
+#   minimal  cache no members; a ritual's member list is fetched and not kept
+#
+# Chosen with MEMBER_CACHE; the ready report logs RSS and time-to-ready so the
+# policies can be compared on a real deployment.
+
+POLICIES = ("eager", "lazy", "minimal")
+DEFAULT_POLICY = "lazy"
+
+
+def resolve_policy(value: str | None = None) -> str:
+    policy = (value if value is not None else os.getenv("MEMBER_CACHE", DEFAULT_POLICY)).strip().lower() \
+        or DEFAULT_POLICY
+    if policy not in POLICIES:
+        raise ValueError(f"MEMBER_CACHE must be one of {', '.join(POLICIES)}, not {policy!r}")
+    return policy
+
+
+def client_options(policy: str, intents) -> dict[str, Any]:
+    """Keyword arguments for commands.Bot / AutoShardedBot under `policy`."""
+    import discord
+
+    if policy == "eager":
+        return {"member_cache_flags": discord.MemberCacheFlags.from_intents(intents), "chunk_guilds_at_startup": True}
+    if policy == "lazy":
+        return {"member_cache_flags": discord.MemberCacheFlags.from_intents(intents), "chunk_guilds_at_startup": False}
+    return {"member_cache_flags": discord.MemberCacheFlags.none(), "chunk_guilds_at_startup": False}
+
+
+class GuildChunker:
+    """Member lists on demand. Concurrent callers for one guild share a single chunk request.
+
+    With `cache=True` a chunked guild is answered from guild.members afterwards;
+    with `cache=False` each call fetches again, so callers should keep what they
+    derive (the ritual keeps an id index, not Member objects).
+    """
+
+    def __init__(self, cache: bool = True):
+        self.cache = cache
+        self._inflight: dict[int, asyncio.Future] = {}
+        self.requests = 0
+        self.members_fetched = 0
+        self.fetch_s = 0.0
+
+    async def members(self, guild) -> Sequence[Any]:
+        if self.cache and getattr(guild, "chunked", True):
+            return guild.members
+        fut = self._inflight.get(guild.id)
+        if fut is None:
+            fut = self._inflight[guild.id] = asyncio.ensure_future(self._chunk(guild))
+            fut.add_done_callback(lambda _: self._inflight.pop(guild.id, None))
+        return await asyncio.shield(fut)
+
+    async def _chunk(self, guild) -> Sequence[Any]:
+        t0 = time.perf_counter()
+        members = await guild.chunk(cache=self.cache)
+        took = time.perf_counter() - t0
+        self.requests += 1
+        self.members_fetched += len(members)
+        self.fetch_s += took
+        log.info("Chunked guild %s: %d members in %.2fs", guild.id, len(members), took)
+        return members
+
+    def snapshot(self) -> dict[str, Any]:
+        return {"requests": self.requests, "members": self.members_fetched, "fetch_s": round(self.fetch_s, 2)}
+
+
+def rss_mb() -> float | None:
+    """Resident set size of this process in MiB, where the platform exposes it cheaply."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # peak, not current; bytes on macOS, else KiB
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+def ready_report(bot, policy: str, started_at: float, clock=time.monotonic) -> dict[str, Any]:
+    """Time from `started_at` to now, RSS, and what the member cache holds."""
+    guilds = list(bot.guilds)
+    return {
+        "policy": policy,
+        "time_to_ready_s": round(clock() - started_at, 2),
+        "rss_mb": rss_mb(),
+        "guilds": len(guilds),
+        "chunked_guilds": sum(1 for g in guilds if getattr(g, "chunked", False)),
+        "cached_members": sum(len(g.members) for g in guilds),
+    }
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import random
+from array import array
+from collections.abc import Callable, Collection, Iterable
+
+# Members eligible for ritual mentions (not bots, not admins), per guild.
+# Built once from the member cache, then kept current by join/leave/update
+# events, so a beat samples k ids in O(k) instead of scanning and shuffling
+# the whole guild. IDs live in an unsigned 64-bit array; removal swaps the
+# last element into the hole.
+
+
+class EligibleSet:
+    __slots__ = ("_ids", "_pos")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._ids = array("Q")
+        self._pos: dict[int, int] = {}
+        for uid in ids:
+            self.add(uid)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, uid: int) -> bool:
+        return uid in self._pos
+
+    def add(self, uid: int) -> bool:
+        if uid in self._pos:
+            return False
+        self._pos[uid] = len(self._ids)
+        self._ids.append(uid)
+        return True
+
+    def remove(self, uid: int) -> bool:
+        pos = self._pos.pop(uid, None)
+        if pos is None:
+            return False
+        last = self._ids.pop()
+        if last != uid:
+            self._ids[pos] = last
+            self._pos[last] = pos
+        return True
+
+    def sample(self, k: int, exclude: Collection[int] = (), rng: random.Random | None = None) -> list[int]:
+        """Up to k distinct ids not in `exclude`, by a partial Fisher-Yates over the array.
+
+        Cost is O(k + excluded ids drawn); the array is permuted in place, which
+        is harmless because order carries no meaning. `rng` defaults to the
+        module-level generator.
+        """
+        randrange = rng.randrange if rng is not None else random.randrange
+        ids, pos = self._ids, self._pos
+        n = len(ids)
+        out: list[int] = []
+        i = 0
+        while len(out) < k and i < n:
+            j = randrange(i, n)
+            if j != i:
+                ids[i], ids[j] = ids[j], ids[i]
+                pos[ids[i]] = i
+                pos[ids[j]] = j
+            if ids[i] not in exclude:
+                out.append(ids[i])
+            i += 1
+        return out
+
+
+class MemberIndex:
+    """Lazily built EligibleSet per guild. Updates for unbuilt guilds are ignored."""
+
+    def __init__(self):
+        self._guilds: dict[int, EligibleSet] = {}
+
+    def get(self, guild_id: int, build: Callable[[], Iterable[int]]) -> EligibleSet:
+        idx = self._guilds.get(guild_id)
+        if idx is None:
+            idx = self._guilds[guild_id] = EligibleSet(build())
+        return idx
+
+    def peek(self, guild_id: int) -> EligibleSet | None:
+        return self._guilds.get(guild_id)
+
+    def update(self, guild_id: int, uid: int, eligible: bool):
+        idx = self._guilds.get(guild_id)
+        if idx is None:
+            return
+        if eligible:
+            idx.add(uid)
+        else:
+            idx.remove(uid)
+
+    def invalidate(self, guild_id: int):
+        """Drop a guild's set (e.g. a role's permissions changed); rebuilt on next use."""
+        self._guilds.pop(guild_id, None)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# A server takeover as data: the preview computes a Plan of steps once, the
+# Provisioner runs it and checkpoints it to storage, and an interrupted run
+# resumes from the checkpoint. Steps of one phase run concurrently (bounded);
+# phases run in order. A step that hits a rate limit pauses the whole run for
+# retry_after, since every step draws on the same guild-wide buckets. Failures
+# are recorded on the step rather than swallowed, and a re-run retries them.
+#
+# An op with a batch runner (e.g. archive moves, which Discord accepts many at a
+# time) is handed all of a phase's pending steps at once; the runner marks what
+# it finished and anything left pending runs one step at a time as a fallback.
+#
+# Steps must be idempotent: progress is saved at most every `save_every_s`, so
+# a few finished steps may run again after a crash and should find their work
+# already done.
+
+PENDING = "pending"
+DONE = "done"
+SKIPPED = "skipped"   # nothing to do by the time the step ran (channel gone, category not empty)
+FAILED = "failed"
+
+
+@dataclass
+class Step:
+    key: str                      # stable identity, e.g. "archive:<channel id>"
+    op: str
+    phase: int
+    label: str = ""
+    args: dict[str, Any] = field(default_factory=dict)
+    status: str = PENDING
+    attempts: int = 0             # across every run, for the report; retry limits count per run
+    error: str | None = None
+
+
+@dataclass
+class Plan:
+    guild_id: int
+    steps: list[Step]
+    created_at: str = field(default_factory=lambda: dt.datetime.utcnow().isoformat())
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Plan:
+        return cls(guild_id=d["guild_id"], steps=[Step(**s) for s in d["steps"]], created_at=d["created_at"])
+
+    def by_op(self, op: str) -> list[Step]:
+        return [s for s in self.steps if s.op == op]
+
+    def counts(self) -> dict[str, int]:
+        out = {PENDING: 0, DONE: 0, SKIPPED: 0, FAILED: 0}
+        for s in self.steps:
+            out[s.status] += 1
+        return out
+
+    @property
+    def finished(self) -> int:
+        return sum(1 for s in self.steps if s.status != PENDING)
+
+    @property
+    def complete(self) -> bool:
+        return all(s.status in (DONE, SKIPPED) for s in self.steps)
+
+    def failures(self) -> list[Step]:
+        return [s for s in self.steps if s.status == FAILED]
+
+    def retry_failed(self):
+        for s in self.failures():
+            s.status, s.error = PENDING, None
+
+
+class StepSkipped(Exception):
+    """Raised by a step runner when the step turned out to have nothing to do."""
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    return getattr(exc, "retry_after", None)
+
+
+BatchRunner = Callable[[list[Step]], Awaitable[None]]
+
+
+class Provisioner:
+    """`run_step(step)` does one step; `save(plan)` checkpoints; `progress(plan)` is called at most every `progress_every_s`.
+
+    `batches` maps an op to a runner that takes all its pending steps of a phase
+    and sets the status of those it handled.
+    """
+
+    def __init__(self, run_step: Callable[[Step], Awaitable[None]], save: Callable[[Plan], Awaitable[None]],
+                 batches: dict[str, BatchRunner] | None = None, concurrency: int = 4, max_attempts: int = 4,
+                 retry_after: Callable[[BaseException], float | None] = _retry_after,
+                 progress: Callable[[Plan], Awaitable[None]] | None = None,
+                 progress_every_s: float = 1.5, save_every_s: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._run_step = run_step
+        self._batches = batches or {}
+        self._save = save
+        self._progress = progress
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self._retry_after = retry_after
+        self.progress_every_s = progress_every_s
+        self.save_every_s = save_every_s
+        self._clock = clock
+        self._pause_until = 0.0
+        self._last_save = self._last_progress = float("-inf")
+        self.rate_limited = 0
+        self.batch_calls = 0
+        self.step_calls = 0
+
+    async def run(self, plan: Plan) -> Plan:
+        plan.retry_failed()
+        slots = asyncio.Semaphore(self.concurrency)
+        for phase in sorted({s.phase for s in plan.steps}):
+            for op, runner in self._batches.items():
+                group = [s for s in plan.steps if s.phase == phase and s.op == op and s.status == PENDING]
+                if group:
+                    await self._run_batch(plan, op, runner, group)
+            todo = [s for s in plan.steps if s.phase == phase and s.status == PENDING]
+            if todo:
+                await asyncio.gather(*(self._run(plan, s, slots) for s in todo))
+                await self._checkpoint(plan, force=True)
+        await self._report(plan, force=True)
+        return plan
+
+    async def _pause(self):
+        wait = self._pause_until - self._clock()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    async def _run_batch(self, plan: Plan, op: str, runner: BatchRunner, steps: list[Step]):
+        attempts = 0
+        while pending := [s for s in steps if s.status == PENDING]:
+            await self._pause()
+            attempts += 1
+            self.batch_calls += 1
+            try:
+                await runner(pending)
+            except Exception as e:
+                after = self._retry_after(e)
+                if after is not None and attempts < self.max_attempts:
+                    self.rate_limited += 1
+                    self._pause_until = max(self._pause_until, self._clock() + after)
+                    continue
+                log.warning("Batch %s failed in guild %s, falling back to single steps: %r", op, plan.guild_id, e)
+            break
+        await self._checkpoint(plan, force=True)
+        await self._report(plan)
+
+    async def _run(self, plan: Plan, step: Step, slots: asyncio.Semaphore):
+        tries = 0
+        async with slots:
+            while True:
+                await self._pause()
+                tries += 1
+                step.attempts += 1
+                self.step_calls += 1
+                try:
+                    await self._run_step(step)
+                except StepSkipped:
+                    step.status = SKIPPED
+                except Exception as e:
+                    after = self._retry_after(e)
+                    if after is not None and tries < self.max_attempts:
+                        self.rate_limited += 1
+                        self._pause_until = max(self._pause_until, self._clock() + after)
+                        continue
+                    log.warning("Provisioning step %s failed in guild %s: %r", step.key, plan.guild_id, e)
+                    step.status, step.error = FAILED, f"{type(e).__name__}: {e}"[:200]
+                else:
+                    step.status = DONE
+                break
+        await self._checkpoint(plan)
+        await self._report(plan)
+
+    async def _checkpoint(self, plan: Plan, force: bool = False):
+        now = self._clock()
+        if force or now - self._last_save >= self.save_every_s:
+            self._last_save = now
+            await self._save(plan)
+
+    async def _report(self, plan: Plan, force: bool = False):
+        if self._progress is None:
+            return
+        now = self._clock()
+        if force or now - self._last_progress >= self.progress_every_s:
+            self._last_progress = now
+            try:
+                await self._progress(plan)
+            except Exception as e:  # progress is cosmetic; never let it stop the run
+                log.debug("Provisioning progress update failed: %r", e)
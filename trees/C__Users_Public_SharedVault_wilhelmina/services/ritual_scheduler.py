@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Generic, TypeVar
+
+log = logging.getLogger(__name__)
+
+# Every pending ritual step, across all guilds, sits in one min-heap of
+# (due, seq, key). A single loop sleeps until the earliest due time and hands
+# due keys to a fixed pool of workers, so thousands of rituals cost one timer
+# and N tasks instead of a sleeping task each. Each key has at most one
+# pending entry; rescheduling or cancelling leaves the old heap entry behind
+# as stale and it is skipped when popped (or dropped on compaction).
+
+
+K = TypeVar("K", bound=Hashable)
+
+
+class BeatScheduler(Generic[K]):
+    def __init__(self, fire: Callable[[K], Awaitable[None]], workers: int = 8,
+                 clock: Callable[[], float] = time.time):
+        self._fire = fire
+        self.workers = workers
+        self._clock = clock
+        self._heap: list[tuple[float, int, K]] = []
+        self._due: dict[K, tuple[float, int]] = {}
+        self._seq = itertools.count()
+        self._wake: asyncio.Event | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self.fired = 0
+        self.errors = 0
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def due_at(self, key: K) -> float | None:
+        entry = self._due.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: K, due: float):
+        """Fire `key` at `due` (clock time), replacing any pending entry for it."""
+        seq = next(self._seq)
+        self._due[key] = (due, seq)
+        heapq.heappush(self._heap, (due, seq, key))
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._due):
+            self._compact()
+        if self._wake is not None and self._heap[0][1] == seq:
+            self._wake.set()
+
+    def cancel(self, key: K) -> bool:
+        return self._due.pop(key, None) is not None
+
+    def pop_due(self, now: float) -> list[K]:
+        """Remove and return every key due at or before `now`, earliest first."""
+        out = []
+        while self._heap and self._heap[0][0] <= now:
+            due, seq, key = heapq.heappop(self._heap)
+            if self._due.get(key) == (due, seq):
+                del self._due[key]
+                out.append(key)
+        return out
+
+    def next_due(self) -> float | None:
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][:2]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _compact(self):
+        self._heap = [(due, seq, key) for key, (due, seq) in self._due.items()]
+        heapq.heapify(self._heap)
+
+    # ---- running
+    def start(self):
+        self._wake = asyncio.Event()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._loop())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self):
+        tasks, self._tasks = self._tasks, []
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._wake = self._queue = None
+
+    async def _loop(self):
+        while True:
+            for key in self.pop_due(self._clock()):
+                self._queue.put_nowait(key)
+            nxt = self.next_due()
+            self._wake.clear()
+            timeout = None if nxt is None else max(0.0, nxt - self._clock())
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            try:
+                await self.run_one(key)
+            finally:
+                self._queue.task_done()
+
+    async def run_one(self, key: K):
+        self.fired += 1
+        try:
+            await self._fire(key)
+        except Exception:
+            self.errors += 1
+            log.exception("Scheduled step for %r failed", key)
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from services.member_cache import GuildChunker
+from services.member_index import MemberIndex
+from services.storage_sqlite import SQLiteStorage
+
+# Runs the real RitualQueue (cogs.onboarding) against fake guilds on a virtual
+# clock: the scheduler's heap is drained in due order and time jumps straight
+# to the next beat, so a 13-minute ritual takes milliseconds. Each step's real
+# CPU time is added to the virtual clock, so a slow step pushes later beats
+# late and shows up as drift, as it would on the live event loop.
+#
+#   python -m services.ritual_sim --rituals 1000 --members 100000
+#
+# Members are spread over the guilds by a 1/rank (Zipf) curve, so there are a
+# few big guilds and a long tail. Storage is real SQLite (in memory by
+# default); outbound sends are counted at the cog's post() boundary, before
+# the dispatcher, so "api_calls" is what the rituals ask Discord for.
+
+class _Perms:
+    __slots__ = ("administrator",)
+
+    def __init__(self, administrator: bool):
+        self.administrator = administrator
+
+
+class FakeMember:
+    __slots__ = ("id", "bot", "guild_permissions")
+
+    def __init__(self, uid: int, bot: bool = False, admin: bool = False):
+        self.id = uid
+        self.bot = bot
+        self.guild_permissions = _Perms(admin)
+
+    @property
+    def mention(self) -> str:
+        return f"<@{self.id}>"
+
+
+class FakeMessage:
+    __slots__ = ("id", "content", "embed")
+
+    def __init__(self, mid: int, content: str | None, embed: Any):
+        self.id = mid
+        self.content = content
+        self.embed = embed
+
+
+class FakeChannel:
+    def __init__(self, cid: int, guild: FakeGuild, keep: bool = False):
+        self.id = cid
+        self.guild = guild
+        self.sent = 0
+        self.keep = keep
+        self.messages: list[FakeMessage] = []
+
+    async def send(self, content: str | None = None, embed: Any = None, **_):
+        self.sent += 1
+        msg = FakeMessage(self.sent, content, embed)
+        if self.keep:
+            self.messages.append(msg)
+        return msg
+
+
+class FakeGuild:
+    def __init__(self, gid: int, members: Sequence[FakeMember]):
+        self.id = gid
+        self.name = f"sim-{gid}"
+        self.members = members
+
+
+class VirtualClock:
+    def __init__(self, start: float):
+        self.t = start
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class CountingStorage(SQLiteStorage):
+    """SQLite storage that counts write transactions."""
+
+    writes = 0
+
+    async def log_events(self, events):
+        self.writes += 1
+        await super().log_events(events)
+
+    async def prune_ritual_state(self, guild_id: int):
+        self.writes += 1
+        await super().prune_ritual_state(guild_id)
+
+
+class _SimBot:
+    def __init__(self, guilds: dict[int, FakeGuild]):
+        self._guilds = guilds
+
+    def get_guild(self, gid: int) -> FakeGuild | None:
+        return self._guilds.get(gid)
+
+
+def zipf_sizes(total: int, n: int) -> list[int]:
+    weights = [1 / r for r in range(1, n + 1)]
+    scale = total / sum(weights)
+    sizes = [max(1, int(w * scale)) for w in weights]
+    sizes[0] += total - sum(sizes)
+    return sizes
+
+
+def make_guilds(n: int, members: int, bot_share: float = 0.02, admin_share: float = 0.01,
+                rng: random.Random | None = None) -> list[FakeGuild]:
+    draw = rng.random if rng is not None else random.random
+    guilds, uid = [], 1
+    for gid, size in enumerate(zipf_sizes(members, n), start=1):
+        ms = []
+        for _ in range(size):
+            r = draw()
+            ms.append(FakeMember(uid, bot=r < bot_share, admin=bot_share <= r < bot_share + admin_share))
+            uid += 1
+        guilds.append(FakeGuild(gid, ms))
+    return guilds
+
+
+@dataclass
+class SimReport:
+    rituals: int
+    members: int
+    steps: int
+    sim_span_s: float
+    wall_s: float
+    drift_ms_p50: float
+    drift_ms_p99: float
+    drift_ms_max: float
+    cpu_us_per_step: float
+    index_build_ms: float
+    db_writes: int
+    api_calls: int
+    unfinished: int
+    drift_ms: list[float] = field(default_factory=list, repr=False)
+    circles: dict[int, FakeChannel] = field(default_factory=dict, repr=False)
+
+    def summary(self) -> dict[str, Any]:
+        return {k: v for k, v in asdict(self).items() if k not in ("drift_ms", "circles")}
+
+
+async def simulate(rituals: int = 10, members: int = 1_000, seed: int = 0, db_path: str = ":memory:",
+                   keep_messages: bool = False) -> SimReport:
+    from cogs.onboarding import DEFAULT_LANG, Onboarding, RitualQueue, utc_ts
+
+    class SimCog:
+        persist_ritual_state = Onboarding.persist_ritual_state
+        mention_pool = Onboarding.mention_pool
+        forget_members = Onboarding.forget_members
+
+        def __init__(self, guilds: list[FakeGuild], db: CountingStorage):
+            self.node = "sim"
+            self.lang = DEFAULT_LANG
+            self.db = db
+            self.members = MemberIndex()
+            self.chunker = GuildChunker()
+            self.bot = _SimBot({g.id: g for g in guilds})
+            self.circles = {g.id: FakeChannel(10_000 + g.id, g, keep_messages) for g in guilds}
+            self.api_calls = 0
+            self.admin_logs = 0
+
+        async def _get_or_create_circle(self, guild):
+            return self.circles[guild.id]
+
+        async def post(self, target, priority: int, guild_id: int = 0, **kwargs):
+            self.api_calls += 1
+            return await target.send(**kwargs)
+
+        async def log_admin(self, guild, kind: str, detail: dict[str, Any]):
+            self.admin_logs += 1
+
+    random.seed(seed)
+    guilds = make_guilds(rituals, members, rng=random.Random(seed))
+    db = CountingStorage(db_path)
+    await db.open()
+    cog = SimCog(guilds, db)
+
+    t_build = time.perf_counter()
+    for g in guilds:
+        await cog.mention_pool(g)
+    index_build_ms = (time.perf_counter() - t_build) * 1000
+
+    clock = VirtualClock(utc_ts())
+    rq = RitualQueue(cog, clock=clock)
+    sched = rq.scheduler
+    for g in guilds:
+        await rq.start(g, cog.circles[g.id])
+    db.writes = 0
+    start = clock.t
+
+    drift: list[float] = []
+    # The beat plan can put a step before the previous one (its jitter is
+    # cumulative), so drift is measured from when a step could first fire.
+    ready_at: dict[int, float] = {}
+    cpu = 0.0
+    wall0 = time.perf_counter()
+    while (due := sched.next_due()) is not None:
+        clock.t = max(clock.t, due)
+        for key in sched.pop_due(due):
+            drift.append((clock.t - max(due, ready_at.get(key, due))) * 1000)
+            c0, w0 = time.process_time(), time.perf_counter()
+            await sched.run_one(key)
+            cpu += time.process_time() - c0
+            clock.t += time.perf_counter() - w0
+            ready_at[key] = clock.t
+    wall = time.perf_counter() - wall0
+    await db.close()
+
+    q = statistics.quantiles(drift, n=100) if len(drift) > 1 else [0.0] * 99
+    report = SimReport(
+        rituals=rituals, members=members, steps=len(drift), sim_span_s=round(clock.t - start, 1),
+        wall_s=round(wall, 3), drift_ms_p50=round(q[49], 3), drift_ms_p99=round(q[98], 3),
+        drift_ms_max=round(max(drift, default=0.0), 3),
+        cpu_us_per_step=round(1e6 * cpu / max(1, len(drift)), 1), index_build_ms=round(index_build_ms, 1),
+        db_writes=db.writes, api_calls=cog.api_calls, unfinished=len(rq.states), drift_ms=drift,
+        circles=cog.circles,
+    )
+    return report
+
+
+def main(argv: Sequence[str] | None = None):
+    ap = argparse.ArgumentParser(description="Virtual-clock ritual simulator / benchmark")
+    ap.add_argument("--rituals", type=int, default=1000, help="simultaneous rituals (one guild each)")
+    ap.add_argument("--members", type=int, default=100_000, help="members across all guilds (Zipf-distributed)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--db", default=":memory:", help="SQLite path (default: in memory)")
+    args = ap.parse_args(argv)
+    report = asyncio.run(simulate(args.rituals, args.members, args.seed, args.db))
+    width = max(map(len, report.summary()))
+    for k, v in report.summary().items():
+        print(f"{k:<{width}}  {v}")
+
+
+if __name__ == "__main__":
+    main()
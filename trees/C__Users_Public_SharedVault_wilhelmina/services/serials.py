@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+# Contract serials run 1..SERIAL_MAX and wrap back to 1. The DB hands out
+# blocks atomically; SerialAllocator keeps one block per guild in memory so a
+# join wave mints serials without a DB round trip each.
+
+SERIAL_MAX = 9999
+
+
+def wrap_serial(start: int, offset: int) -> int:
+    """The serial `offset` places after `start`, wrapping 9999 -> 1."""
+    return (start - 1 + offset) % SERIAL_MAX + 1
+
+
+@dataclass
+class SerialLease:
+    start: int
+    size: int
+    used: int = 0
+    leased_at: float = 0.0
+
+    @property
+    def remaining(self) -> int:
+        return self.size - self.used
+
+    def take(self) -> int:
+        serial = wrap_serial(self.start, self.used)
+        self.used += 1
+        return serial
+
+    @property
+    def end(self) -> int:
+        """The counter value the DB was left at after this lease."""
+        return wrap_serial(self.start, self.size)
+
+
+class SerialAllocator:
+    """Per-guild serial leases on top of an atomic `lease(guild_id, n) -> start`.
+
+    Blocks start at one serial (no gaps for trickle signups) and double while
+    refills keep arriving within `hot_window_s`, up to `max_block`.
+    `release(guild_id, start, size, expected_next)` hands unused serials back
+    when no other writer has advanced the counter since; otherwise they are
+    skipped, which is harmless because soul IDs also carry the name glyph.
+    """
+
+    def __init__(self, lease: Callable[[int, int], Awaitable[int]],
+                 release: Callable[[int, int, int], Awaitable[bool]] | None = None,
+                 max_block: int = 256, hot_window_s: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self._lease = lease
+        self._release = release
+        self.max_block = max(1, min(max_block, SERIAL_MAX))
+        self.hot_window_s = hot_window_s
+        self._clock = clock
+        self._leases: dict[int, SerialLease] = {}
+        self._block: dict[int, int] = {}
+        self._refill_lock = asyncio.Lock()
+        self.db_round_trips = 0
+
+    async def next(self, guild_id: int) -> int:
+        lease = self._leases.get(guild_id)
+        if lease is None or lease.remaining <= 0:
+            async with self._refill_lock:
+                # another caller may have refilled while we waited
+                lease = self._leases.get(guild_id)
+                if lease is None or lease.remaining <= 0:
+                    lease = await self._refill(guild_id, lease)
+        return lease.take()
+
+    async def _refill(self, guild_id: int, prev: SerialLease | None) -> SerialLease:
+        now = self._clock()
+        block = self._block.get(guild_id, 1)
+        if prev is not None and now - prev.leased_at <= self.hot_window_s:
+            block = min(block * 2, self.max_block)
+        else:
+            block = 1
+        self._block[guild_id] = block
+        start = await self._lease(guild_id, block)
+        self.db_round_trips += 1
+        lease = SerialLease(start=start, size=block, leased_at=now)
+        self._leases[guild_id] = lease
+        return lease
+
+    async def release_all(self) -> dict[int, int]:
+        """Return unused serials on shutdown. Maps guild_id -> serials given back."""
+        returned: dict[int, int] = {}
+        for guild_id, lease in list(self._leases.items()):
+            if lease.remaining > 0 and self._release is not None:
+                first_unused = wrap_serial(lease.start, lease.used)
+                if await self._release(guild_id, first_unused, lease.end):
+                    returned[guild_id] = lease.remaining
+            del self._leases[guild_id]
+        return returned
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import datetime as dt
+import random
+import re
+
+# Soul IDs look like ⛧WLMN-0042-AB25Ψ7⛧ : serial, name glyph, two-digit year,
+# entropy rune and digit. Minting draws from a private RNG so it never
+# disturbs (or is disturbed by) the module-level `random` used for dice,
+# the 8-ball and ritual pacing.
+
+RUNES = ["Ψ", "Ω", "Σ", "Δ", "✶", "⟡", "☿", "♇"]
+
+SOUL_ID_RE = re.compile(
+    r"⛧WLMN-(?P<serial>\d{4})-(?P<glyph>[A-Z]{2})(?P<yy>\d{2})(?P<rune>[" + "".join(RUNES) + r"])(?P<digit>\d)⛧"
+)
+# Same shape without the ⛧ wrappers, for IDs pasted from systems that drop them
+_BARE_RE = re.compile(SOUL_ID_RE.pattern.replace("⛧", ""))
+
+_rng = random.Random()
+
+
+def name_glyph(chosen_name: str) -> str:
+    letters = re.findall(r"[A-Za-z]", chosen_name or "")
+    glyph = "".join(letters)[:2].upper()
+    return glyph.ljust(2, "X")
+
+
+def mint_soul_id(chosen_name: str, when: dt.datetime, rng: random.Random | None = None) -> str:
+    rng = rng or _rng
+    glyph = name_glyph(chosen_name)
+    yy = f"{when.year % 100:02d}"
+    rune = rng.choice(RUNES)
+    digit = rng.randint(0, 9)
+    serial = "0000"
+    sigil = f"{glyph}{yy}{rune}{digit}"
+    return f"⛧WLMN-{serial}-{sigil}⛧"
+
+
+def with_serial(soul_id: str, serial: int) -> str:
+    return soul_id.replace("0000", f"{serial:04d}", 1)
+
+
+def normalize_soul_id(text: str) -> str | None:
+    """Canonical form of a pasted ID (case, backticks, missing ⛧), or None if malformed."""
+    t = re.sub(r"[a-z]", lambda m: m.group(0).upper(), (text or "").strip().strip("`").strip())
+    if SOUL_ID_RE.fullmatch(t):
+        return t
+    bare = t.strip("⛧")
+    if _BARE_RE.fullmatch(bare):
+        return f"⛧{bare}⛧"
+    return None
+
+
+def parse_soul_id_list(blob: str) -> tuple[list[str], list[str]]:
+    """Split pasted text on whitespace/commas/semicolons.
+
+    Returns (canonical IDs in order, de-duplicated; tokens that are not IDs).
+    """
+    seen, ids, malformed = set(), [], []
+    for token in re.split(r"[\s,;]+", blob or ""):
+        if not token:
+            continue
+        sid = normalize_soul_id(token)
+        if sid is None:
+            malformed.append(token)
+        elif sid not in seen:
+            seen.add(sid)
+            ids.append(sid)
+    return ids, malformed
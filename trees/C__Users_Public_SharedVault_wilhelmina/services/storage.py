@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, TypedDict
+
+from services.event_archive import EventArchive
+
+# Storage is the one place the bot keeps state. Backends:
+#   sqlite  - a single local file (default; what a lone bot process wants)
+#   mongo   - MongoDB via an async pooled client, shareable across processes/hosts
+# Every method is a coroutine so callers look the same whichever backend is live.
+
+FETCH_ROWS = 500
+ARCHIVE_BATCH_ROWS = 500
+AUDIT_PAGE_SIZE = 10
+
+# detail_json keys stripped when a member's events are anonymized
+ERASE_DETAIL_KEYS = ("user_id", "soul_id", "thread_id", "channel_id", "message_id", "reason")
+# kind -> detail_json list of member ids an erased member is removed from, whatever the mode
+ERASE_ID_LISTS = {"ritual_state": "mentioned", "circle_interruption_deleted": "user_ids"}
+# members columns cleared when a member is anonymized; the row (and signed_at) stays for counts,
+# re-keyed to a negative surrogate user_id (-1, -2, ... per guild) that no Discord user can have
+ERASE_MEMBER_COLUMNS = ("chosen_name", "birthdate", "soul_id")
+
+# (guild_id, actor_id, kind, detail) as passed to log_events
+EventIn = tuple[int, int | None, str, dict[str, Any]]
+
+
+class EventWindow(TypedDict):
+    """iter_events bounds shared by the live table and EventArchive, e.g. for one export."""
+
+    after_id: int
+    upto_id: int | None
+    since_ts: str | None
+
+
+class DuplicateKey(Exception):
+    """A write collided with a unique key (e.g. a soul ID already bound)."""
+
+
+class BackupUnsupported(Exception):
+    """The active backend has no online snapshot support."""
+
+
+class Storage:
+    """Backend-neutral persistence API used by the cogs.
+
+    Rows come back as plain dicts with the SQLite column names, so exports and
+    the audit log format the same on every backend. Event ids are integers
+    increasing in insert order on every backend.
+    """
+
+    name = "storage"
+
+    def __init__(self, default_tz: str = "UTC"):
+        self.default_tz = default_tz
+
+    async def open(self):
+        """Create tables/collections and indexes. Safe to call on every start."""
+
+    async def close(self):
+        pass
+
+    # ---- guild config
+    async def upsert_guild_config(self, guild_id: int, **kwargs):
+        raise NotImplementedError
+
+    async def get_guild_config(self, guild_id: int) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    async def list_dashboard_guilds(self) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    # ---- members
+    async def get_member(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    async def upsert_member(self, guild_id: int, user_id: int, **kwargs):
+        """Raises DuplicateKey if `soul_id` is already bound to another member."""
+        raise NotImplementedError
+
+    async def find_by_soul_id(self, guild_id: int, soul_id: str) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    async def find_soul_ids(self, guild_id: int, soul_ids: list[str]) -> dict[str, dict[str, Any]]:
+        """Bulk reverse lookup; returns only the IDs that exist in this guild."""
+        raise NotImplementedError
+
+    async def list_members(self, guild_id: int) -> list[dict[str, Any]]:
+        return [m async for m in self.iter_members(guild_id)]
+
+    def iter_members(self, guild_id: int, changed_after: str | None = None, changed_upto: str | None = None,
+                     batch: int = FETCH_ROWS) -> AsyncIterator[dict[str, Any]]:
+        """Members by signed_at, or by updated_at within (changed_after, changed_upto] for deltas."""
+        raise NotImplementedError
+
+    # ---- events
+    async def log_event(self, guild_id: int, actor_id: int | None, kind: str, detail: dict[str, Any]):
+        await self.log_events([(guild_id, actor_id, kind, detail)])
+
+    async def log_events(self, events: Sequence[EventIn]):
+        """Insert several events (and their rollups) in one write."""
+        raise NotImplementedError
+
+    async def last_contract_sent(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    async def rollup_totals(self, guild_id: int, grain: str, since_bucket: str) -> dict[str, tuple[int, float]]:
+        raise NotImplementedError
+
+    async def list_events(self, guild_id: int) -> list[dict[str, Any]]:
+        return [e async for e in self.iter_events(guild_id)]
+
+    def iter_events(self, guild_id: int, after_id: int = 0, upto_id: int | None = None,
+                    since_ts: str | None = None, batch: int = FETCH_ROWS) -> AsyncIterator[dict[str, Any]]:
+        raise NotImplementedError
+
+    async def event_ts(self, guild_id: int, event_id: int) -> str | None:
+        """ts of the newest event at or before `event_id`."""
+        raise NotImplementedError
+
+    async def max_event_id(self, guild_id: int) -> int:
+        raise NotImplementedError
+
+    async def search_events(self, guild_id: int, kind: str | None = None, actor_id: int | None = None,
+                            user_id: int | None = None, since: str | None = None, until: str | None = None,
+                            text: str | None = None, before_id: int | None = None,
+                            after_id: int | None = None, limit: int = AUDIT_PAGE_SIZE) -> list[dict[str, Any]]:
+        """Filtered audit query, newest first, keyset-paginated on id.
+
+        Pass `before_id` for the next (older) page or `after_id` for the previous one.
+        """
+        raise NotImplementedError
+
+    async def prune_ritual_state(self, guild_id: int):
+        raise NotImplementedError
+
+    # ---- erasure
+    async def erase_member(self, guild_id: int, user_id: int, anonymize: bool = False) -> dict[str, int]:
+        """Remove (or anonymize) a user's members row and events. Returns row counts."""
+        raise NotImplementedError
+
+    # ---- export watermarks
+    async def get_export_watermark(self, guild_id: int, requester_id: int) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    async def set_export_watermark(self, guild_id: int, requester_id: int, last_event_id: int, last_ts: str):
+        raise NotImplementedError
+
+    # ---- retention / maintenance
+    async def archive_event_batch(self, archive: EventArchive, cutoffs: dict[str, str | None],
+                                  drop_kinds=(), limit: int = ARCHIVE_BATCH_ROWS) -> int:
+        """Move one batch of expired events to cold storage. Returns rows removed (0 = done)."""
+        raise NotImplementedError
+
+    async def ensure_incremental_vacuum(self) -> bool:
+        return False
+
+    async def incremental_vacuum(self, pages: int = 256) -> int:
+        return 0
+
+    async def analyze(self):
+        pass
+
+    # ---- backups
+    async def snapshot(self, dest_dir: str, pages: int, sleep_s: float, keep: int):
+        raise BackupUnsupported(f"{self.name} has no online snapshots; use the backend's own tooling")
+
+    async def restore(self, snapshot_path: str):
+        raise BackupUnsupported(f"{self.name} has no online snapshots; use the backend's own tooling")
+
+    async def record_backup(self, **fields):
+        raise NotImplementedError
+
+    async def recent_backups(self, limit: int = 5) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
+    # ---- serials
+    async def get_and_inc_serial(self, guild_id: int) -> int:
+        return await self.lease_serials(guild_id, 1)
+
+    async def lease_serials(self, guild_id: int, count: int) -> int:
+        """Atomically reserve `count` consecutive serials (wrapping 9999 -> 1); returns the first."""
+        raise NotImplementedError
+
+    async def release_serials(self, guild_id: int, first_unused: int, expected_next: int) -> bool:
+        """Rewind the counter to `first_unused` if nobody leased past `expected_next` meanwhile."""
+        raise NotImplementedError
+
+    # ---- leases (coordination between bot processes sharing this store)
+    async def acquire_lease(self, key: str, owner: str, ttl_s: float) -> bool:
+        """Take or renew `key` for `owner`; refused while another owner's lease is unexpired."""
+        raise NotImplementedError
+
+    async def release_lease(self, key: str, owner: str) -> bool:
+        raise NotImplementedError
+
+    # ---- provisioning progress (/init-server resumes from here)
+    async def save_provision_plan(self, guild_id: int, plan: dict[str, Any]):
+        raise NotImplementedError
+
+    async def get_provision_plan(self, guild_id: int) -> dict[str, Any] | None:
+        raise NotImplementedError
+
+    async def clear_provision_plan(self, guild_id: int):
+        raise NotImplementedError
+
+    # ---- contract delivery queue (one row per member awaiting a contract)
+    async def enqueue_contract(self, guild_id: int, user_id: int):
+        raise NotImplementedError
+
+    async def dequeue_contract(self, guild_id: int, user_id: int):
+        raise NotImplementedError
+
+    async def pending_contracts(self) -> list[dict[str, Any]]:
+        """Queued deliveries, oldest first."""
+        raise NotImplementedError
+
+
+def open_storage(backend: str | None = None, default_tz: str = "UTC", **options) -> Storage:
+    """Build the configured backend (STORAGE_BACKEND env: sqlite | mongo). Call `await .open()` next."""
+    backend = (backend or os.getenv("STORAGE_BACKEND", "sqlite")).lower()
+    if backend == "sqlite":
+        from services.storage_sqlite import SQLiteStorage
+        return SQLiteStorage(options.get("path") or os.getenv("SQLITE_PATH", "data/wilhelmina.sqlite"),
+                             default_tz=default_tz, shared=options.get("shared", os.getenv("SQLITE_SHARED") == "1"))
+    if backend in ("mongo", "mongodb"):
+        from services.storage_mongo import MongoStorage
+        uri = options.get("uri") or os.getenv("MONGO_URI")
+        if not uri:
+            raise RuntimeError("STORAGE_BACKEND=mongo needs MONGO_URI")
+        return MongoStorage(uri, db_name=options.get("db_name") or os.getenv("MONGO_DB", "wilhelmina"),
+                            default_tz=default_tz)
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def erasure_transform(user_id: int, anonymize: bool):
+    """Row filter applying erase_member's rules to one event row (archive rewrite, Mongo)."""
+    def fn(row: dict[str, Any]) -> dict[str, Any] | None:
+        detail = json.loads(row.get("detail_json") or "{}")
+        if not isinstance(detail, dict):
+            return row
+        listed = _drop_listed_id(row.get("kind"), detail, user_id)
+        subject = detail.get("user_id") == user_id
+        if not subject and row.get("actor_id") != user_id:
+            if listed:
+                row["detail_json"] = json.dumps(detail, ensure_ascii=False)
+            return row
+        if not anonymize:
+            return None
+        if subject:
+            for k in ERASE_DETAIL_KEYS:
+                detail.pop(k, None)
+            detail["redacted"] = True
+        if subject or listed:
+            row["detail_json"] = json.dumps(detail, ensure_ascii=False)
+        if row.get("actor_id") == user_id:
+            row["actor_id"] = None
+        return row
+    return fn
+
+
+def _drop_listed_id(kind: str | None, detail: dict[str, Any], user_id: int) -> bool:
+    key = ERASE_ID_LISTS.get(kind or "")
+    ids = detail.get(key) if key else None
+    if not isinstance(ids, list) or user_id not in ids:
+        return False
+    detail[key] = [i for i in ids if i != user_id]
+    return True
+
+
+def chunk(seq: list[Any], n: int):
+    for i in range(0, len(seq), n):
+        yield seq[i:i+n]
@@ -0,0 +1,447 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import json
+import os
+import re
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from typing import Any
+
+from services.analytics import rollup_keys, rollup_weight
+from services.event_archive import EventArchive
+from services.serials import SERIAL_MAX, wrap_serial
+from services.storage import (
+    ARCHIVE_BATCH_ROWS,
+    AUDIT_PAGE_SIZE,
+    ERASE_ID_LISTS,
+    ERASE_MEMBER_COLUMNS,
+    FETCH_ROWS,
+    DuplicateKey,
+    EventIn,
+    Storage,
+    erasure_transform,
+)
+
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReturnDocument, UpdateOne
+    from pymongo.errors import DuplicateKeyError
+except ImportError:  # optional: only needed with STORAGE_BACKEND=mongo
+    AsyncIOMotorClient = None  # type: ignore[assignment,misc]
+
+# Documents mirror the SQLite rows: same field names, events keyed by an
+# integer `_id` drawn in blocks from `counters`, so ids stay monotonic across
+# processes. `subject_user_id` / `via` are stored at insert time (SQLite derives
+# them as generated columns). Multi-document writes are not wrapped in
+# transactions, which would require a replica set.
+
+MONGO_POOL_MAX = int(os.getenv("MONGO_POOL_MAX", "20"))
+MONGO_POOL_MIN = int(os.getenv("MONGO_POOL_MIN", "2"))
+
+GUILD_FIELDS = ["guild_id", "signed_role_id", "circle_channel_id", "admin_log_channel_id", "tz", "created_at",
+                "analytics_channel_id", "analytics_message_id", "kiosk_message_id"]
+MEMBER_FIELDS = ["guild_id", "user_id", "chosen_name", "birthdate", "signed_at", "soul_id", "updated_at"]
+EVENT_FIELDS = ["id", "guild_id", "actor_id", "kind", "detail_json", "ts", "subject_user_id", "via"]
+
+INDEXES = {
+    "members": [
+        IndexModel([("guild_id", ASCENDING), ("user_id", ASCENDING)], unique=True),
+        IndexModel([("soul_id", ASCENDING)], unique=True,
+                   partialFilterExpression={"soul_id": {"$type": "string"}}),
+        IndexModel([("guild_id", ASCENDING), ("signed_at", ASCENDING)]),
+        IndexModel([("guild_id", ASCENDING), ("updated_at", ASCENDING)]),
+    ],
+    "events": [
+        IndexModel([("guild_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("guild_id", ASCENDING), ("kind", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("guild_id", ASCENDING), ("actor_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("guild_id", ASCENDING), ("subject_user_id", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("kind", ASCENDING), ("ts", ASCENDING)]),
+        IndexModel([("ts", ASCENDING)]),
+    ],
+    "event_rollups": [
+        IndexModel([("guild_id", ASCENDING), ("grain", ASCENDING), ("bucket", ASCENDING), ("metric", ASCENDING)],
+                   unique=True),
+    ],
+    "export_watermarks": [
+        IndexModel([("guild_id", ASCENDING), ("requester_id", ASCENDING)], unique=True),
+    ],
+} if AsyncIOMotorClient is not None else {}
+
+
+def _row(doc: dict[str, Any] | None, fields: list[str], id_field: str | None = None) -> dict[str, Any] | None:
+    if doc is None:
+        return None
+    if id_field:
+        doc = {**doc, id_field: doc.get("_id")}
+    return {f: doc.get(f) for f in fields}
+
+
+def _event_row(doc):
+    return _row(doc, EVENT_FIELDS, "id")
+
+
+def _text_query(text: str) -> str:
+    """Each word as a quoted phrase: all must match, no operator syntax leaks through."""
+    return " ".join('"' + w.replace('"', "") + '"' for w in text.split())
+
+
+class MongoStorage(Storage):
+    """MongoDB through one pooled motor client shared by every coroutine.
+
+    Single log_event calls made in the same event-loop tick are coalesced into
+    one insert_many plus one rollup bulk_write.
+    """
+
+    name = "mongo"
+
+    def __init__(self, uri: str | None = None, db_name: str = "wilhelmina", default_tz: str = "UTC",
+                 client=None, text_index: bool = True):
+        super().__init__(default_tz)
+        if client is None:
+            if AsyncIOMotorClient is None:
+                raise RuntimeError("STORAGE_BACKEND=mongo needs the 'motor' package")
+            client = AsyncIOMotorClient(uri, maxPoolSize=MONGO_POOL_MAX, minPoolSize=MONGO_POOL_MIN,
+                                        retryWrites=True, tz_aware=False)
+        self._client = client
+        self._db = client[db_name]
+        self.text_index = text_index
+        self._pending: list[tuple[EventIn, asyncio.Future]] = []
+        self._flusher: asyncio.Task | None = None
+
+    async def open(self):
+        for name, models in INDEXES.items():
+            await self._db[name].create_indexes(models)
+        if self.text_index:
+            await self._db.events.create_index([("detail_json", TEXT)], default_language="none")
+
+    async def close(self):
+        if self._flusher is not None:
+            await self._flusher
+        self._client.close()
+
+    # ---- guild config
+    async def upsert_guild_config(self, guild_id: int, **kwargs):
+        on_insert = {"created_at": dt.datetime.utcnow().isoformat()}
+        if not kwargs.get("tz"):
+            kwargs.pop("tz", None)
+            on_insert["tz"] = self.default_tz
+        update: dict[str, Any] = {"$setOnInsert": on_insert}
+        if kwargs:
+            update["$set"] = kwargs
+        await self._db.guild_config.update_one({"_id": guild_id}, update, upsert=True)
+
+    async def get_guild_config(self, guild_id: int) -> dict[str, Any] | None:
+        return _row(await self._db.guild_config.find_one({"_id": guild_id}), GUILD_FIELDS, "guild_id")
+
+    async def list_dashboard_guilds(self) -> list[dict[str, Any]]:
+        cursor = self._db.guild_config.find({"analytics_channel_id": {"$ne": None}})
+        return [_row(d, GUILD_FIELDS, "guild_id") async for d in cursor]
+
+    # ---- members
+    async def get_member(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        return _row(await self._db.members.find_one({"guild_id": guild_id, "user_id": user_id}), MEMBER_FIELDS)
+
+    async def upsert_member(self, guild_id: int, user_id: int, **kwargs):
+        fields = {**kwargs, "updated_at": dt.datetime.utcnow().isoformat()}
+        try:
+            await self._db.members.update_one({"guild_id": guild_id, "user_id": user_id},
+                                              {"$set": fields}, upsert=True)
+        except DuplicateKeyError as e:
+            raise DuplicateKey(str(e)) from e
+
+    async def find_by_soul_id(self, guild_id: int, soul_id: str) -> dict[str, Any] | None:
+        return _row(await self._db.members.find_one({"soul_id": soul_id, "guild_id": guild_id}), MEMBER_FIELDS)
+
+    async def find_soul_ids(self, guild_id: int, soul_ids: list[str]) -> dict[str, dict[str, Any]]:
+        cursor = self._db.members.find({"soul_id": {"$in": list(soul_ids)}, "guild_id": guild_id})
+        return {d["soul_id"]: _row(d, MEMBER_FIELDS) async for d in cursor}
+
+    async def iter_members(self, guild_id: int, changed_after: str | None = None,
+                           changed_upto: str | None = None, batch: int = FETCH_ROWS):
+        if changed_after is None and changed_upto is None:
+            cursor = self._db.members.find({"guild_id": guild_id}).sort("signed_at", ASCENDING)
+        else:
+            q = {"guild_id": guild_id, "updated_at": {"$gt": changed_after or "", "$lte": changed_upto or "9999"}}
+            cursor = self._db.members.find(q).sort("updated_at", ASCENDING)
+        async for d in cursor.batch_size(batch):
+            yield _row(d, MEMBER_FIELDS)
+
+    # ---- events
+    async def _next_ids(self, n: int) -> range:
+        doc = await self._db.counters.find_one_and_update({"_id": "events"}, {"$inc": {"seq": n}},
+                                                          upsert=True, return_document=ReturnDocument.AFTER)
+        return range(doc["seq"] - n + 1, doc["seq"] + 1)
+
+    async def log_event(self, guild_id: int, actor_id: int | None, kind: str, detail: dict[str, Any]):
+        fut = asyncio.get_running_loop().create_future()
+        self._pending.append(((guild_id, actor_id, kind, detail), fut))
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.create_task(self._flush_pending())
+        await fut
+
+    async def _flush_pending(self):
+        await asyncio.sleep(0)  # let the rest of this tick queue up behind us
+        while self._pending:
+            batch, self._pending = self._pending, []
+            try:
+                await self.log_events([e for e, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+            else:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_result(None)
+
+    async def log_events(self, events: Sequence[EventIn]):
+        if not events:
+            return
+        ts = dt.datetime.utcnow().isoformat()
+        ids = await self._next_ids(len(events))
+        docs = []
+        rollups: dict[tuple[int, str, str, str], list[float]] = defaultdict(lambda: [0, 0.0])
+        for event_id, (guild_id, actor_id, kind, detail) in zip(ids, events, strict=True):
+            docs.append({
+                "_id": event_id, "guild_id": guild_id, "actor_id": actor_id, "kind": kind,
+                "detail_json": json.dumps(detail, ensure_ascii=False), "ts": ts,
+                "subject_user_id": detail.get("user_id"), "via": detail.get("via"),
+            })
+            for grain, bucket, metric, value in rollup_keys(kind, detail, ts):
+                acc = rollups[(guild_id, grain, bucket, metric)]
+                acc[0] += rollup_weight(detail)
+                acc[1] += value
+        await self._db.events.insert_many(docs, ordered=False)
+        if rollups:
+            await self._db.event_rollups.bulk_write([
+                UpdateOne({"guild_id": g, "grain": grain, "bucket": bucket, "metric": metric},
+                          {"$inc": {"count": n, "total": total}}, upsert=True)
+                for (g, grain, bucket, metric), (n, total) in rollups.items()
+            ], ordered=False)
+
+    async def last_contract_sent(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        doc = await self._db.events.find_one({"guild_id": guild_id, "actor_id": user_id, "kind": "contract_sent"},
+                                             sort=[("_id", DESCENDING)])
+        return _event_row(doc)
+
+    async def rollup_totals(self, guild_id: int, grain: str, since_bucket: str) -> dict[str, tuple[int, float]]:
+        cursor = self._db.event_rollups.aggregate([
+            {"$match": {"guild_id": guild_id, "grain": grain, "bucket": {"$gte": since_bucket}}},
+            {"$group": {"_id": "$metric", "n": {"$sum": "$count"}, "t": {"$sum": "$total"}}},
+        ])
+        return {d["_id"]: (d["n"], d["t"]) async for d in cursor}
+
+    async def iter_events(self, guild_id: int, after_id: int = 0, upto_id: int | None = None,
+                          since_ts: str | None = None, batch: int = FETCH_ROWS):
+        id_range: dict[str, Any] = {"$gt": after_id}
+        if upto_id is not None:
+            id_range["$lte"] = upto_id
+        q: dict[str, Any] = {"guild_id": guild_id, "_id": id_range}
+        if since_ts:
+            q["ts"] = {"$gt": since_ts}
+        async for d in self._db.events.find(q).sort("_id", ASCENDING).batch_size(batch):
+            yield _event_row(d)
+
+    async def event_ts(self, guild_id: int, event_id: int) -> str | None:
+        doc = await self._db.events.find_one({"guild_id": guild_id, "_id": {"$lte": event_id}},
+                                             sort=[("_id", DESCENDING)], projection={"ts": 1})
+        return doc["ts"] if doc else None
+
+    async def max_event_id(self, guild_id: int) -> int:
+        doc = await self._db.events.find_one({"guild_id": guild_id}, sort=[("_id", DESCENDING)], projection={"_id": 1})
+        return doc["_id"] if doc else 0
+
+    async def search_events(self, guild_id: int, kind: str | None = None, actor_id: int | None = None,
+                            user_id: int | None = None, since: str | None = None, until: str | None = None,
+                            text: str | None = None, before_id: int | None = None,
+                            after_id: int | None = None, limit: int = AUDIT_PAGE_SIZE) -> list[dict[str, Any]]:
+        q: dict[str, Any] = {"guild_id": guild_id}
+        if kind:
+            q["kind"] = kind
+        if actor_id is not None:
+            q["actor_id"] = actor_id
+        if user_id is not None:
+            q["subject_user_id"] = user_id
+        ts: dict[str, Any] = {}
+        if since:
+            ts["$gte"] = since
+        if until:
+            ts["$lt"] = until
+        if ts:
+            q["ts"] = ts
+        ids: dict[str, Any] = {}
+        if before_id is not None:
+            ids["$lt"] = before_id
+        if after_id is not None:
+            ids["$gt"] = after_id
+        if ids:
+            q["_id"] = ids
+        if text:
+            if self.text_index:
+                q["$text"] = {"$search": _text_query(text)}
+            else:
+                q["detail_json"] = {"$regex": re.escape(text), "$options": "i"}
+        order = ASCENDING if after_id is not None and before_id is None else DESCENDING
+        rows = [_event_row(d) async for d in self._db.events.find(q).sort("_id", order).limit(limit)]
+        return rows if order == DESCENDING else rows[::-1]
+
+    async def prune_ritual_state(self, guild_id: int):
+        await self._db.events.delete_many({"guild_id": guild_id, "kind": "ritual_state"})
+
+    # ---- erasure
+    async def erase_member(self, guild_id: int, user_id: int, anonymize: bool = False) -> dict[str, int]:
+        """Same rules as the SQLite backend, applied per document (no multi-document transaction)."""
+        key = {"guild_id": guild_id, "user_id": user_id}
+        if anonymize:
+            members = await self._anonymize_member(guild_id, user_id)
+        else:
+            members = (await self._db.members.delete_one(key)).deleted_count
+        await self._db.contract_queue.delete_one({"_id": f"{guild_id}:{user_id}"})
+        await self._db.export_watermarks.delete_many({"guild_id": guild_id, "requester_id": user_id})
+        await self._drop_listed_id(guild_id, user_id)
+        q = {"guild_id": guild_id, "$or": [{"subject_user_id": user_id}, {"actor_id": user_id}]}
+        if not anonymize:
+            events = (await self._db.events.delete_many(q)).deleted_count
+            return {"members": members, "events": events}
+        scrub = erasure_transform(user_id, anonymize=True)
+        ops = []
+        async for d in self._db.events.find(q):
+            row = scrub(_event_row(d))
+            fields = {"actor_id": row["actor_id"], "detail_json": row["detail_json"]}
+            if d.get("subject_user_id") == user_id:
+                fields["subject_user_id"] = None
+            ops.append(UpdateOne({"_id": d["_id"]}, {"$set": fields}))
+        if ops:
+            await self._db.events.bulk_write(ops, ordered=False)
+        return {"members": members, "events": len(ops)}
+
+    async def _anonymize_member(self, guild_id: int, user_id: int) -> int:
+        # unset rather than null: the soul_id index is unique over the documents that have one
+        cleared = {c: "" for c in ERASE_MEMBER_COLUMNS}
+        for _ in range(5):  # another process may take the same surrogate first
+            lowest = await self._db.members.find_one({"guild_id": guild_id}, sort=[("user_id", ASCENDING)])
+            surrogate = min(lowest["user_id"] if lowest else 0, 0) - 1
+            try:
+                res = await self._db.members.update_one(
+                    {"guild_id": guild_id, "user_id": user_id},
+                    {"$set": {"user_id": surrogate, "updated_at": dt.datetime.utcnow().isoformat()},
+                     "$unset": cleared})
+            except DuplicateKeyError:
+                continue
+            return res.matched_count
+        raise DuplicateKey(f"no free surrogate id for guild {guild_id}")
+
+    async def _drop_listed_id(self, guild_id: int, user_id: int):
+        # detail_json is a string here, so the id lists are filtered client-side
+        q = {"guild_id": guild_id, "kind": {"$in": list(ERASE_ID_LISTS)},
+             "actor_id": {"$ne": user_id}, "subject_user_id": {"$ne": user_id}}
+        scrub = erasure_transform(user_id, anonymize=False)
+        ops = []
+        async for d in self._db.events.find(q):
+            row = scrub(_event_row(d))
+            if row["detail_json"] != d["detail_json"]:
+                ops.append(UpdateOne({"_id": d["_id"]}, {"$set": {"detail_json": row["detail_json"]}}))
+        if ops:
+            await self._db.events.bulk_write(ops, ordered=False)
+
+    # ---- export watermarks
+    async def get_export_watermark(self, guild_id: int, requester_id: int) -> dict[str, Any] | None:
+        doc = await self._db.export_watermarks.find_one({"guild_id": guild_id, "requester_id": requester_id})
+        return _row(doc, ["guild_id", "requester_id", "last_event_id", "last_ts", "updated_at"])
+
+    async def set_export_watermark(self, guild_id: int, requester_id: int, last_event_id: int, last_ts: str):
+        await self._db.export_watermarks.update_one(
+            {"guild_id": guild_id, "requester_id": requester_id},
+            {"$set": {"last_event_id": last_event_id, "last_ts": last_ts,
+                      "updated_at": dt.datetime.utcnow().isoformat()}},
+            upsert=True)
+
+    # ---- retention / maintenance
+    async def archive_event_batch(self, archive: EventArchive, cutoffs: dict[str, str | None],
+                                  drop_kinds=(), limit: int = ARCHIVE_BATCH_ROWS) -> int:
+        named = [k for k in cutoffs if k != "*"]
+        for kind, cutoff in cutoffs.items():
+            if cutoff is None:
+                continue
+            if kind == "*":
+                q = {"kind": {"$nin": named}, "ts": {"$lt": cutoff}}
+            else:
+                q = {"kind": kind, "ts": {"$lt": cutoff}}
+            rows = [_event_row(d) async for d in self._db.events.find(q).sort("_id", ASCENDING).limit(limit)]
+            if not rows:
+                continue
+            keep = [r for r in rows if r["kind"] not in drop_kinds]
+            if keep:
+                await asyncio.to_thread(archive.append, keep)  # gzip + fsync stay off the loop
+            await self._db.events.delete_many({"_id": {"$in": [r["id"] for r in rows]}})
+            return len(rows)
+        return 0
+
+    # ---- backups
+    async def record_backup(self, **fields):
+        await self._db.backup_runs.insert_one(fields)
+
+    async def recent_backups(self, limit: int = 5) -> list[dict[str, Any]]:
+        cursor = self._db.backup_runs.find({}, projection={"_id": 0}).sort("_id", DESCENDING).limit(limit)
+        return [d async for d in cursor]
+
+    # ---- leases
+    async def acquire_lease(self, key: str, owner: str, ttl_s: float) -> bool:
+        now = time.time()
+        try:
+            await self._db.leases.update_one(
+                {"_id": key, "$or": [{"owner": owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": owner, "expires_at": now + ttl_s}}, upsert=True)
+        except DuplicateKeyError:  # held by someone else: the filter missed and the upsert collided
+            return False
+        return True
+
+    async def release_lease(self, key: str, owner: str) -> bool:
+        res = await self._db.leases.delete_one({"_id": key, "owner": owner})
+        return res.deleted_count == 1
+
+    # ---- provisioning progress
+    async def save_provision_plan(self, guild_id: int, plan: dict[str, Any]):
+        await self._db.provision_plans.update_one(
+            {"_id": guild_id}, {"$set": {"plan": plan, "updated_at": dt.datetime.utcnow().isoformat()}}, upsert=True)
+
+    async def get_provision_plan(self, guild_id: int) -> dict[str, Any] | None:
+        doc = await self._db.provision_plans.find_one({"_id": guild_id})
+        return doc["plan"] if doc else None
+
+    async def clear_provision_plan(self, guild_id: int):
+        await self._db.provision_plans.delete_one({"_id": guild_id})
+
+    # ---- contract delivery queue
+    async def enqueue_contract(self, guild_id: int, user_id: int):
+        await self._db.contract_queue.update_one(
+            {"_id": f"{guild_id}:{user_id}"},
+            {"$setOnInsert": {"guild_id": guild_id, "user_id": user_id,
+                              "enqueued_at": dt.datetime.utcnow().isoformat()}}, upsert=True)
+
+    async def dequeue_contract(self, guild_id: int, user_id: int):
+        await self._db.contract_queue.delete_one({"_id": f"{guild_id}:{user_id}"})
+
+    async def pending_contracts(self) -> list[dict[str, Any]]:
+        cursor = self._db.contract_queue.find({}, projection={"_id": 0}).sort("enqueued_at", ASCENDING)
+        return [d async for d in cursor]
+
+    # ---- serials
+    async def lease_serials(self, guild_id: int, count: int) -> int:
+        # Same arithmetic as the SQLite upsert, as a pipeline update so it stays one atomic op
+        doc = await self._db.serial_counter.find_one_and_update(
+            {"_id": guild_id},
+            [{"$set": {"next_serial": {"$add": [
+                {"$mod": [{"$add": [{"$subtract": [{"$ifNull": ["$next_serial", 1]}, 1]}, count]}, SERIAL_MAX]},
+                1]}}}],
+            upsert=True, return_document=ReturnDocument.AFTER)
+        return wrap_serial(doc["next_serial"], -count)
+
+    async def release_serials(self, guild_id: int, first_unused: int, expected_next: int) -> bool:
+        res = await self._db.serial_counter.update_one({"_id": guild_id, "next_serial": expected_next},
+                                                       {"$set": {"next_serial": first_unused}})
+        return res.modified_count == 1
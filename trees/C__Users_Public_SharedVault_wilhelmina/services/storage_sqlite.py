@@ -0,0 +1,752 @@
+from __future__ import annotations
+
+import asyncio
+import datetime as dt
+import functools
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections.abc import Sequence
+from typing import Any
+
+from services.analytics import rollup_keys, rollup_weight
+from services.backup import backup_snapshot, copy_into, unpack_snapshot
+from services.event_archive import EventArchive
+from services.serials import wrap_serial
+from services.storage import (
+    ARCHIVE_BATCH_ROWS,
+    AUDIT_PAGE_SIZE,
+    ERASE_DETAIL_KEYS,
+    ERASE_ID_LISTS,
+    ERASE_MEMBER_COLUMNS,
+    FETCH_ROWS,
+    DuplicateKey,
+    EventIn,
+    Storage,
+    chunk,
+)
+
+log = logging.getLogger(__name__)
+
+# detail_json keys promoted to generated columns on `events`
+EVENT_GENERATED_COLUMNS = {
+    "subject_user_id": "json_extract(detail_json, '$.user_id')",
+    "via": "json_extract(detail_json, '$.via')",
+}
+
+
+# Cluster mode (shared=True): another process's write transaction can hold the file lock.
+# SQLite's own busy wait blocks the calling thread -- here the event loop, gateway heartbeats
+# included -- so it is kept to a few ms and the write is retried from the loop with asyncio.sleep.
+SHARED_BUSY_TIMEOUT_MS = 20
+SHARED_BUSY_RETRY_S = 5.0
+
+
+def _is_busy(exc: sqlite3.OperationalError) -> bool:
+    msg = str(exc)
+    return "locked" in msg or "busy" in msg
+
+
+def retry_busy(fn):
+    """Mark a write method: it waits out a restore, and re-runs, sleeping between tries, while
+    another process holds the lock."""
+    @functools.wraps(fn)
+    async def wrapper(self: SQLiteStorage, *args, **kwargs):
+        await self._writable.wait()
+        self._writers += 1
+        try:
+            deadline = time.monotonic() + SHARED_BUSY_RETRY_S
+            delay = 0.01
+            while True:
+                try:
+                    return await fn(self, *args, **kwargs)
+                except sqlite3.OperationalError as e:
+                    if not _is_busy(e) or time.monotonic() >= deadline:
+                        raise
+                    if self._conn.in_transaction:
+                        self._conn.rollback()
+                    self.busy_retries += 1
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 0.2)
+        finally:
+            self._writers -= 1
+    return wrapper
+
+
+def fts_phrase(text: str) -> str:
+    """Quote each word so user input can't trip FTS5 query syntax."""
+    return " ".join('"' + w.replace('"', '""') + '"' for w in text.split())
+
+
+class SQLiteStorage(Storage):
+    """One local file, one connection. Queries are short and run inline on the event loop.
+
+    Write methods are wrapped in retry_busy, so in cluster mode a lock held by another
+    process costs the loop at most SHARED_BUSY_TIMEOUT_MS per try, not the whole wait.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, default_tz: str = "UTC", shared: bool = False):
+        super().__init__(default_tz)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        # Backups read through this connection from a worker thread (see services.backup)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self.fts = False
+        self.busy_retries = 0
+        # restore() closes this gate so no write lands on the file while it is copied over
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._writers = 0
+        if shared:
+            # Several bot processes on one host (cluster mode): readers don't block the writer,
+            # and a writer that finds the lock taken backs off through retry_busy
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA busy_timeout={SHARED_BUSY_TIMEOUT_MS}")
+
+    async def open(self):
+        self._init_schema()
+
+    async def close(self):
+        self._conn.close()
+
+    def _init_schema(self):
+        cur = self._conn.cursor()
+        # Only takes effect on a fresh file; existing DBs are converted by ensure_incremental_vacuum()
+        cur.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id INTEGER PRIMARY KEY,
+            signed_role_id INTEGER,
+            circle_channel_id INTEGER,
+            admin_log_channel_id INTEGER,
+            tz TEXT,
+            created_at TEXT,
+            analytics_channel_id INTEGER,
+            analytics_message_id INTEGER,
+            kiosk_message_id INTEGER
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS members (
+            guild_id INTEGER,
+            user_id INTEGER,
+            chosen_name TEXT,
+            birthdate TEXT,
+            signed_at TEXT,
+            soul_id TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (guild_id, user_id)
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            guild_id INTEGER,
+            actor_id INTEGER,
+            kind TEXT,
+            detail_json TEXT,
+            ts TEXT
+        )
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_kind_ts ON events(kind, ts)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts)")
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS serial_counter (
+            guild_id INTEGER PRIMARY KEY,
+            next_serial INTEGER
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS export_watermarks (
+            guild_id INTEGER,
+            requester_id INTEGER,
+            last_event_id INTEGER,
+            last_ts TEXT,
+            updated_at TEXT,
+            PRIMARY KEY (guild_id, requester_id)
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT,
+            expires_at REAL
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS provision_plans (
+            guild_id INTEGER PRIMARY KEY,
+            plan_json TEXT,
+            updated_at TEXT
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS contract_queue (
+            guild_id INTEGER,
+            user_id INTEGER,
+            enqueued_at TEXT,
+            PRIMARY KEY (guild_id, user_id)
+        )
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS backup_runs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            path TEXT,
+            started_at TEXT,
+            duration_ms REAL,
+            lock_ms REAL,
+            max_step_ms REAL,
+            steps INTEGER,
+            pages INTEGER,
+            bytes INTEGER,
+            error TEXT
+        )
+        """)
+        self._migrate(cur)
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_guild_id ON events(guild_id, id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_members_updated ON members(guild_id, updated_at)")
+        try:
+            cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_members_soul_id ON members(soul_id) WHERE soul_id IS NOT NULL")
+        except sqlite3.IntegrityError:
+            # Legacy rows minted with the shared-seed bug can collide; keep lookups fast anyway
+            log.warning("Duplicate soul IDs present; soul_id index created without UNIQUE")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_members_soul_id_dup ON members(soul_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_guild_kind ON events(guild_id, kind, id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_guild_actor ON events(guild_id, actor_id, id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_guild_subject ON events(guild_id, subject_user_id, id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_events_guild_via ON events(guild_id, via) WHERE via IS NOT NULL")
+        self.fts = self._init_fts(cur)
+        self._init_rollups(cur)
+        self._conn.commit()
+
+    def _init_rollups(self, cur: sqlite3.Cursor):
+        """Hourly/daily counters maintained by log_events; backfilled once from existing events."""
+        existed = cur.execute("SELECT 1 FROM sqlite_master WHERE name='event_rollups'").fetchone()
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS event_rollups (
+            guild_id INTEGER,
+            grain TEXT,
+            bucket TEXT,
+            metric TEXT,
+            count INTEGER,
+            total REAL,
+            PRIMARY KEY (guild_id, grain, bucket, metric)
+        )
+        """)
+        if existed:
+            return
+        src = self._conn.cursor()
+        src.execute("SELECT guild_id, kind, detail_json, ts FROM events WHERE kind != 'ritual_state'")
+        while rows := src.fetchmany(FETCH_ROWS):
+            for r in rows:
+                try:
+                    detail = json.loads(r["detail_json"] or "{}")
+                except ValueError:
+                    detail = {}
+                self._rollup(cur, r["guild_id"], r["kind"], detail, r["ts"] or "")
+
+    def _rollup(self, cur: sqlite3.Cursor, guild_id: int, kind: str, detail: dict[str, Any], ts: str):
+        keys = rollup_keys(kind, detail, ts)
+        if keys:
+            n = rollup_weight(detail)
+            cur.executemany("""
+            INSERT INTO event_rollups(guild_id, grain, bucket, metric, count, total) VALUES (?,?,?,?,?,?)
+            ON CONFLICT(guild_id, grain, bucket, metric) DO UPDATE SET
+                count=count+excluded.count,
+                total=total+excluded.total
+            """, [(guild_id, grain, bucket, metric, n, value) for grain, bucket, metric, value in keys])
+
+    def _init_fts(self, cur: sqlite3.Cursor) -> bool:
+        """External-content FTS5 index over detail_json, kept in sync by triggers.
+
+        ritual_state snapshots are left out; they are noise and get pruned anyway.
+        Returns False when this SQLite build has no FTS5 (search falls back to LIKE).
+        """
+        existed = cur.execute("SELECT 1 FROM sqlite_master WHERE name='events_fts'").fetchone()
+        try:
+            cur.execute("CREATE VIRTUAL TABLE IF NOT EXISTS events_fts USING fts5("
+                        "detail_json, content='events', content_rowid='id')")
+        except sqlite3.OperationalError:
+            log.warning("SQLite lacks FTS5; /audit text search will scan")
+            return False
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_ai AFTER INSERT ON events WHEN new.kind != 'ritual_state' BEGIN
+            INSERT INTO events_fts(rowid, detail_json) VALUES (new.id, new.detail_json);
+        END
+        """)
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_ad AFTER DELETE ON events WHEN old.kind != 'ritual_state' BEGIN
+            INSERT INTO events_fts(events_fts, rowid, detail_json) VALUES ('delete', old.id, old.detail_json);
+        END
+        """)
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS events_fts_au AFTER UPDATE OF detail_json ON events WHEN old.kind != 'ritual_state' BEGIN
+            INSERT INTO events_fts(events_fts, rowid, detail_json) VALUES ('delete', old.id, old.detail_json);
+            INSERT INTO events_fts(rowid, detail_json) VALUES (new.id, new.detail_json);
+        END
+        """)
+        if not existed:
+            cur.execute("INSERT INTO events_fts(rowid, detail_json) "
+                        "SELECT id, detail_json FROM events WHERE kind != 'ritual_state'")
+        return True
+
+    def _migrate(self, cur: sqlite3.Cursor):
+        cols = {r["name"] for r in cur.execute("PRAGMA table_info(members)").fetchall()}
+        if "updated_at" not in cols:
+            cur.execute("ALTER TABLE members ADD COLUMN updated_at TEXT")
+            cur.execute("UPDATE members SET updated_at = COALESCE(signed_at, ?)", (dt.datetime.utcnow().isoformat(),))
+        gc_cols = {r["name"] for r in cur.execute("PRAGMA table_info(guild_config)").fetchall()}
+        for col in ("analytics_channel_id", "analytics_message_id", "kiosk_message_id"):
+            if col not in gc_cols:
+                cur.execute(f"ALTER TABLE guild_config ADD COLUMN {col} INTEGER")
+        # Hot detail_json keys as indexable generated columns (VIRTUAL: no rewrite of existing rows)
+        ev_cols = {r["name"] for r in cur.execute("PRAGMA table_xinfo(events)").fetchall()}
+        for col, expr in EVENT_GENERATED_COLUMNS.items():
+            if col not in ev_cols:
+                cur.execute(f"ALTER TABLE events ADD COLUMN {col} GENERATED ALWAYS AS ({expr}) VIRTUAL")
+
+    # ---- guild config
+    @retry_busy
+    async def upsert_guild_config(self, guild_id: int, **kwargs):
+        cfg = await self.get_guild_config(guild_id) or {}
+        cfg.update(kwargs)
+        tz = cfg.get("tz") or self.default_tz
+        created_at = cfg.get("created_at") or dt.datetime.utcnow().isoformat()
+        cur = self._conn.cursor()
+        cur.execute("""
+        INSERT INTO guild_config(guild_id, signed_role_id, circle_channel_id, admin_log_channel_id, tz, created_at,
+                                 analytics_channel_id, analytics_message_id, kiosk_message_id)
+        VALUES(?,?,?,?,?,?,?,?,?)
+        ON CONFLICT(guild_id) DO UPDATE SET
+            signed_role_id=excluded.signed_role_id,
+            circle_channel_id=excluded.circle_channel_id,
+            admin_log_channel_id=excluded.admin_log_channel_id,
+            tz=excluded.tz,
+            analytics_channel_id=excluded.analytics_channel_id,
+            analytics_message_id=excluded.analytics_message_id,
+            kiosk_message_id=excluded.kiosk_message_id
+        """, (guild_id, cfg.get("signed_role_id"), cfg.get("circle_channel_id"),
+              cfg.get("admin_log_channel_id"), tz, created_at,
+              cfg.get("analytics_channel_id"), cfg.get("analytics_message_id"), cfg.get("kiosk_message_id")))
+        self._conn.commit()
+
+    async def get_guild_config(self, guild_id: int) -> dict[str, Any] | None:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM guild_config WHERE guild_id=?", (guild_id,))
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    async def list_dashboard_guilds(self) -> list[dict[str, Any]]:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM guild_config WHERE analytics_channel_id IS NOT NULL")
+        return [dict(r) for r in cur.fetchall()]
+
+    # ---- members
+    async def get_member(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM members WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    @retry_busy
+    async def upsert_member(self, guild_id: int, user_id: int, **kwargs):
+        existing = await self.get_member(guild_id, user_id) or {}
+        existing.update(kwargs)
+        cur = self._conn.cursor()
+        try:
+            cur.execute("""
+            INSERT INTO members(guild_id, user_id, chosen_name, birthdate, signed_at, soul_id, updated_at)
+            VALUES(?,?,?,?,?,?,?)
+            ON CONFLICT(guild_id, user_id) DO UPDATE SET
+                chosen_name=excluded.chosen_name,
+                birthdate=excluded.birthdate,
+                signed_at=excluded.signed_at,
+                soul_id=excluded.soul_id,
+                updated_at=excluded.updated_at
+            """, (guild_id, user_id, existing.get("chosen_name"), existing.get("birthdate"),
+                  existing.get("signed_at"), existing.get("soul_id"), dt.datetime.utcnow().isoformat()))
+        except sqlite3.IntegrityError as e:
+            self._conn.rollback()
+            raise DuplicateKey(str(e)) from e
+        self._conn.commit()
+
+    async def find_by_soul_id(self, guild_id: int, soul_id: str) -> dict[str, Any] | None:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM members WHERE soul_id=? AND guild_id=?", (soul_id, guild_id))
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    async def find_soul_ids(self, guild_id: int, soul_ids: list[str]) -> dict[str, dict[str, Any]]:
+        found: dict[str, dict[str, Any]] = {}
+        cur = self._conn.cursor()
+        for batch in chunk(soul_ids, 500):
+            marks = ",".join("?" * len(batch))
+            cur.execute(f"SELECT * FROM members WHERE soul_id IN ({marks}) AND guild_id=?", (*batch, guild_id))
+            for r in cur.fetchall():
+                found[r["soul_id"]] = dict(r)
+        return found
+
+    async def iter_members(self, guild_id: int, changed_after: str | None = None,
+                           changed_upto: str | None = None, batch: int = FETCH_ROWS):
+        cur = self._conn.cursor()
+        if changed_after is None and changed_upto is None:
+            cur.execute("SELECT * FROM members WHERE guild_id=? ORDER BY signed_at ASC", (guild_id,))
+        else:
+            cur.execute("SELECT * FROM members WHERE guild_id=? AND updated_at > ? AND updated_at <= ? "
+                        "ORDER BY updated_at ASC",
+                        (guild_id, changed_after or "", changed_upto or "9999"))
+        while rows := cur.fetchmany(batch):
+            for r in rows:
+                yield dict(r)
+            await asyncio.sleep(0)
+
+    # ---- events
+    @retry_busy
+    async def log_events(self, events: Sequence[EventIn]):
+        ts = dt.datetime.utcnow().isoformat()
+        cur = self._conn.cursor()
+        for guild_id, actor_id, kind, detail in events:
+            cur.execute("INSERT INTO events(guild_id, actor_id, kind, detail_json, ts) VALUES (?,?,?,?,?)",
+                        (guild_id, actor_id, kind, json.dumps(detail, ensure_ascii=False), ts))
+            self._rollup(cur, guild_id, kind, detail, ts)
+        self._conn.commit()
+
+    async def last_contract_sent(self, guild_id: int, user_id: int) -> dict[str, Any] | None:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM events WHERE guild_id=? AND actor_id=? AND kind='contract_sent' "
+                    "ORDER BY id DESC LIMIT 1", (guild_id, user_id))
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    async def rollup_totals(self, guild_id: int, grain: str, since_bucket: str) -> dict[str, tuple[int, float]]:
+        cur = self._conn.cursor()
+        cur.execute("SELECT metric, SUM(count) AS n, SUM(total) AS t FROM event_rollups "
+                    "WHERE guild_id=? AND grain=? AND bucket >= ? GROUP BY metric", (guild_id, grain, since_bucket))
+        return {r["metric"]: (r["n"], r["t"]) for r in cur.fetchall()}
+
+    async def iter_events(self, guild_id: int, after_id: int = 0, upto_id: int | None = None,
+                          since_ts: str | None = None, batch: int = FETCH_ROWS):
+        cur = self._conn.cursor()
+        where = "guild_id=? AND id > ?"
+        params: list[Any] = [guild_id, after_id]
+        if upto_id is not None:
+            where += " AND id <= ?"
+            params.append(upto_id)
+        if since_ts:
+            where += " AND ts > ?"
+            params.append(since_ts)
+        cur.execute(f"SELECT * FROM events WHERE {where} ORDER BY id ASC", params)
+        while rows := cur.fetchmany(batch):
+            for r in rows:
+                yield dict(r)
+            await asyncio.sleep(0)
+
+    async def event_ts(self, guild_id: int, event_id: int) -> str | None:
+        cur = self._conn.cursor()
+        cur.execute("SELECT ts FROM events WHERE guild_id=? AND id<=? ORDER BY id DESC LIMIT 1", (guild_id, event_id))
+        row = cur.fetchone()
+        return row["ts"] if row else None
+
+    async def max_event_id(self, guild_id: int) -> int:
+        cur = self._conn.cursor()
+        cur.execute("SELECT MAX(id) FROM events WHERE guild_id=?", (guild_id,))
+        return cur.fetchone()[0] or 0
+
+    async def search_events(self, guild_id: int, kind: str | None = None, actor_id: int | None = None,
+                            user_id: int | None = None, since: str | None = None, until: str | None = None,
+                            text: str | None = None, before_id: int | None = None,
+                            after_id: int | None = None, limit: int = AUDIT_PAGE_SIZE) -> list[dict[str, Any]]:
+        where = ["e.guild_id = ?"]
+        params: list[Any] = [guild_id]
+        if kind:
+            where.append("e.kind = ?")
+            params.append(kind)
+        if actor_id is not None:
+            where.append("e.actor_id = ?")
+            params.append(actor_id)
+        if user_id is not None:
+            where.append("e.subject_user_id = ?")
+            params.append(user_id)
+        if since:
+            where.append("e.ts >= ?")
+            params.append(since)
+        if until:
+            where.append("e.ts < ?")
+            params.append(until)
+        if before_id is not None:
+            where.append("e.id < ?")
+            params.append(before_id)
+        if after_id is not None:
+            where.append("e.id > ?")
+            params.append(after_id)
+        order = "ASC" if after_id is not None and before_id is None else "DESC"
+        if text and self.fts:
+            sql = (f"SELECT e.* FROM events_fts f JOIN events e ON e.id = f.rowid "
+                   f"WHERE events_fts MATCH ? AND {' AND '.join(where)} ORDER BY f.rowid {order} LIMIT ?")
+            params = [fts_phrase(text), *params, limit]
+        else:
+            if text:
+                where.append("e.detail_json LIKE ?")
+                params.append(f"%{text}%")
+            sql = f"SELECT e.* FROM events e WHERE {' AND '.join(where)} ORDER BY e.id {order} LIMIT ?"
+            params.append(limit)
+        cur = self._conn.cursor()
+        cur.execute(sql, params)
+        rows = [dict(r) for r in cur.fetchall()]
+        return rows if order == "DESC" else rows[::-1]
+
+    @retry_busy
+    async def prune_ritual_state(self, guild_id: int):
+        cur = self._conn.cursor()
+        cur.execute("DELETE FROM events WHERE guild_id=? AND kind='ritual_state'", (guild_id,))
+        self._conn.commit()
+
+    # ---- erasure
+    @retry_busy
+    async def erase_member(self, guild_id: int, user_id: int, anonymize: bool = False) -> dict[str, int]:
+        """Remove a user's members row and their events in one transaction.
+
+        anonymize=True keeps the rows for aggregate history but re-keys the
+        members row to a surrogate id and clears its personal columns, the actor
+        and the identifying detail keys instead of deleting them. Either way the
+        user is taken out of the id lists other events carry (ritual mentions,
+        purged authors) and out of the contract queue and export watermarks.
+        """
+        with self._conn:
+            cur = self._conn.cursor()
+            if anonymize:
+                surrogate = cur.execute("SELECT MIN(COALESCE(MIN(user_id), 0), 0) - 1 FROM members WHERE guild_id=?",
+                                        (guild_id,)).fetchone()[0]
+                cur.execute(f"UPDATE members SET user_id=?, {', '.join(c + ' = NULL' for c in ERASE_MEMBER_COLUMNS)}, "
+                            "updated_at=? WHERE guild_id=? AND user_id=?",
+                            (surrogate, dt.datetime.utcnow().isoformat(), guild_id, user_id))
+            else:
+                cur.execute("DELETE FROM members WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+            members = cur.rowcount
+            cur.execute("DELETE FROM contract_queue WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+            cur.execute("DELETE FROM export_watermarks WHERE guild_id=? AND requester_id=?", (guild_id, user_id))
+            for kind, key in ERASE_ID_LISTS.items():
+                cur.execute(f"""
+                UPDATE events SET detail_json = json_set(detail_json, '$.{key}',
+                    (SELECT json_group_array(value) FROM json_each(detail_json, '$.{key}') WHERE value != :uid))
+                WHERE guild_id = :gid AND kind = :kind
+                  AND EXISTS (SELECT 1 FROM json_each(detail_json, '$.{key}') WHERE value = :uid)
+                """, {"gid": guild_id, "kind": kind, "uid": user_id})
+            if anonymize:
+                cur.execute(f"""
+                UPDATE events SET actor_id = NULL,
+                    detail_json = json_set(json_remove(detail_json, {', '.join("'$." + k + "'" for k in ERASE_DETAIL_KEYS)}),
+                                           '$.redacted', json('true'))
+                WHERE guild_id=? AND subject_user_id=?
+                """, (guild_id, user_id))
+                events = cur.rowcount
+                cur.execute("UPDATE events SET actor_id = NULL WHERE guild_id=? AND actor_id=?", (guild_id, user_id))
+                events += cur.rowcount
+            else:
+                cur.execute("DELETE FROM events WHERE guild_id=? AND subject_user_id=?", (guild_id, user_id))
+                events = cur.rowcount
+                cur.execute("DELETE FROM events WHERE guild_id=? AND actor_id=?", (guild_id, user_id))
+                events += cur.rowcount
+        return {"members": members, "events": events}
+
+    # ---- export watermarks
+    async def get_export_watermark(self, guild_id: int, requester_id: int) -> dict[str, Any] | None:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM export_watermarks WHERE guild_id=? AND requester_id=?", (guild_id, requester_id))
+        row = cur.fetchone()
+        return dict(row) if row else None
+
+    @retry_busy
+    async def set_export_watermark(self, guild_id: int, requester_id: int, last_event_id: int, last_ts: str):
+        cur = self._conn.cursor()
+        cur.execute("""
+        INSERT INTO export_watermarks(guild_id, requester_id, last_event_id, last_ts, updated_at)
+        VALUES(?,?,?,?,?)
+        ON CONFLICT(guild_id, requester_id) DO UPDATE SET
+            last_event_id=excluded.last_event_id,
+            last_ts=excluded.last_ts,
+            updated_at=excluded.updated_at
+        """, (guild_id, requester_id, last_event_id, last_ts, dt.datetime.utcnow().isoformat()))
+        self._conn.commit()
+
+    # ---- retention / maintenance
+    @retry_busy
+    async def archive_event_batch(self, archive: EventArchive, cutoffs: dict[str, str | None],
+                                  drop_kinds=(), limit: int = ARCHIVE_BATCH_ROWS) -> int:
+        cur = self._conn.cursor()
+        named = [k for k in cutoffs if k != "*"]
+        for kind, cutoff in cutoffs.items():
+            if cutoff is None:
+                continue
+            if kind == "*":
+                marks = ",".join("?" * len(named))
+                where = f"kind NOT IN ({marks}) AND ts < ?" if named else "ts < ?"
+                params: tuple[Any, ...] = (*named, cutoff)
+            else:
+                where, params = "kind = ? AND ts < ?", (kind, cutoff)
+            cur.execute(f"SELECT * FROM events WHERE {where} ORDER BY id ASC LIMIT ?", (*params, limit))
+            rows = [dict(r) for r in cur.fetchall()]
+            if not rows:
+                continue
+            keep = [r for r in rows if r["kind"] not in drop_kinds]
+            if keep:
+                await asyncio.to_thread(archive.append, keep)  # gzip + fsync stay off the loop
+            ids = [r["id"] for r in rows]
+            cur.execute(f"DELETE FROM events WHERE id IN ({','.join('?' * len(ids))})", ids)
+            self._conn.commit()
+            return len(rows)
+        return 0
+
+    async def ensure_incremental_vacuum(self) -> bool:
+        """Switch a pre-existing DB to auto_vacuum=INCREMENTAL (one full VACUUM, on a worker thread).
+
+        Queries through this connection would wait on the VACUUM's lock, blocking the
+        loop, so call it at startup before anything else uses the storage.
+        """
+        # the pragma reports the header as of this connection's last read; refresh it first
+        self._conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        mode = self._conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode == 2:
+            return False
+        await asyncio.to_thread(self._vacuum_to_incremental)
+        return True
+
+    def _vacuum_to_incremental(self):
+        # Own connection: the rewrite must not hold the shared connection's mutex
+        conn = sqlite3.connect(self.path)
+        try:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    @retry_busy
+    async def incremental_vacuum(self, pages: int = 256) -> int:
+        """Release up to `pages` free pages back to the OS. Returns pages freed."""
+        before = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if not before:
+            return 0
+        # executescript steps the pragma to completion; execute() frees a single page per call
+        self._conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+        after = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return before - after
+
+    @retry_busy
+    async def analyze(self):
+        self._conn.execute("ANALYZE")
+        self._conn.commit()
+
+    # ---- backups
+    async def snapshot(self, dest_dir: str, pages: int, sleep_s: float, keep: int):
+        return await asyncio.to_thread(backup_snapshot, self._conn, dest_dir, pages, sleep_s, keep)
+
+    async def restore(self, snapshot_path: str):
+        """Copy a snapshot over the live file; writes issued meanwhile wait and then apply to the restored data.
+
+        Decompressing and verifying happen on a worker thread. The copy itself is one
+        backup step on the loop, so no read or write through this connection can see
+        the file half-restored.
+        """
+        self._writable.clear()
+        try:
+            raw_path = await asyncio.to_thread(unpack_snapshot, snapshot_path)
+            try:
+                while self._writers:  # e.g. an archive batch waiting on its segment append
+                    await asyncio.sleep(0.01)
+                copy_into(raw_path, self._conn)
+            finally:
+                os.remove(raw_path)
+        finally:
+            self._writable.set()
+
+    @retry_busy
+    async def record_backup(self, **fields):
+        cols = ", ".join(fields)
+        marks = ", ".join("?" for _ in fields)
+        self._conn.execute(f"INSERT INTO backup_runs({cols}) VALUES ({marks})", tuple(fields.values()))
+        self._conn.commit()
+
+    async def recent_backups(self, limit: int = 5) -> list[dict[str, Any]]:
+        cur = self._conn.cursor()
+        cur.execute("SELECT * FROM backup_runs ORDER BY id DESC LIMIT ?", (limit,))
+        return [dict(r) for r in cur.fetchall()]
+
+    # ---- leases
+    @retry_busy
+    async def acquire_lease(self, key: str, owner: str, ttl_s: float) -> bool:
+        now = time.time()
+        cur = self._conn.cursor()
+        cur.execute("""
+        INSERT INTO leases(key, owner, expires_at) VALUES (?,?,?)
+        ON CONFLICT(key) DO UPDATE SET owner=excluded.owner, expires_at=excluded.expires_at
+        WHERE leases.owner=excluded.owner OR leases.expires_at < ?
+        """, (key, owner, now + ttl_s, now))
+        self._conn.commit()
+        return cur.rowcount == 1
+
+    @retry_busy
+    async def release_lease(self, key: str, owner: str) -> bool:
+        cur = self._conn.cursor()
+        cur.execute("DELETE FROM leases WHERE key=? AND owner=?", (key, owner))
+        self._conn.commit()
+        return cur.rowcount == 1
+
+    # ---- provisioning progress
+    @retry_busy
+    async def save_provision_plan(self, guild_id: int, plan: dict[str, Any]):
+        self._conn.execute("""
+        INSERT INTO provision_plans(guild_id, plan_json, updated_at) VALUES (?,?,?)
+        ON CONFLICT(guild_id) DO UPDATE SET plan_json=excluded.plan_json, updated_at=excluded.updated_at
+        """, (guild_id, json.dumps(plan, ensure_ascii=False), dt.datetime.utcnow().isoformat()))
+        self._conn.commit()
+
+    async def get_provision_plan(self, guild_id: int) -> dict[str, Any] | None:
+        row = self._conn.execute("SELECT plan_json FROM provision_plans WHERE guild_id=?", (guild_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @retry_busy
+    async def clear_provision_plan(self, guild_id: int):
+        self._conn.execute("DELETE FROM provision_plans WHERE guild_id=?", (guild_id,))
+        self._conn.commit()
+
+    # ---- contract delivery queue
+    @retry_busy
+    async def enqueue_contract(self, guild_id: int, user_id: int):
+        self._conn.execute("INSERT OR IGNORE INTO contract_queue(guild_id, user_id, enqueued_at) VALUES (?,?,?)",
+                           (guild_id, user_id, dt.datetime.utcnow().isoformat()))
+        self._conn.commit()
+
+    @retry_busy
+    async def dequeue_contract(self, guild_id: int, user_id: int):
+        self._conn.execute("DELETE FROM contract_queue WHERE guild_id=? AND user_id=?", (guild_id, user_id))
+        self._conn.commit()
+
+    async def pending_contracts(self) -> list[dict[str, Any]]:
+        cur = self._conn.execute("SELECT * FROM contract_queue ORDER BY enqueued_at")
+        return [dict(r) for r in cur.fetchall()]
+
+    # ---- serials
+    @retry_busy
+    async def lease_serials(self, guild_id: int, count: int) -> int:
+        cur = self._conn.cursor()
+        cur.execute("""
+        INSERT INTO serial_counter(guild_id, next_serial) VALUES (?, ? % 9999 + 1)
+        ON CONFLICT(guild_id) DO UPDATE SET next_serial = (next_serial - 1 + ?) % 9999 + 1
+        RETURNING next_serial
+        """, (guild_id, count, count))
+        new_next = cur.fetchone()[0]
+        self._conn.commit()
+        return wrap_serial(new_next, -count)
+
+    @retry_busy
+    async def release_serials(self, guild_id: int, first_unused: int, expected_next: int) -> bool:
+        cur = self._conn.cursor()
+        cur.execute("UPDATE serial_counter SET next_serial=? WHERE guild_id=? AND next_serial=?",
+                    (first_unused, guild_id, expected_next))
+        self._conn.commit()
+        return cur.rowcount == 1
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+# Executes Discord webhooks over a caller-owned (pooled) aiohttp session.
+# Webhook executions are rate limited per webhook, separately from the bot's
+# own per-channel send bucket, so audit bursts stop delaying user-facing sends.
+# The sender honours X-RateLimit-Remaining/Reset-After up front and retries
+# 429s (retry_after) and 5xx (exponential backoff).
+
+
+class WebhookGone(Exception):
+    """The webhook was deleted (404); fetch or create a new one."""
+
+
+class WebhookError(Exception):
+    def __init__(self, status: int, body: str):
+        super().__init__(f"webhook HTTP {status}: {body[:200]}")
+        self.status = status
+
+
+class WebhookSender:
+    def __init__(self, session, max_attempts: int = 5, backoff_s: float = 0.5, max_backoff_s: float = 30.0,
+                 sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+                 clock: Callable[[], float] = time.monotonic):
+        self.session = session
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self._sleep = sleep
+        self._clock = clock
+        self._reset_at: dict[str, float] = {}
+        self.sent = 0
+        self.rate_limited = 0
+        self.retries = 0
+
+    async def execute(self, url: str, payload: dict[str, Any]):
+        status = 0
+        for attempt in range(self.max_attempts):
+            wait = self._reset_at.get(url, 0.0) - self._clock()
+            if wait > 0:
+                await self._sleep(wait)
+            async with self.session.post(url, json=payload) as resp:
+                self._note_bucket(url, resp.headers)
+                status = resp.status
+                if resp.status < 300:
+                    self.sent += 1
+                    return
+                if resp.status == 404:
+                    raise WebhookGone(url)
+                if resp.status == 429:
+                    self.rate_limited += 1
+                    data = await resp.json(content_type=None) if resp.content_type == "application/json" else {}
+                    delay = float((data or {}).get("retry_after") or resp.headers.get("Retry-After") or self.backoff_s)
+                elif resp.status >= 500:
+                    delay = min(self.backoff_s * 2 ** attempt, self.max_backoff_s)
+                else:
+                    raise WebhookError(resp.status, await resp.text())
+            if attempt + 1 == self.max_attempts:
+                break
+            self.retries += 1
+            await self._sleep(delay)
+        raise WebhookError(status, f"gave up after {self.max_attempts} attempts")
+
+    def _note_bucket(self, url: str, headers):
+        if headers.get("X-RateLimit-Remaining") == "0" and headers.get("X-RateLimit-Reset-After"):
+            self._reset_at[url] = self._clock() + float(headers["X-RateLimit-Reset-After"])
+        else:
+            self._reset_at.pop(url, None)
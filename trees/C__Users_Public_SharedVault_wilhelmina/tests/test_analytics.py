@@ -0,0 +1,30 @@
+import datetime as dt
+
+from services.analytics import format_dashboard, rollup_keys, rollup_weight, window_start
+
+
+def test_rollup_keys_fan_out():
+    keys = rollup_keys("contract_signed", {"via": "dm", "sign_latency_s": 42}, "2025-10-31T13:20:12")
+    assert ("hour", "2025-10-31T13", "contract_signed", 0.0) in keys
+    assert ("day", "2025-10-31", "contract_signed:dm", 0.0) in keys
+    assert ("day", "2025-10-31", "contract_signed:timed", 42.0) in keys
+    assert len(keys) == 6
+    assert rollup_keys("ritual_state", {}, "2025-10-31T13:20:12") == []
+
+
+def test_rollup_weight_counts_batches():
+    assert rollup_weight({}) == 1
+    assert rollup_weight({"batch": 37}) == 37
+    assert rollup_weight({"batch": "x"}) == 1
+
+
+def test_window_start():
+    now = dt.datetime(2025, 10, 31, 13, 5)
+    assert window_start(now, "hour", 24) == "2025-10-30T14"
+    assert window_start(now, "day", 7) == "2025-10-25"
+
+
+def test_format_dashboard():
+    text = format_dashboard({"24h": {"member_join": (3, 0.0), "contract_signed:timed": (2, 120.0)}})
+    assert "Joins" in text and " 3" in text
+    assert "60s" in text
@@ -0,0 +1,27 @@
+import asyncio
+
+from services.audit_sink import AuditSink
+
+
+class Recorder:
+    def __init__(self):
+        self.calls = []
+
+    async def __call__(self, guild_id, groups):
+        self.calls.append((guild_id, [(g.kind, g.count, len(g.samples)) for g in groups]))
+
+
+def test_repeats_of_a_kind_fold_into_one_group():
+    async def go():
+        rec = Recorder()
+        sink = AuditSink(rec, flush_s=0.01)
+        for i in range(50):
+            sink.add(1, "member_join", {"n": i})
+        sink.add(1, "contract_sent", {})
+        sink.add(2, "member_join", {})
+        assert rec.calls == []
+        await asyncio.sleep(0.05)
+        return rec.calls
+    calls = asyncio.run(go())
+    assert sorted(calls) == [(1, [("member_join", 50, 3), ("contract_sent", 1, 1)]), (2, [("member_join", 1, 1)])]
+
@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+
+from services.backup import backup_snapshot, list_snapshots, restore_snapshot
+
+
+def _db(path):
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, pad TEXT)")
+    conn.executemany("INSERT INTO t(pad) VALUES (?)", [("x" * 200,)] * 5000)
+    conn.commit()
+    return conn
+
+
+def test_snapshot_while_writing_then_restore(tmp_path):
+    conn = _db(str(tmp_path / "live.sqlite"))
+    out = tmp_path / "backups"
+    result = {}
+    th = threading.Thread(target=lambda: result.update(r=backup_snapshot(conn, str(out), pages=16, sleep_s=0)))
+    th.start()
+    for _ in range(50):
+        conn.execute("INSERT INTO t(pad) VALUES ('during')")
+        conn.commit()
+    th.join()
+    r = result["r"]
+    assert r.steps > 1 and r.max_step_ms <= r.lock_ms <= r.duration_ms
+    assert list_snapshots(str(out)) == [r.path.rsplit("/", 1)[-1]]
+
+    conn.execute("DELETE FROM t")
+    conn.commit()
+    restore_snapshot(r.path, conn)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] >= 5000
+
+
+def test_rotation_keeps_newest(tmp_path, monkeypatch):
+    import services.backup as b
+
+    conn = _db(str(tmp_path / "live.sqlite"))
+    stamps = iter(["20250101T000000", "20250102T000000", "20250103T000000"])
+
+    class FakeDT:
+        @staticmethod
+        def utcnow():
+            class S:
+                def strftime(self, _):
+                    return next(stamps)
+
+                def isoformat(self):
+                    return ""
+            return S()
+
+    monkeypatch.setattr(b.dt, "datetime", FakeDT)
+    for _ in range(3):
+        last = backup_snapshot(conn, str(tmp_path / "b"), keep=2)
+    assert list_snapshots(str(tmp_path / "b")) == ["wilhelmina-20250103T000000.sqlite.gz",
+                                                   "wilhelmina-20250102T000000.sqlite.gz"]
+    assert last.removed == ["wilhelmina-20250101T000000.sqlite.gz"]
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from services.audit_sink import AuditSink
+from services.purge_batcher import PurgeBatcher
+
+# The time/size rules live in KeyedBatcher; each case drives it through one of
+# its users. `add(b, key, i)` adds item i under key; `sent` records
+# (key, batch size) per delivery.
+
+
+class AuditCase:
+    max_size = 10
+
+    def __init__(self, delay_s):
+        self.sent = []
+
+        async def deliver(guild_id, groups):
+            self.sent.append((guild_id, len(groups)))
+        self.b = AuditSink(deliver, flush_s=delay_s)
+
+    def add(self, key, i):
+        self.b.add(key, f"k{i}", {})  # one kind per item, so each grows the buffer
+
+
+class PurgeCase:
+    max_size = 100
+
+    def __init__(self, delay_s):
+        self.sent = []
+
+        async def purge(guild_id, channel_id, items):
+            assert guild_id == channel_id // 10
+            self.sent.append((channel_id, len(items)))
+        self.b = PurgeBatcher(purge, window_s=delay_s)
+
+    def add(self, key, i):
+        self.b.add(key // 10, key, i, 7)
+
+
+@pytest.fixture(params=[AuditCase, PurgeCase], ids=["audit", "purge"])
+def case(request):
+    return request.param
+
+
+def test_timer_flushes_each_key_once(case):
+    async def go():
+        c = case(0.01)
+        for i in range(5):
+            c.add(10, i)
+        c.add(20, 0)
+        assert c.sent == []
+        await asyncio.sleep(0.05)
+        return c.sent
+    assert sorted(asyncio.run(go())) == [(10, 5), (20, 1)]
+
+
+def test_full_buffer_flushes_at_once_and_close_drains(case):
+    async def go():
+        c = case(60)
+        n = case.max_size
+        for i in range(n + 3):
+            c.add(10, i)
+            if i == n - 1:
+                await asyncio.sleep(0)
+        first = list(c.sent)
+        await c.b.close()
+        c.add(10, 999)  # dropped after close
+        await asyncio.sleep(0)
+        return first, c.sent
+    first, sent = asyncio.run(go())
+    n = case.max_size
+    assert first == [(10, n)]
+    assert sent == [(10, n), (10, 3)]
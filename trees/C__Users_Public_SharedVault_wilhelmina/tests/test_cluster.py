@@ -0,0 +1,64 @@
+from services.cluster import Supervisor, shard_of, shard_ranges
+
+
+def test_shard_ranges_are_contiguous_and_cover_all():
+    assert shard_ranges(10, 3) == [[0, 1, 2, 3], [4, 5, 6], [7, 8, 9]]
+    assert shard_ranges(2, 5) == [[0], [1]]
+    assert shard_of(81384788765712384, 4) == (81384788765712384 >> 22) % 4
+
+
+class Clock:
+    t = 0.0
+
+    def __call__(self):
+        return self.t
+
+
+class Proc:
+    def __init__(self):
+        self.alive = True
+        self.exitcode = None
+
+    def is_alive(self):
+        return self.alive
+
+    def kill(self):
+        self.alive = False
+        self.exitcode = -9
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+
+def test_staggered_start_and_single_node_restart():
+    clock = Clock()
+    spawned = []
+
+    def spawn(node):
+        spawned.append(node.index)
+        return Proc()
+
+    sup = Supervisor(4, 2, spawn, health_timeout_s=30, startup_grace_s=60, stagger_s=5, clock=clock)
+    assert sup.check() == [0] and spawned == [0]
+    clock.t = 10  # node 0 holds two shards: 2 x 5 s before node 1 may identify
+    assert sup.check() == [1]
+    sup.beat(0, {"ready": True})
+    sup.beat(1, {"ready": True})
+
+    sup.nodes[1].proc.alive = False           # crash
+    clock.t = 20
+    assert sup.check() == []
+    assert sup.nodes[1].proc is None and sup.nodes[1].restarts == 1
+    clock.t = 22
+    assert sup.check() == [1] and spawned == [0, 1, 1]
+    node0 = sup.nodes[0].proc
+
+    clock.t = 60                               # node 0 silent for 60 s > 30 s
+    sup.beat(1, {})
+    sup.check()
+    assert not node0.alive and sup.nodes[0].restarts == 1
+    assert sup.nodes[1].proc.alive            # the healthy node was left alone
+    assert [s["restarts"] for s in sup.summary()] == [1, 1]
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+from services.contract_queue import ContractQueue
+
+
+def _queue(deliver, forgotten, **kw):
+    async def forget(gid, uid):
+        forgotten.append((gid, uid))
+    return ContractQueue(deliver, forget, kw.pop("limits", {}), **kw)
+
+
+def test_duplicates_collapse_while_queued_or_in_flight():
+    async def go():
+        calls, forgotten = [], []
+        gate = asyncio.Event()
+
+        async def deliver(gid, uid, hint):
+            calls.append((gid, uid, hint))
+            await gate.wait()
+            return "dm"
+
+        q = _queue(deliver, forgotten, workers=2)
+        q.start()
+        assert q.add(1, 10, "m1") and q.add(1, 11)
+        await asyncio.sleep(0.01)              # both in flight now
+        assert not q.add(1, 10) and q.queued(1, 10) and q.depth() == 2
+        gate.set()
+        await asyncio.sleep(0.01)
+        assert sorted(forgotten) == [(1, 10), (1, 11)] and q.depth() == 0
+        assert q.add(1, 10)                    # delivered, so a later join queues again
+        await asyncio.sleep(0.01)
+        m = q.metrics.snapshot(q.depth())
+        assert m["enqueued"] == 3 and m["deduped"] == 1 and m["delivered"] == 3
+        assert calls[0] == (1, 10, "m1") and m["latency_ms"]["dm"]["n"] == 3
+        await q.close()
+
+    asyncio.run(go())
+
+
+def test_failures_retry_then_give_up_and_gone_members_drop():
+    async def go():
+        attempts, forgotten = {}, []
+
+        async def deliver(gid, uid, hint):
+            attempts[uid] = attempts.get(uid, 0) + 1
+            if uid == 1 and attempts[uid] < 2:
+                raise RuntimeError("503")
+            if uid == 2:
+                raise RuntimeError("always")
+            if uid == 3:
+                return None
+            return "private_thread"
+
+        q = _queue(deliver, forgotten, max_attempts=3, retry_s=0.005)
+        q.start()
+        for uid in (1, 2, 3):
+            q.add(9, uid)
+        await asyncio.sleep(0.1)
+        m = q.metrics.snapshot()
+        assert attempts == {1: 2, 2: 3, 3: 1}
+        assert m["delivered"] == 1 and m["failed"] == 1 and m["dropped"] == 1 and m["retries"] == 3
+        assert sorted(forgotten) == [(9, 1), (9, 2), (9, 3)]
+        await q.close()
+
+    asyncio.run(go())
+
+
+def test_paths_are_paced_by_their_own_bucket():
+    async def go():
+        q = _queue(None, [], limits={"temp_channel": (2, 0.1)})
+        t0 = time.monotonic()
+        for _ in range(4):
+            await q.pace("temp_channel")
+        await q.pace("circle")                 # no bucket, no wait
+        took = time.monotonic() - t0
+        assert 0.08 <= took < 0.5 and q.metrics.paced_s > 0
+
+    asyncio.run(go())
+
+
+def test_pause_holds_deliveries_until_resumed():
+    async def go():
+        calls, forgotten = [], []
+
+        async def deliver(gid, uid, hint):
+            calls.append(uid)
+            return "dm"
+
+        q = _queue(deliver, forgotten, workers=2)
+        q.start()
+        q.pause()
+        assert q.add(1, 10) and q.add(1, 11)
+        await asyncio.sleep(0.01)
+        assert calls == [] and q.keys() == [(1, 10), (1, 11)]
+        q.resume()
+        await asyncio.sleep(0.01)
+        assert sorted(calls) == [10, 11] and q.keys() == []
+        await q.close()
+
+    asyncio.run(go())
@@ -0,0 +1,102 @@
+import asyncio
+
+from services.dispatcher import (
+    PRIORITY_AUDIT,
+    PRIORITY_INTERACTION,
+    PRIORITY_RITUAL,
+    Dispatcher,
+    TokenBucket,
+)
+
+
+class RateLimited(Exception):
+    def __init__(self, retry_after):
+        self.retry_after = retry_after
+
+
+def test_token_bucket_refills():
+    b = TokenBucket(2, 1.0)
+    b.take(0.0)
+    b.take(0.0)
+    assert b.delay(0.0) == 0.5
+    assert b.delay(0.5) == 0.0
+
+
+def run(fn):
+    async def go():
+        d = Dispatcher(route_limit=(5, 0.05), global_limit=(1000, 1.0), concurrency=1)
+        d.start()
+        try:
+            return await fn(d)
+        finally:
+            await d.close(drain_s=1.0)
+    return asyncio.run(go())
+
+
+def test_priority_then_guild_round_robin():
+    order = []
+
+    def sender(tag):
+        async def send():
+            order.append(tag)
+        return send
+
+    async def go(d):
+        # concurrency=1 and a busy first send let the queue fill before anything else goes out
+        gate = asyncio.Event()
+
+        async def first():
+            await gate.wait()
+        d.submit(0, "warm", PRIORITY_INTERACTION, first)
+        await asyncio.sleep(0)
+        futs = [d.submit(1, ("c", 1, i), PRIORITY_AUDIT, sender("audit")) for i in range(2)]
+        futs += [d.submit(1, ("c", 2, i), PRIORITY_RITUAL, sender("g1")) for i in range(3)]
+        futs += [d.submit(2, ("c", 3, i), PRIORITY_RITUAL, sender("g2")) for i in range(2)]
+        futs.append(d.submit(3, "i", PRIORITY_INTERACTION, sender("reply")))
+        gate.set()
+        await asyncio.gather(*futs)
+        return d.metrics.snapshot()
+
+    snap = run(go)
+    assert order == ["reply", "g1", "g2", "g1", "g2", "g1", "audit", "audit"]
+    assert snap["sent"] == 9 and set(snap["wait_ms"]) == {0, 1, 4}
+
+
+def test_route_bucket_throttles_and_keeps_order():
+    order = []
+
+    async def go(d):
+        def sender(i):
+            async def send():
+                order.append(i)
+            return send
+        await asyncio.gather(*(d.submit(1, "chan", PRIORITY_RITUAL, sender(i)) for i in range(12)))
+        return d.metrics
+
+    m = run(go)
+    assert order == list(range(12))
+    assert m.throttled >= 2 and m.rate_limited == 0
+
+
+def test_429_is_retried_after_cooling():
+    calls = []
+
+    async def go(d):
+        async def send():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RateLimited(0.02)
+            return "ok"
+        result = await d.send(1, "chan", PRIORITY_RITUAL, send)
+
+        async def boom():
+            raise ValueError("nope")
+        try:
+            await d.send(1, "chan", PRIORITY_RITUAL, boom)
+        except ValueError:
+            pass
+        return result, d.metrics
+
+    result, m = run(go)
+    assert result == "ok" and len(calls) == 2
+    assert m.rate_limited == 1 and m.failed == 1 and m.sent == 1
@@ -0,0 +1,32 @@
+from services.entity_cache import MISSING, EntityCache
+
+SPECS = {"circle": ("text", "circle"), "archive": ("category", "archive"), "signed": ("role", "Signed")}
+
+
+def test_seed_then_gateway_events():
+    c = EntityCache(SPECS)
+    assert not c.seeded(1)
+    c.seed(1, {"circle": 10, "signed": None})
+    assert c.seeded(1) and c.get(1, "circle") == 10 and c.get(1, "signed") is None
+
+    c.set(1, "archive", None)
+    assert c.get(1, "archive") == MISSING
+    c.on_create(1, "text", 20, "archive")  # wrong kind
+    assert c.get(1, "archive") == MISSING
+    c.on_create(1, "category", 21, "archive")
+    assert c.get(1, "archive") == 21
+
+    c.on_create(1, "text", 30, "circle")  # duplicate name doesn't steal the slot
+    assert c.get(1, "circle") == 10
+    c.on_delete(1, 10)
+    assert c.get(1, "circle") is None
+    c.on_update(1, "text", 30, "circle")
+    assert c.get(1, "circle") == 30
+
+
+def test_lock_is_per_guild_and_key():
+    c = EntityCache(SPECS)
+    assert c.lock(1, "circle") is c.lock(1, "circle")
+    assert c.lock(1, "circle") is not c.lock(2, "circle")
+    c.forget_guild(1)
+    assert c.get(1, "circle") is None and not c.seeded(1)
@@ -0,0 +1,70 @@
+import asyncio
+import datetime as dt
+
+from services.event_archive import EventArchive, retention_cutoffs
+
+
+def _ev(i, ts, guild_id=1, kind="contract_sent"):
+    return {"id": i, "guild_id": guild_id, "actor_id": None, "kind": kind, "detail_json": "{}", "ts": ts}
+
+
+def test_append_is_readable_across_members_and_months(tmp_path):
+    arc = EventArchive(str(tmp_path))
+    arc.append([_ev(1, "2025-09-30T23:59:59"), _ev(2, "2025-10-01T00:00:00")])
+    arc.append([_ev(3, "2025-10-02T00:00:00"), _ev(4, "2025-10-02T00:00:00", guild_id=2)])
+    assert arc.months(1) == ["2025-09", "2025-10"]
+    assert [e["id"] for e in arc.iter_events(1)] == [1, 2, 3]
+    assert [e["id"] for e in arc.iter_events(1, since_month="2025-10")] == [2, 3]
+    assert [e["id"] for e in arc.iter_events(2)] == [4]
+    assert list(arc.iter_events(99)) == []
+
+
+def test_reads_stop_at_the_segment_length_seen_when_they_started(tmp_path):
+    arc = EventArchive(str(tmp_path))
+    arc.append([_ev(1, "2025-10-01T00:00:00"), _ev(2, "2025-10-01T00:00:00")])
+    it = arc.iter_events(1)
+    assert next(it)["id"] == 1
+    with open(arc.segment_path(1, "2025-10"), "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00")  # an append caught mid-write
+    assert [e["id"] for e in it] == [2]
+
+
+def test_retention_cutoffs():
+    now = dt.datetime(2025, 10, 31)
+    c = retention_cutoffs(now, {"a": 1, "b": None}, 30)
+    assert c["a"] == "2025-10-30T00:00:00"
+    assert c["b"] is None
+    assert c["*"] == "2025-10-01T00:00:00"
+
+
+def test_iter_events_delta_window(tmp_path):
+    arc = EventArchive(str(tmp_path))
+    arc.append([_ev(i, f"2025-10-0{i}T00:00:00") for i in range(1, 6)])
+    assert [e["id"] for e in arc.iter_events(1, after_id=2, upto_id=4)] == [3, 4]
+    assert [e["id"] for e in arc.iter_events(1, since_ts="2025-10-03T00:00:00")] == [4, 5]
+
+
+def test_aiter_events_reads_in_batches_off_the_loop(tmp_path):
+    arc = EventArchive(str(tmp_path))
+    arc.append([_ev(i, "2025-09-01T00:00:00" if i < 4 else "2025-10-01T00:00:00") for i in range(1, 8)])
+
+    async def go():
+        return [e["id"] async for e in arc.aiter_events(1, batch=2, after_id=1)]
+
+    assert asyncio.run(go()) == [2, 3, 4, 5, 6, 7]
+
+
+def test_rewrite_drops_and_edits_rows(tmp_path):
+    arc = EventArchive(str(tmp_path))
+    arc.append([_ev(1, "2025-09-01T00:00:00"), _ev(2, "2025-10-01T00:00:00"), _ev(3, "2025-10-02T00:00:00")])
+
+    def scrub(row):
+        if row["id"] == 1:
+            return None
+        if row["id"] == 3:
+            row["detail_json"] = '{"redacted": true}'
+        return row
+
+    assert arc.rewrite(1, scrub) == 2
+    assert [(e["id"], e["detail_json"]) for e in arc.iter_events(1)] == [(2, "{}"), (3, '{"redacted": true}')]
+    assert arc.rewrite(1, lambda r: r) == 0
@@ -0,0 +1,39 @@
+import csv
+import gzip
+import io
+import json
+import random
+
+from services.export_stream import PartWriter
+
+
+def _read(part):
+    return gzip.decompress(part.fp.read()).decode("utf-8")
+
+
+def test_single_csv_part_keeps_plain_name():
+    w = PartWriter("members", "csv", ["user_id", "soul_id"])
+    w.write({"user_id": 1, "soul_id": "x", "extra": "ignored"})
+    parts = w.close()
+    assert [p.filename for p in parts] == ["members.csv.gz"]
+    assert list(csv.DictReader(io.StringIO(_read(parts[0])))) == [{"user_id": "1", "soul_id": "x"}]
+
+
+def test_rolls_over_and_every_part_is_standalone():
+    rng = random.Random(7)
+    w = PartWriter("events", "json", ["id"], max_bytes=96 * 1024, spool_bytes=4096)
+    for i in range(20_000):
+        w.write({"id": i, "noise": f"{rng.getrandbits(128):032x}"})
+    parts = w.close()
+    assert len(parts) > 1
+    assert parts[0].filename == "events.part01.json.gz"
+    ids = []
+    for p in parts:
+        assert p.size < 96 * 1024
+        ids += [r["id"] for r in json.loads(_read(p))]
+    assert ids == list(range(20_000))
+
+
+def test_empty_export_still_has_header():
+    parts = PartWriter("members", "csv", ["a", "b"]).close()
+    assert _read(parts[0]).strip() == "a,b"
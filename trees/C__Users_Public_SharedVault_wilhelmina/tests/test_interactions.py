@@ -0,0 +1,141 @@
+import asyncio
+
+from wilhelmina.services.interactions import REPLY_ERROR_TEXT, Once, SideEffects, fast_reply
+
+
+class Response:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def send_message(self, **kw):
+        self.calls.append(("send", kw))
+
+    async def defer(self, **kw):
+        self.calls.append(("defer", kw))
+
+
+class Followup:
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def send(self, **kw):
+        self.calls.append(("followup", kw))
+
+
+class Interaction:
+    def __init__(self):
+        self.calls = []
+        self.response = Response(self.calls)
+        self.followup = Followup(self.calls)
+
+
+class Forbidden(Exception):
+    pass
+
+
+def test_fast_reply_answers_directly_or_defers_when_slow():
+    async def go():
+        async def build(delay):
+            await asyncio.sleep(delay)
+            return {"content": "ok"}
+
+        quick = Interaction()
+        assert await fast_reply(quick, build(0), ephemeral=True, budget_s=0.05)
+        assert quick.calls == [("send", {"ephemeral": True, "content": "ok"})]
+
+        slow = Interaction()
+        assert await fast_reply(slow, build(0.1), budget_s=0.02)
+        assert [c[0] for c in slow.calls] == ["defer", "followup"]
+        assert slow.calls[1][1]["content"] == "ok"
+
+    asyncio.run(go())
+
+
+def test_fast_reply_reports_a_failed_build_instead_of_hanging():
+    async def go():
+        async def broken(delay):
+            await asyncio.sleep(delay)
+            raise RuntimeError("db locked")
+
+        early = Interaction()
+        assert not await fast_reply(early, broken(0), budget_s=0.05)
+        assert early.calls == [("send", {"content": REPLY_ERROR_TEXT, "ephemeral": True})]
+
+        late = Interaction()
+        assert not await fast_reply(late, broken(0.05), budget_s=0.01)
+        assert [c[0] for c in late.calls] == ["defer", "followup"]
+        assert late.calls[1][1] == {"content": REPLY_ERROR_TEXT, "ephemeral": True}
+
+    asyncio.run(go())
+
+
+def test_side_effects_run_concurrently_retry_and_stop_on_permanent_failures():
+    async def go():
+        hits = {"flaky": 0, "denied": 0, "slow": 0}
+
+        async def flaky():
+            hits["flaky"] += 1
+            if hits["flaky"] < 3:
+                raise RuntimeError("503")
+
+        async def denied():
+            hits["denied"] += 1
+            raise Forbidden()
+
+        async def slow():
+            hits["slow"] += 1
+            await asyncio.sleep(0.05)
+
+        fx = SideEffects(max_attempts=3, backoff_s=0.001, retryable=lambda e: not isinstance(e, Forbidden))
+        fx.spawn("signed", flaky=flaky, denied=denied, slow=slow)
+        assert fx.running() == 3  # spawn returns at once
+        await asyncio.sleep(0.1)
+        m = fx.metrics.snapshot(fx.running())
+        assert hits == {"flaky": 3, "denied": 1, "slow": 1}
+        assert m["ok"] == 2 and m["retries"] == 2 and m["failed_by_name"] == {"signed.denied": 1}
+        assert m["running"] == 0
+
+    asyncio.run(go())
+
+
+def test_once_effects_are_not_retried():
+    async def go():
+        hits = {"post": 0, "role": 0}
+
+        async def post():
+            hits["post"] += 1
+            raise RuntimeError("timed out after the message went out")
+
+        async def role():
+            hits["role"] += 1
+            raise RuntimeError("503")
+
+        fx = SideEffects(max_attempts=3, backoff_s=0.001)
+        fx.spawn("signed", announce=Once(post), role=role)
+        await asyncio.sleep(0.05)
+        assert hits == {"post": 1, "role": 3}
+        assert fx.metrics.snapshot()["failed_by_name"] == {"signed.announce": 1, "signed.role": 1}
+
+    asyncio.run(go())
+
+
+def test_close_waits_then_cancels_and_refuses_new_work():
+    async def go():
+        done = []
+
+        async def short():
+            await asyncio.sleep(0.01)
+            done.append("short")
+
+        async def stuck():
+            await asyncio.sleep(10)
+            done.append("stuck")
+
+        fx = SideEffects()
+        fx.spawn("x", short=short, stuck=stuck)
+        await fx.close(timeout=0.05)
+        fx.spawn("y", short=short)
+        await asyncio.sleep(0.02)
+        assert done == ["short"] and fx.running() == 0
+
+    asyncio.run(go())
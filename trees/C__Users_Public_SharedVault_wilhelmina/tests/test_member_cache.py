@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from services.member_cache import GuildChunker, ready_report, resolve_policy, rss_mb
+
+
+class _Guild:
+    def __init__(self, gid, n, chunked=False):
+        self.id = gid
+        self._all = list(range(n))
+        self.members = self._all if chunked else []
+        self.chunked = chunked
+        self.calls = 0
+
+    async def chunk(self, cache=True):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if cache:
+            self.members, self.chunked = self._all, True
+        return list(self._all)
+
+
+def test_concurrent_callers_share_one_chunk_request():
+    async def go():
+        c = GuildChunker()
+        g = _Guild(1, 50)
+        results = await asyncio.gather(*(c.members(g) for _ in range(5)))
+        assert g.calls == 1 and all(len(r) == 50 for r in results)
+        assert len(await c.members(g)) == 50 and g.calls == 1  # served from the cache now
+        assert c.snapshot()["requests"] == 1 and c.snapshot()["members"] == 50
+
+    asyncio.run(go())
+
+
+def test_uncached_chunking_fetches_each_time():
+    async def go():
+        c = GuildChunker(cache=False)
+        g = _Guild(1, 10)
+        await c.members(g)
+        await c.members(g)
+        assert g.calls == 2 and g.members == []
+
+    asyncio.run(go())
+
+
+def test_already_chunked_guild_needs_no_request():
+    async def go():
+        g = _Guild(1, 3, chunked=True)
+        assert len(await GuildChunker().members(g)) == 3 and g.calls == 0
+
+    asyncio.run(go())
+
+
+def test_policy_resolution(monkeypatch):
+    monkeypatch.delenv("MEMBER_CACHE", raising=False)
+    assert resolve_policy() == "lazy"
+    monkeypatch.setenv("MEMBER_CACHE", " Eager ")
+    assert resolve_policy() == "eager"
+    with pytest.raises(ValueError):
+        resolve_policy("all")
+
+
+def test_ready_report_counts_cached_members():
+    class _Bot:
+        guilds = [_Guild(1, 4, chunked=True), _Guild(2, 9)]
+
+    r = ready_report(_Bot(), "lazy", started_at=10.0, clock=lambda: 12.5)
+    assert r["time_to_ready_s"] == 2.5 and r["guilds"] == 2
+    assert r["chunked_guilds"] == 1 and r["cached_members"] == 4
+    assert rss_mb() is None or rss_mb() > 0
+
+
+def test_client_options_per_policy():
+    discord = pytest.importorskip("discord")
+    intents = discord.Intents.default()
+    intents.members = True
+    assert discord.MemberCacheFlags.from_intents(intents).joined
+    from services.member_cache import client_options
+    assert client_options("eager", intents)["chunk_guilds_at_startup"] is True
+    lazy = client_options("lazy", intents)
+    assert lazy["chunk_guilds_at_startup"] is False and lazy["member_cache_flags"].joined
+    assert not client_options("minimal", intents)["member_cache_flags"].joined
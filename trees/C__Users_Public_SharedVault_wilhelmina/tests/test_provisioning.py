@@ -0,0 +1,196 @@
+import asyncio
+
+from services.provisioning import (
+    DONE,
+    FAILED,
+    PENDING,
+    SKIPPED,
+    Plan,
+    Provisioner,
+    Step,
+    StepSkipped,
+)
+
+
+class Crash(BaseException):
+    """Stands in for the process dying mid-run."""
+
+
+class RateLimited(Exception):
+    def __init__(self, after):
+        self.retry_after = after
+
+
+def _plan(n_archive=10):
+    steps = [Step("create:a", "create_channel", 1, "a"), Step("create:b", "create_channel", 2, "b")]
+    steps += [Step(f"archive:{i}", "archive", 100, f"ch{i}", {"channel_id": i}) for i in range(n_archive)]
+    steps.append(Step("prune:9", "prune_category", 101, "old"))
+    return Plan(1, steps)
+
+
+def test_phases_run_in_order_with_bounded_concurrency():
+    async def go():
+        order, live, peak = [], 0, 0
+
+        async def run_step(step):
+            nonlocal live, peak
+            live += 1
+            peak = max(peak, live)
+            await asyncio.sleep(0.005)
+            order.append(step.phase)
+            live -= 1
+
+        saves = []
+
+        async def save(plan):
+            saves.append(plan.finished)
+
+        plan = await Provisioner(run_step, save, concurrency=3).run(_plan(12))
+        assert order == sorted(order) and peak == 3
+        assert plan.complete and plan.counts()[DONE] == 15
+        assert saves[-1] == 15
+
+    asyncio.run(go())
+
+
+def test_rate_limit_pauses_and_retries_failures_are_recorded():
+    async def go():
+        hits = {}
+
+        async def run_step(step):
+            hits[step.key] = hits.get(step.key, 0) + 1
+            if step.key == "archive:3" and hits[step.key] == 1:
+                raise RateLimited(0.01)
+            if step.key == "archive:5":
+                raise RuntimeError("Missing Permissions")
+            if step.key == "prune:9":
+                raise StepSkipped
+
+        async def save(plan):
+            pass
+
+        engine = Provisioner(run_step, save)
+        plan = await engine.run(_plan())
+        assert engine.rate_limited == 1 and hits["archive:3"] == 2
+        failed = plan.failures()
+        assert [s.key for s in failed] == ["archive:5"] and "Missing Permissions" in failed[0].error
+        assert plan.by_op("prune_category")[0].status == SKIPPED
+        assert not plan.complete
+
+    asyncio.run(go())
+
+
+def test_resume_from_checkpoint_runs_only_unfinished_steps():
+    async def go():
+        saved = {"dead": False}
+
+        async def save(plan):
+            if not saved["dead"]:
+                saved["plan"] = plan.to_dict()
+
+        async def crash_midway(step):
+            if step.key == "archive:6":
+                saved["dead"] = True  # the process dies; nothing after this reaches storage
+                raise Crash
+            await asyncio.sleep(0)
+
+        try:
+            await Provisioner(crash_midway, save, concurrency=1, save_every_s=0).run(_plan())
+        except Crash:
+            pass
+
+        resumed = Plan.from_dict(saved["plan"])
+        assert resumed.counts()[DONE] == 8 and resumed.counts()[PENDING] == 5
+        ran = []
+
+        async def run_step(step):
+            ran.append(step.key)
+
+        await Provisioner(run_step, save).run(resumed)
+        assert sorted(ran) == ["archive:6", "archive:7", "archive:8", "archive:9", "prune:9"]
+        assert resumed.complete
+
+    asyncio.run(go())
+
+
+def test_resumed_step_gets_fresh_rate_limit_retries():
+    async def go():
+        plan = Plan(1, [Step("create:a", "create_channel", 1, "a")])
+        plan.steps[0].attempts = 4  # used up before the checkpoint it resumes from
+        resumed = Plan.from_dict(plan.to_dict())
+        hits = []
+
+        async def run_step(step):
+            hits.append(step.key)
+            if len(hits) == 1:
+                raise RateLimited(0.001)
+
+        async def save(plan):
+            pass
+
+        await Provisioner(run_step, save, max_attempts=4).run(resumed)
+        assert resumed.complete and len(hits) == 2 and resumed.steps[0].attempts == 6
+
+    asyncio.run(go())
+
+
+def test_failed_steps_are_retried_on_rerun_and_progress_is_throttled():
+    async def go():
+        t = [0.0]
+        shown = []
+
+        async def progress(plan):
+            shown.append(plan.finished)
+
+        async def fail(step):
+            t[0] += 0.1
+            raise RuntimeError("nope")
+
+        async def save(plan):
+            pass
+
+        plan = await Provisioner(fail, save, progress=progress, progress_every_s=1.0, clock=lambda: t[0]).run(_plan())
+        assert plan.counts()[FAILED] == 13
+        assert len(shown) < 13 and shown[-1] == 13  # throttled, but the final state is always shown
+
+        async def ok(step):
+            pass
+
+        await Provisioner(ok, save).run(plan)
+        assert plan.complete
+
+    asyncio.run(go())
+
+
+def test_batch_runner_handles_most_steps_and_the_rest_fall_back():
+    async def go():
+        batches, singles = [], []
+
+        async def bulk(steps):
+            batches.append(len(steps))
+            if len(batches) == 1:
+                raise RateLimited(0.01)  # retried with the same pending steps
+            for s in steps:
+                if s.args["channel_id"] != 4:  # "rejected" by the bulk request: left pending
+                    s.status = DONE
+
+        async def run_step(step):
+            singles.append(step.key)
+
+        async def save(plan):
+            pass
+
+        engine = Provisioner(run_step, save, batches={"archive": bulk})
+        plan = await engine.run(_plan())
+        assert batches == [10, 10] and engine.rate_limited == 1
+        assert sorted(singles) == ["archive:4", "create:a", "create:b", "prune:9"]
+        assert plan.complete and engine.batch_calls == 2
+
+        async def broken(steps):
+            raise RuntimeError("endpoint unavailable")
+
+        singles.clear()
+        plan = await Provisioner(run_step, save, batches={"archive": broken}).run(_plan(3))
+        assert sorted(singles) == ["archive:0", "archive:1", "archive:2", "create:a", "create:b", "prune:9"]
+
+    asyncio.run(go())
@@ -0,0 +1,52 @@
+import asyncio
+
+from services.ritual_scheduler import BeatScheduler
+
+
+async def _noop(key):
+    pass
+
+
+def test_pop_due_orders_and_skips_stale_entries():
+    s = BeatScheduler(_noop)
+    s.schedule("a", 5)
+    s.schedule("b", 1)
+    s.schedule("c", 3)
+    s.schedule("a", 2)  # reschedule leaves a stale (5, a) behind
+    assert s.cancel("c") and not s.cancel("c")
+    assert s.due_at("a") == 2 and s.due_at("c") is None
+    assert s.pop_due(4) == ["b", "a"]
+    assert s.pop_due(10) == [] and len(s) == 0 and s.next_due() is None
+
+
+def test_heap_compacts_after_many_reschedules():
+    s = BeatScheduler(_noop)
+    for i in range(500):
+        s.schedule(i % 10, i)
+    assert len(s) == 10 and len(s._heap) <= 2 * 10 + 64
+    assert s.pop_due(10_000) == [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+
+
+def test_loop_fires_due_keys_through_workers():
+    fired = []
+
+    async def go():
+        loop = asyncio.get_running_loop()
+
+        async def fire(key):
+            fired.append(key)
+            if key == "x" and fired.count("x") < 3:
+                s.schedule("x", loop.time() + 0.01)
+
+        s = BeatScheduler(fire, workers=2, clock=loop.time)
+        s.start()
+        s.schedule("x", loop.time() + 0.01)
+        s.schedule("y", loop.time() + 0.02)
+        s.schedule("z", loop.time() + 0.02)
+        s.cancel("z")
+        await asyncio.sleep(0.2)
+        await s.close()
+        assert s.fired == 4 and s.errors == 0
+
+    asyncio.run(go())
+    assert fired.count("x") == 3 and fired.count("y") == 1 and "z" not in fired
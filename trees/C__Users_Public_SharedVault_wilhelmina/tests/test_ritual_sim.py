@@ -0,0 +1,28 @@
+import asyncio
+import re
+
+import pytest
+
+pytest.importorskip("discord")
+
+from services.ritual_sim import simulate, zipf_sizes  # noqa: E402
+
+
+def test_zipf_sizes_cover_population():
+    sizes = zipf_sizes(1000, 10)
+    assert sum(sizes) == 1000 and sizes == sorted(sizes, reverse=True)
+
+
+def test_full_rituals_run_on_virtual_clock():
+    from cogs.onboarding import PER_RITUAL_MEMBER_MENTIONS_MAX, RITUAL_DURATION_S
+
+    r = asyncio.run(simulate(rituals=4, members=400, keep_messages=True))
+    assert r.unfinished == 0
+    assert r.steps == 4 * 14              # opening + 13 beats each
+    assert r.api_calls == 4 * 15          # ... + finale
+    assert RITUAL_DURATION_S - 20 < r.sim_span_s < RITUAL_DURATION_S * 1.25
+    assert r.drift_ms_max < 1000
+    assert r.wall_s < 5
+    for ch in r.circles.values():
+        ids = [m for msg in ch.messages if msg.embed for m in re.findall(r"<@(\d+)>", msg.embed.description or "")]
+        assert len(ids) == len(set(ids)) <= PER_RITUAL_MEMBER_MENTIONS_MAX
@@ -0,0 +1,70 @@
+import asyncio
+
+from services.serials import SERIAL_MAX, SerialAllocator, wrap_serial
+
+
+class FakeCounter:
+    """Mirrors Storage.lease_serials / release_serials against an in-memory counter."""
+
+    def __init__(self, next_serial=1):
+        self.next_serial = next_serial
+        self.calls = 0
+
+    async def lease(self, guild_id, n):
+        self.calls += 1
+        start = self.next_serial
+        self.next_serial = wrap_serial(start, n)
+        return start
+
+    async def release(self, guild_id, first_unused, expected_next):
+        if self.next_serial != expected_next:
+            return False
+        self.next_serial = first_unused
+        return True
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_wrap_serial():
+    assert wrap_serial(9999, 1) == 1
+    assert wrap_serial(9998, 3) == 2
+    assert wrap_serial(1, -1) == SERIAL_MAX
+
+
+def test_trickle_signups_lease_one_at_a_time():
+    t = [0.0]
+    c = FakeCounter()
+    alloc = SerialAllocator(c.lease, c.release, clock=lambda: t[0])
+    got = []
+    for _ in range(3):
+        got.append(run(alloc.next(1)))
+        t[0] += 60
+    assert got == [1, 2, 3]
+    assert c.calls == 3
+    assert run(alloc.release_all()) == {}
+
+
+def test_wave_grows_blocks_and_wraps():
+    c = FakeCounter(next_serial=9990)
+    alloc = SerialAllocator(c.lease, c.release, max_block=64, clock=lambda: 0.0)
+    got = [run(alloc.next(1)) for _ in range(1000)]
+    assert got[:11] == list(range(9990, 10000)) + [1]
+    assert got[-1] == wrap_serial(9990, 999)
+    assert c.calls < 30
+
+
+def test_release_returns_unused_only_if_counter_untouched():
+    c = FakeCounter()
+    alloc = SerialAllocator(c.lease, c.release, clock=lambda: 0.0)
+    for _ in range(4):
+        run(alloc.next(1))  # blocks of 1, 2, 4 -> 7 leased, 4 used
+    assert run(alloc.release_all()) == {1: 3}
+    assert c.next_serial == 5
+
+    run(alloc.next(2))
+    run(alloc.next(2))  # guild 2 holds a block of 2 with one unused
+    c.next_serial = 42  # another writer moved on
+    assert run(alloc.release_all()) == {}
+    assert c.next_serial == 42
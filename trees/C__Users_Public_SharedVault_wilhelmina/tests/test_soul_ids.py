@@ -0,0 +1,37 @@
+import datetime as dt
+import random
+
+from services.soul_ids import (
+    SOUL_ID_RE,
+    mint_soul_id,
+    normalize_soul_id,
+    parse_soul_id_list,
+    with_serial,
+)
+
+WHEN = dt.datetime(2025, 10, 31, 13, 20, 12)
+
+
+def test_mint_does_not_touch_global_rng():
+    random.seed(1234)
+    expected = random.random()
+    random.seed(1234)
+    mint_soul_id("Morgana", WHEN)
+    assert random.random() == expected
+
+
+def test_same_second_signups_are_not_forced_equal():
+    sids = {mint_soul_id("Morgana", WHEN) for _ in range(50)}
+    assert len(sids) > 1
+    for sid in sids:
+        assert SOUL_ID_RE.fullmatch(with_serial(sid, 42))
+
+
+def test_normalize_and_parse():
+    sid = "⛧WLMN-0042-MO25Ψ7⛧"
+    assert normalize_soul_id(sid) == sid
+    assert normalize_soul_id(" `wlmn-0042-mo25Ψ7` ") == sid
+    assert normalize_soul_id("WLMN-42-MO25Ψ7") is None
+    ids, bad = parse_soul_id_list(f"{sid}, WLMN-0042-MO25Ψ7;\nnope ⛧WLMN-0001-XX25Ω0⛧")
+    assert ids == [sid, "⛧WLMN-0001-XX25Ω0⛧"]
+    assert bad == ["nope"]
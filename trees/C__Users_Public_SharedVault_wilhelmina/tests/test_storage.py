@@ -0,0 +1,304 @@
+import asyncio
+
+import pytest
+
+from services.storage import DuplicateKey
+from services.storage_sqlite import SQLiteStorage
+
+
+def _sqlite(tmp_path):
+    return SQLiteStorage(str(tmp_path / "w.sqlite"))
+
+
+def _mongo(tmp_path):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    from services.storage_mongo import MongoStorage
+    # the in-process stand-in has no $text; search falls back to a regex scan
+    return MongoStorage(client=mongomock_motor.AsyncMongoMockClient(), text_index=False)
+
+
+@pytest.fixture(params=[_sqlite, _mongo], ids=["sqlite", "mongo"])
+def store(request, tmp_path):
+    return request.param(tmp_path)
+
+
+def run(store, fn):
+    async def go():
+        await store.open()
+        try:
+            return await fn()
+        finally:
+            await store.close()
+    return asyncio.run(go())
+
+
+def test_members_and_soul_ids(store):
+    async def go():
+        await store.upsert_member(1, 10, chosen_name="Ada", soul_id="A")
+        await store.upsert_member(1, 11, chosen_name="Bo")
+        await store.upsert_member(1, 11, soul_id="B")
+        with pytest.raises(DuplicateKey):
+            await store.upsert_member(1, 12, soul_id="A")
+        assert (await store.get_member(1, 11))["chosen_name"] == "Bo"
+        assert (await store.find_by_soul_id(1, "A"))["user_id"] == 10
+        assert set(await store.find_soul_ids(1, ["A", "B", "C"])) == {"A", "B"}
+        assert sorted([m["user_id"] async for m in store.iter_members(1)]) == [10, 11]
+        assert [m async for m in store.iter_members(1, changed_after="9999")] == []
+    run(store, go)
+
+
+def test_events_paging_rollups_and_erasure(store):
+    async def go():
+        await store.log_events([(1, 5, "contract_sent", {"via": "dm"}) for _ in range(3)])
+        await asyncio.gather(*(store.log_event(1, None, "member_join", {"user_id": 7, "note": f"n{i}"})
+                               for i in range(4)))
+        await store.log_event(2, None, "member_join", {})
+        ids = [e["id"] async for e in store.iter_events(1)]
+        assert len(ids) == 7 and ids == sorted(ids)
+        assert await store.max_event_id(1) == ids[-1]
+
+        page = await store.search_events(1, limit=3)
+        assert [e["id"] for e in page] == ids[:-4:-1]
+        older = await store.search_events(1, before_id=page[-1]["id"], limit=3)
+        assert [e["id"] for e in older] == ids[3::-1][:3]
+        newer = await store.search_events(1, after_id=older[0]["id"], limit=3)
+        assert newer == page
+        assert len(await store.search_events(1, text="n2")) == 1
+        assert len(await store.search_events(1, user_id=7)) == 4
+
+        await store.log_event(3, None, "circle_interruption_deleted", {"batch": 40})
+        assert (await store.rollup_totals(3, "hour", "0000"))["circle_interruption_deleted"][0] == 40
+        totals = await store.rollup_totals(1, "day", "0000")
+        assert totals["contract_sent"][0] == 3 and totals["contract_sent:dm"][0] == 3
+        assert totals["member_join"][0] == 4
+
+        counts = await store.erase_member(1, 7, anonymize=True)
+        assert counts["events"] == 4
+        assert await store.search_events(1, user_id=7) == []
+        assert (await store.erase_member(1, 5))["events"] == 3
+    run(store, go)
+
+
+async def _stored_values(store):
+    """Every value the backend holds, as strings (detail_json included verbatim)."""
+    if isinstance(store, SQLiteStorage):
+        tables = [r[0] for r in store._conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        return [str(v) for t in tables if not t.startswith("events_fts")
+                for row in store._conn.execute(f"SELECT * FROM {t}") for v in tuple(row)]
+    out = []
+    for name in await store._db.list_collection_names():
+        async for doc in store._db[name].find({}):
+            out += [str(v) for v in doc.values()]
+    return out
+
+
+def test_anonymized_member_is_rekeyed_and_leaves_no_trace_of_the_id(store):
+    import json
+    uid = 912345678901
+
+    async def go():
+        await store.upsert_member(1, uid, chosen_name="Ada", birthdate="2000-01-01", soul_id="S7",
+                                  signed_at="2025-01-01T00:00:00")
+        await store.upsert_member(1, 8, chosen_name="Bo", soul_id="S8")
+        await store.log_event(1, uid, "member_join", {"user_id": uid, "reason": "x"})
+        await store.log_event(1, None, "ritual_state", {"next_index": 3, "mentioned": [5, uid, 9]})
+        await store.log_event(1, None, "circle_interruption_deleted", {"batch": 2, "user_ids": [uid]})
+        await store.log_event(1, None, "ritual_state", {"mentioned": [5]})
+        await store.enqueue_contract(1, uid)
+        await store.set_export_watermark(1, uid, 3, "2025-01-01T00:00:00")
+
+        counts = await store.erase_member(1, uid, anonymize=True)
+        assert counts["members"] == 1 and await store.get_member(1, uid) is None
+        assert not any(str(uid) in v for v in await _stored_values(store))
+        row = await store.get_member(1, -1)
+        assert row["signed_at"] == "2025-01-01T00:00:00"
+        assert row["chosen_name"] is None and row["birthdate"] is None and row["soul_id"] is None
+        lists = [json.loads(e["detail_json"]) for e in await store.search_events(1, kind="ritual_state")]
+        assert [d["mentioned"] for d in lists] == [[5], [5, 9]]
+
+        if isinstance(store, SQLiteStorage):  # mongomock ignores the partial soul_id index: two unset would clash
+            await store.erase_member(1, 8, anonymize=True)  # surrogates don't collide
+            assert (await store.get_member(1, -2))["chosen_name"] is None
+
+        await store.log_event(1, None, "ritual_state", {"mentioned": [uid]})
+        await store.erase_member(1, uid)
+        assert json.loads((await store.search_events(1, limit=1))[0]["detail_json"])["mentioned"] == []
+    run(store, go)
+
+
+def test_serial_lease_wraps_and_releases(store):
+    async def go():
+        assert await store.lease_serials(1, 9998) == 1
+        assert await store.lease_serials(1, 3) == 9999  # 9999, 1, 2
+        assert await store.release_serials(1, 1, 3)
+        assert await store.get_and_inc_serial(1) == 1
+        assert not await store.release_serials(1, 1, 99)
+    run(store, go)
+
+
+def test_leases_exclude_other_owners_until_expiry(store):
+    async def go():
+        assert await store.acquire_lease("ritual:1", "a", 60)
+        assert await store.acquire_lease("ritual:1", "a", 60)  # renew
+        assert not await store.acquire_lease("ritual:1", "b", 60)
+        assert not await store.release_lease("ritual:1", "b")
+        assert await store.release_lease("ritual:1", "a")
+        assert await store.acquire_lease("ritual:1", "b", -1)  # already expired
+        assert await store.acquire_lease("ritual:1", "a", 60)
+    run(store, go)
+
+
+def test_provision_plan_roundtrip(store):
+    async def go():
+        assert await store.get_provision_plan(1) is None
+        await store.save_provision_plan(1, {"steps": [{"key": "archive:5", "status": "pending"}]})
+        await store.save_provision_plan(1, {"steps": [{"key": "archive:5", "status": "done"}]})
+        assert (await store.get_provision_plan(1))["steps"][0]["status"] == "done"
+        await store.clear_provision_plan(1)
+        assert await store.get_provision_plan(1) is None
+    run(store, go)
+
+
+def test_contract_queue_rows_are_unique_per_member(store):
+    async def go():
+        await store.enqueue_contract(1, 10)
+        await store.enqueue_contract(1, 11)
+        await store.enqueue_contract(1, 10)
+        await store.enqueue_contract(2, 10)
+        rows = await store.pending_contracts()
+        assert [(r["guild_id"], r["user_id"]) for r in rows] == [(1, 10), (1, 11), (2, 10)]
+        await store.dequeue_contract(1, 10)
+        assert len(await store.pending_contracts()) == 2
+    run(store, go)
+
+
+def test_guild_config_updates_keep_the_kiosk_message(store):
+    async def go():
+        await store.upsert_guild_config(1, circle_channel_id=5, kiosk_message_id=50)
+        await store.upsert_guild_config(1, analytics_message_id=60)
+        cfg = await store.get_guild_config(1)
+        assert cfg["kiosk_message_id"] == 50 and cfg["circle_channel_id"] == 5 and cfg["analytics_message_id"] == 60
+    run(store, go)
+
+
+def test_sqlite_switches_to_incremental_vacuum_and_frees_pages(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "old.sqlite")
+    legacy = sqlite3.connect(path)  # a DB created before auto_vacuum was set
+    legacy.execute("CREATE TABLE filler(x)")
+    legacy.executemany("INSERT INTO filler VALUES (?)", [("x" * 500,)] * 2000)
+    legacy.commit()
+    legacy.close()
+    store = SQLiteStorage(path)
+
+    async def go():
+        assert await store.ensure_incremental_vacuum()
+        assert not await store.ensure_incremental_vacuum()
+        store._conn.execute("DELETE FROM filler")
+        store._conn.commit()
+        assert await store.incremental_vacuum(50) == 50
+    run(store, go)
+
+
+def test_shared_sqlite_write_waits_for_another_process_without_blocking_the_loop(tmp_path):
+    import sqlite3
+    import time
+    path = str(tmp_path / "shared.sqlite")
+    store = SQLiteStorage(path, shared=True)
+
+    async def go():
+        other = sqlite3.connect(path, isolation_level=None)  # stands in for another node process
+        other.execute("BEGIN IMMEDIATE")
+        asyncio.get_running_loop().call_later(0.2, other.execute, "COMMIT")
+        gaps, last = [], time.monotonic()
+
+        async def ticker():
+            nonlocal last
+            while True:
+                await asyncio.sleep(0.005)
+                now = time.monotonic()
+                gaps.append(now - last)
+                last = now
+
+        tick = asyncio.create_task(ticker())
+        assert await store.acquire_lease("job:backup", "node-a", 60)
+        tick.cancel()
+        other.close()
+        assert store.busy_retries > 0
+        assert max(gaps) < 0.15  # the loop kept running while the lock was held
+    run(store, go)
+
+
+def test_sqlite_writes_wait_out_a_restore_and_land_on_the_restored_data(tmp_path):
+    from services.backup import backup_snapshot
+    store = _sqlite(tmp_path)
+
+    async def go():
+        await store.upsert_member(1, 10, chosen_name="Ada")
+        snap = backup_snapshot(store._conn, str(tmp_path / "b"), sleep_s=0).path
+        await store.upsert_member(1, 11, chosen_name="Bo")  # not in the snapshot
+        restoring = asyncio.create_task(store.restore(snap))
+        await asyncio.sleep(0)
+        write = asyncio.create_task(store.upsert_member(1, 12, chosen_name="Cy"))
+        await asyncio.sleep(0)
+        assert not write.done()
+        # the snapshot is still being unpacked off the loop; reads see the live data whole
+        assert (await store.get_member(1, 11))["chosen_name"] == "Bo"
+        await restoring
+        await write
+        assert await store.get_member(1, 11) is None
+        assert (await store.get_member(1, 10))["chosen_name"] == "Ada"
+        assert (await store.get_member(1, 12))["chosen_name"] == "Cy"
+    run(store, go)
+
+
+def test_sqlite_fts_backfills_an_existing_db_and_follows_writes(tmp_path):
+    import sqlite3
+    path = str(tmp_path / "w.sqlite")
+
+    async def seed():
+        store = SQLiteStorage(path)
+        await store.open()
+        await store.log_events([(1, None, "note", {"text": f"old moon {i}"}) for i in range(3)])
+        await store.close()
+    asyncio.run(seed())
+    conn = sqlite3.connect(path)  # as a DB from before the index existed
+    conn.executescript("DROP TRIGGER events_fts_ai; DROP TRIGGER events_fts_ad; DROP TRIGGER events_fts_au;"
+                       "DROP TABLE events_fts;")
+    conn.close()
+
+    store = SQLiteStorage(path)
+
+    async def go():
+        assert store.fts
+        assert len(await store.search_events(1, text="moon")) == 3
+        await store.log_event(1, None, "note", {"reason": "new moon", "user_id": 7})
+        await store.log_event(1, None, "ritual_state", {"text": "moon"})  # kept out of the index
+        assert [e["kind"] for e in await store.search_events(1, text="moon")] == ["note"] * 4
+        assert len(await store.search_events(1, text="new moon")) == 1
+        await store.erase_member(1, 7, anonymize=True)  # rewrites detail_json: the update trigger re-indexes
+        assert await store.search_events(1, text="new moon") == []
+        assert len(await store.search_events(1, text="redacted")) == 1
+    run(store, go)
+
+
+def test_sqlite_text_search_pages_both_ways_without_gaps(tmp_path):
+    store = _sqlite(tmp_path)
+
+    async def go():
+        await store.log_events([(1, None, "note", {"text": "hex" if i % 2 else "plain"}) for i in range(14)])
+        hits = [e["id"] for e in await store.search_events(1, text="hex", limit=50)]
+        assert len(hits) == 7 and hits == sorted(hits, reverse=True)
+
+        first = await store.search_events(1, text="hex", limit=3)
+        second = await store.search_events(1, text="hex", before_id=first[-1]["id"], limit=3)
+        last = await store.search_events(1, text="hex", before_id=second[-1]["id"], limit=3)
+        assert [e["id"] for e in first + second + last] == hits  # the last page is short
+        assert await store.search_events(1, text="hex", before_id=last[-1]["id"], limit=3) == []
+
+        back = await store.search_events(1, text="hex", after_id=last[0]["id"], limit=3)
+        assert back == second  # newer pages come back newest first too
+        assert await store.search_events(1, text="hex", after_id=first[0]["id"], limit=3) == []
+        top = await store.search_events(1, text="hex", after_id=second[0]["id"], limit=3)
+        assert top == first
+    run(store, go)
@@ -0,0 +1,71 @@
+import asyncio
+
+import pytest
+
+from services.webhook_sender import WebhookError, WebhookGone, WebhookSender
+
+
+class Resp:
+    def __init__(self, status, headers=None, body=None):
+        self.status = status
+        self.headers = headers or {}
+        self._body = body
+        self.content_type = "application/json" if body is not None else "text/plain"
+
+    async def json(self, content_type=None):
+        return self._body
+
+    async def text(self):
+        return str(self._body)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class Session:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.posts = 0
+
+    def post(self, url, json=None):
+        self.posts += 1
+        return self.responses.pop(0)
+
+
+def _sender(session):
+    slept = []
+
+    async def sleep(s):
+        slept.append(s)
+
+    return WebhookSender(session, sleep=sleep, clock=lambda: 0.0), slept
+
+
+def test_retries_429_then_5xx_and_respects_bucket():
+    session = Session([Resp(429, body={"retry_after": 1.5}), Resp(502),
+                       Resp(204, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "2"}), Resp(204)])
+    sender, slept = _sender(session)
+    asyncio.run(sender.execute("u", {}))
+    asyncio.run(sender.execute("u", {}))
+    assert slept == [1.5, 1.0, 2.0]
+    assert (sender.sent, sender.rate_limited, sender.retries) == (2, 1, 2)
+
+
+def test_gone_and_hard_errors_raise():
+    sender, _ = _sender(Session([Resp(404), Resp(400, body={"code": 50035})]))
+    with pytest.raises(WebhookGone):
+        asyncio.run(sender.execute("u", {}))
+    with pytest.raises(WebhookError):
+        asyncio.run(sender.execute("u", {}))
+
+
+def test_giving_up_reports_the_last_status_without_a_final_sleep():
+    session = Session([Resp(503)] * 5)
+    sender, slept = _sender(session)
+    with pytest.raises(WebhookError) as e:
+        asyncio.run(sender.execute("u", {}))
+    assert e.value.status == 503 and session.posts == 5
+    assert slept == [0.5, 1.0, 2.0, 4.0] and sender.retries == 4
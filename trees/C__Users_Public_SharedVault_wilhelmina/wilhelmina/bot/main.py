@@ -1,4 +1,8 @@
-import os, asyncio, discord
+import asyncio
+import os
+import time
+
+import discord
 from discord.ext import commands
 
 INTENTS = discord.Intents.default()
@@ -6,11 +10,17 @@ INTENTS.message_content = False
 INTENTS.members = True
 INTENTS.voice_states = True
 
-bot = commands.Bot(command_prefix="!", intents=INTENTS)
+STARTED = time.monotonic()
+
+# Only the oracle cog runs here and it never reads member lists: no startup chunking, no member
+# cache. The onboarding bots choose a policy with MEMBER_CACHE (services/member_cache.py).
+bot = commands.Bot(command_prefix="!", intents=INTENTS, member_cache_flags=discord.MemberCacheFlags.none(),
+                   chunk_guilds_at_startup=False)
 
 @bot.event
 async def on_ready():
     print(f"Logged in as {bot.user} (latency {bot.latency*1000:.0f}ms)")
+    print(f"Ready in {time.monotonic() - STARTED:.1f}s across {len(bot.guilds)} guilds")
     await bot.tree.sync()
 
 async def _load():
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+log = logging.getLogger(__name__)
+
+# Discord voids an interaction that is not answered within 3 seconds.
+# fast_reply covers replies whose content is itself slow to produce (an LLM
+# line, a storage round trip): the reply goes out directly when it is ready
+# inside `budget_s`, otherwise the interaction is deferred and the reply sent
+# as a followup once it is. If building the reply fails, the user gets a short
+# ephemeral error either way instead of a silent failure or an endless "thinking…".
+#
+# Everything the user does not need to see in the reply (role grants,
+# announcements, event and audit logging) goes to SideEffects, which runs it
+# concurrently in supervised background tasks with retries.
+
+ACK_BUDGET_S = 1.5
+REPLY_ERROR_TEXT = "Something went wrong. The coven is investigating."
+
+
+async def fast_reply(interaction, build: Awaitable[dict[str, Any]], ephemeral: bool = False,
+                     budget_s: float = ACK_BUDGET_S) -> bool:
+    """Send the message kwargs `build` returns. False if `build` raised (logged, and an error sent instead)."""
+    task = asyncio.ensure_future(build)
+    deferred = False
+    try:
+        done, _ = await asyncio.wait({task}, timeout=budget_s)
+        if not done:
+            await interaction.response.defer(ephemeral=ephemeral, thinking=True)
+            deferred = True
+        try:
+            message = await task
+        except Exception:
+            log.exception("Building the reply to interaction %s failed", getattr(interaction, "id", "?"))
+            await _send_error(interaction, deferred)
+            return False
+        if deferred:
+            await interaction.followup.send(ephemeral=ephemeral, **message)
+        else:
+            await interaction.response.send_message(ephemeral=ephemeral, **message)
+        return True
+    finally:
+        task.cancel()  # no-op once finished; stops the build if the ack itself failed
+
+
+async def _send_error(interaction, deferred: bool):
+    try:
+        if deferred:
+            # the followup replaces the "thinking…" message, so it is only as private as the defer was
+            await interaction.followup.send(content=REPLY_ERROR_TEXT, ephemeral=True)
+        else:
+            await interaction.response.send_message(content=REPLY_ERROR_TEXT, ephemeral=True)
+    except Exception as e:
+        log.warning("Could not report the failed reply: %r", e)
+
+
+Effect = Callable[[], Awaitable[Any]]
+
+
+@dataclass(frozen=True)
+class Once:
+    """An effect SideEffects runs exactly one attempt of.
+
+    For effects that already retry on their own (anything sent through the
+    outbound dispatcher, which handles 429s) or that are not safe to repeat
+    after partly succeeding: a second attempt would post or log twice.
+    """
+
+    effect: Effect
+
+    def __call__(self) -> Awaitable[Any]:
+        return self.effect()
+
+
+def _retry_after(exc: BaseException) -> float | None:
+    return getattr(exc, "retry_after", None)
+
+
+@dataclass
+class EffectMetrics:
+    started: int = 0
+    ok: int = 0
+    retries: int = 0
+    failed: int = 0
+    failed_by_name: dict[str, int] = field(default_factory=dict)
+
+    def snapshot(self, running: int = 0) -> dict[str, Any]:
+        return {"running": running, "started": self.started, "ok": self.ok, "retries": self.retries,
+                "failed": self.failed, "failed_by_name": dict(sorted(self.failed_by_name.items()))}
+
+
+class SideEffects:
+    """Background runner for the work an interaction leaves behind once it has answered.
+
+    `spawn(label, **effects)` starts every effect at once and returns without
+    waiting. An effect that raises is retried up to `max_attempts` times, after
+    the exception's retry_after or an exponential backoff, unless
+    `retryable(exc)` says the failure is permanent (Forbidden, NotFound) or the
+    effect is wrapped in Once. Final failures are logged and counted; nothing
+    propagates to the caller.
+    """
+
+    def __init__(self, max_attempts: int = 3, backoff_s: float = 1.0, concurrency: int = 16,
+                 retry_after: Callable[[BaseException], float | None] = _retry_after,
+                 retryable: Callable[[BaseException], bool] = lambda e: True):
+        self.max_attempts = max_attempts
+        self.backoff_s = backoff_s
+        self._slots = asyncio.Semaphore(concurrency)
+        self._retry_after = retry_after
+        self._retryable = retryable
+        self._tasks: set[asyncio.Task] = set()
+        self._closed = False
+        self.metrics = EffectMetrics()
+
+    def running(self) -> int:
+        return len(self._tasks)
+
+    def spawn(self, label: str, **effects: Effect):
+        if self._closed:
+            log.warning("Side effects %s dropped: pipeline closed", label)
+            return
+        for name, effect in effects.items():
+            self.metrics.started += 1
+            task = asyncio.create_task(self._run(f"{label}.{name}", effect))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, name: str, effect: Effect):
+        attempt = 0
+        max_attempts = 1 if isinstance(effect, Once) else self.max_attempts
+        async with self._slots:
+            while True:
+                attempt += 1
+                try:
+                    await effect()
+                except Exception as e:
+                    if attempt < max_attempts and self._retryable(e):
+                        self.metrics.retries += 1
+                        after = self._retry_after(e)
+                        await asyncio.sleep(after if after is not None else self.backoff_s * 2 ** (attempt - 1))
+                        continue
+                    self.metrics.failed += 1
+                    self.metrics.failed_by_name[name] = self.metrics.failed_by_name.get(name, 0) + 1
+                    log.warning("Side effect %s failed after %d attempt(s): %r", name, attempt, e)
+                else:
+                    self.metrics.ok += 1
+                return
+
+    async def close(self, timeout: float = 10.0):
+        """Stop taking work and give what is running `timeout` seconds to finish before cancelling it."""
+        self._closed = True
+        tasks = list(self._tasks)
+        if not tasks:
+            return
+        _, pending = await asyncio.wait(tasks, timeout=timeout)
+        for t in pending:
+            t.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        if pending:
+            log.warning("Cancelled %d side effects still running at shutdown", len(pending))